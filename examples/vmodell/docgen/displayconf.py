@@ -23,12 +23,11 @@
 
 # -*- coding: utf-8 -*-
 
-import string
 
 import xml.etree.ElementTree as et
 
 import relrdf
-from relrdf import commonns
+from relrdf import commonns, parsequery
 from relrdf.expression import uri
 from relrdf.util import nsshortener
 
@@ -763,13 +762,13 @@ class BaseModelWrapper(object):
     # Model Data Extraction
     #
 
-    _ogQuery = string.Template(u"""
+    _ogQuery = parsequery.makeTemplate('sparql', u"""
         select ?value1 ?rel1 ?subgraph1 ?value2 ?rel2 ?subgraph2 ?value3
         where {
           graph ?subgraph1 {
             ?value1 ?rel1 ?value2 .
           }
-          filter (?value1 = <$resUri>)
+          filter (?value1 = $resUri)
           optional {
             graph ?subgraph2 {
               ?value2 ?rel2 ?value3 .
@@ -782,14 +781,14 @@ class BaseModelWrapper(object):
         }
         """)
 
-    _icQuery = string.Template(u"""
+    _icQuery = parsequery.makeTemplate('sparql', u"""
         select ?value1 ?rel1 ?subgraph1 ?value2
                'value3'=?value1 ?rel3 ?subgraph3 ?value4
         where {
           graph ?subgraph1 {
             ?value1 ?rel1 ?value2 .
           }
-          filter (?value2 = <$resUri>)
+          filter (?value2 = $resUri)
           optional {
             graph ?subgraph3 {
               ?value1 ?rel3 ?value4 .
@@ -803,24 +802,18 @@ class BaseModelWrapper(object):
         """)
 
     def getOgRels(self, resUri):
-        return self.model.query('sparql',
-                                self._ogQuery.substitute(resUri=resUri))
+        return self.model.query(self._ogQuery, resUri=uri.Uri(resUri))
 
     def getIcRels(self, resUri):
-        return self.model.query('sparql',
-                                self._icQuery.substitute(resUri=resUri))
+        return self.model.query(self._icQuery, resUri=uri.Uri(resUri))
 
     def load(self, resUri):
         resSet = loadres.ResourceSet()
 
         try:
-            # FIXME: Writing web values into queries without protecting
-            # them is a security risk.
             results = self.getOgRels(resUri)
             resSet.addResults(results)
 
-            # FIXME: Writing web values into queries without protecting
-            # them is a security risk.
             results = self.getIcRels(resUri)
         finally:
             resSet.addResults(results)
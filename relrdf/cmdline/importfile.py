@@ -60,6 +60,24 @@ class ImportOperation(backend.CmdLineOperation):
         parser.add_argument('--type', '-t',
                             metavar=_("TYPE"), dest='type', required=True,
                             help=_("Type of the input file to import"))
+        parser.add_argument('--bulk', action='store_true',
+                            help=_("Use the modelbase's bulk loading "
+                                   "mode, if available (faster for large "
+                                   "files)"))
+        parser.add_argument('--pipelined', action='store_true',
+                            help=_("Write statements to the modelbase in "
+                                   "the background while parsing, if "
+                                   "supported"))
+        parser.add_argument('--jobs', '-j', metavar=_("N"), type=int,
+                            default=1,
+                            help=_("Number of worker processes used to "
+                                   "import line based files (types "
+                                   "ntriples and nquads) in parallel"))
+        parser.add_argument('--max-memory', metavar=_("MB"), type=int,
+                            dest='maxMemory', default=None,
+                            help=_("Abort the import if the process uses "
+                                   "more than MB megabytes of memory "
+                                   "(types xmi and v-modell)"))
         parser.add_argument('file', metavar=_("FILE"),
                             help=_("Path to the file to import"))
 
@@ -70,6 +88,14 @@ class ImportOperation(backend.CmdLineOperation):
 
         argv = list(sys.argv[3:])
 
+        maxMemory = None
+        if options.maxMemory is not None:
+            maxMemory = options.maxMemory << 20
+
+        if options.jobs > 1:
+            self.runParallel(options, mbConf, modelConf)
+            return
+
         try:
             modelBase = centralfactory.getModelbase(mbConf)
             #if 'baseGraph' not in sinkArgs:
@@ -78,6 +104,9 @@ class ImportOperation(backend.CmdLineOperation):
         except InstantiationError, e:
             raise CommandLineError(e)
 
+        modelBase.setBulkLoad(options.bulk)
+        modelBase.setPipelined(options.pipelined)
+
         fileType = fileType.lower()
         if fileType == 'rdfxml':
             from relrdf.modelimport import rdfxmlparse
@@ -91,13 +120,14 @@ class ImportOperation(backend.CmdLineOperation):
             from relrdf.modelimport import vmodellparse
 
             try:
-                vmodellparse.VModellParser(open(fileName), sink=sink)
+                vmodellparse.VModellParser(open(fileName), sink=sink,
+                                           maxMemory=maxMemory)
             except Exception, e:
                 raise CommandLineError(e)
         elif fileType == 'xmi':
             from relrdf.modelimport import xmiparse
 
-            parser = xmiparse.XmiParser()
+            parser = xmiparse.XmiParser(maxMemory=maxMemory)
             try:
                 parser.parse(fileName, sink)
             except Exception, e:
@@ -110,10 +140,11 @@ class ImportOperation(backend.CmdLineOperation):
                 parser.parse(fileName, sink)
             except Exception, e:
                 raise CommandLineError(e)
-        elif fileType == 'ntriples':
-            from relrdf.modelimport import redlandparse
+        elif fileType in ('ntriples', 'nquads'):
+            from relrdf.modelimport import ntriplesparse
 
-            parser = redlandparse.RedlandParser(format='ntriples')
+            parser = ntriplesparse.NTriplesParser(quads=(fileType ==
+                                                         'nquads'))
             try:
                 parser.parse(fileName, sink)
             except Exception, e:
@@ -125,3 +156,20 @@ class ImportOperation(backend.CmdLineOperation):
 
         sink.close()
         modelBase.close()
+
+    def runParallel(self, options, mbConf, modelConf):
+        from relrdf.modelimport import parallelimport
+
+        fileType = options.type.lower()
+        if fileType not in ('ntriples', 'nquads'):
+            raise CommandLineError(_("File type '%s' can't be imported "
+                                     "in parallel") % options.type)
+
+        try:
+            parallelimport.importFile(options.file, mbConf, modelConf,
+                                      options.jobs,
+                                      quads=(fileType == 'nquads'))
+        except InstantiationError, e:
+            raise CommandLineError(e)
+        except Exception, e:
+            raise CommandLineError(e)
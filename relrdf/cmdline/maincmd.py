@@ -109,6 +109,7 @@ operationNames = [
     'list',
     'register',
     'setdefault',
+    'stats',
     ]
 
 def getOperation(name):
@@ -138,6 +139,9 @@ def getOperation(name):
     if name == 'import':
         import importfile
         return importfile.ImportOperation()
+    if name == 'stats':
+        import showstats
+        return showstats.StatsOperation()
     else:
         return None
 
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (C) 2005-2009 Fraunhofer Institut Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Implementation of the stats command-line operation."""
+
+
+import sys
+
+from relrdf.localization import _
+from relrdf.error import CommandLineError, InstantiationError
+from relrdf import centralfactory
+
+import backend
+
+
+class StatsOperation(backend.CmdLineOperation):
+    """Show the statement statistics kept by a modelbase
+
+    Prints the number of statements in the modelbase, followed by the
+    statement counts per predicate (with the number of distinct
+    subjects and objects), per graph and per object type. With
+    --analyze, the statistics are computed from scratch first, which
+    may take a while on large modelbases. Otherwise, the statistics
+    are kept approximately current while statements are imported.
+    Object types are shown by their internal type ID (0 for
+    resources, 1 for plain literals).
+    """
+
+    __slots__ = ()
+
+    name = 'stats'
+
+    needsMbConf = True
+
+    def makeParser(self):
+        parser = super(StatsOperation, self).makeParser()
+
+        parser.add_argument('--analyze', '-a', action='store_true',
+                            help=_("Recompute the statistics before "
+                                   "showing them"))
+        parser.add_argument('--limit', '-l', metavar=_("N"), type=int,
+                            dest='limit', default=20,
+                            help=_("Show only the N largest entries "
+                                   "in every section (default: 20, 0 "
+                                   "shows all entries)"))
+
+        return parser
+
+    def largest(self, counts, limit):
+        """Return the items in dictionary `counts` in descending
+        order of their values, truncated to `limit` items."""
+        items = sorted(counts.iteritems(), key=lambda (k, v): v,
+                       reverse=True)
+        if limit > 0:
+            items = items[:limit]
+        return items
+
+    def run(self, options, mbConf=None, **kwArgs):
+        try:
+            modelBase = centralfactory.getModelbase(mbConf)
+        except InstantiationError, e:
+            raise CommandLineError(e)
+
+        try:
+            if options.analyze:
+                modelBase.analyze()
+                modelBase.commit()
+
+            stats = modelBase.getStatistics()
+            if stats is None:
+                raise CommandLineError(_("The modelbase doesn't keep "
+                                         "statistics"))
+
+            out = sys.stdout
+            out.write(_("Statements: %d (%d subjects, %d objects)\n") %
+                      (stats.getRows('statements'),
+                       stats.getDistinct('statements', 'subject'),
+                       stats.getDistinct('statements', 'object')))
+
+            out.write(_("\nPredicates:\n"))
+            for predicate, (triples, subjects, objects) in \
+                    self.largest(stats.getPredicates(), options.limit):
+                out.write('  %12d %12d %12d  %s\n' %
+                          (triples, subjects, objects,
+                           predicate.encode('utf-8')))
+
+            lookupGraphUri = getattr(modelBase, 'lookupGraphUri', None)
+            out.write(_("\nGraphs:\n"))
+            for graphId, triples in \
+                    self.largest(stats.getGraphSizes(), options.limit):
+                graphUri = None
+                if lookupGraphUri is not None:
+                    graphUri = lookupGraphUri(graphId)
+                if graphUri is None:
+                    graphUri = '#%d' % graphId
+                out.write('  %12d  %s\n' % (triples,
+                                            graphUri.encode('utf-8')))
+
+            out.write(_("\nObject types:\n"))
+            for typeId, triples in \
+                    self.largest(stats.getTypeCounts(), options.limit):
+                out.write('  %12d  %d\n' % (triples, typeId))
+        finally:
+            modelBase.close()
+
+        return 0
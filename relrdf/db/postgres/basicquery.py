@@ -24,21 +24,27 @@
 
 import string
 import re
+import itertools
 
 import relrdf
 
 from relrdf.localization import _
 from relrdf.error import InstantiationError, ModifyError
 from relrdf import results, mapping, parsequery, commonns
+from relrdf.parsequerybase import BaseTemplate
+from relrdf.modelbase import Model
 
 from relrdf.typecheck import dynamic
-from relrdf.expression import uri, literal, nodes, build, simplify
+from relrdf.expression import nodes, build, simplify
 from relrdf.mapping import transform, valueref, sqlnodes, emit, sqltranslate
+from relrdf.mapping import joinorder
 
 from relrdf.typecheck.typeexpr import LiteralType, BlankNodeType, \
      ResourceType, RdfNodeType, resourceType, rdfNodeType
 
 from basicsinks import SingleGraphRdfSink
+import termdecode
+import stats
 
 from relrdf.util import nsshortener
 
@@ -46,9 +52,19 @@ def resourceTypeExpr():
     return nodes.Uri(commonns.rdfs.Resource)
 
 class GraphUriMapping(valueref.ValueMapping):
-    """A value mapping converting graph IDs into graph URIs and back."""
+    """A value mapping converting graph IDs into graph URIs and back.
 
-    __slots__ = ()
+    If a graph cache (see `graphcache.GraphCache`) is given, constant
+    graph IDs and URIs of existing graphs are converted at compile
+    time. Otherwise, conversion is done with subqueries on the graphs
+    table."""
+
+    __slots__ = ('graphs',)
+
+    def __init__(self, graphs=None):
+        super(GraphUriMapping, self).__init__()
+
+        self.graphs = graphs
 
     # Give this type of mapping priority in comparisons.
     weight = 80
@@ -74,17 +90,28 @@ class GraphUriMapping(valueref.ValueMapping):
         return expr
 
     def intToExt(self, internal):
+        if self.graphs is not None and \
+                isinstance(internal, sqlnodes.SqlInt):
+            graphUri = self.graphs.getUri(internal.val)
+            if graphUri is not None:
+                return nodes.Uri(graphUri)
+
         return sqlnodes.SqlFunctionCall('rdf_term_resource',
                                         self._subqueryGraph('graph_id', internal, 'graph_uri'))
 
     def extToInt(self, external):
+        if self.graphs is not None and isinstance(external, nodes.Uri):
+            graphId = self.graphs.getId(external.uri)
+            if graphId is not None:
+                return sqlnodes.SqlInt(graphId)
+
         return self._subqueryGraph('graph_uri',
                                    sqlnodes.SqlFunctionCall('text',
                                                             sqlnodes.SqlFunctionCall('rdf_term_to_string', external)),
                                    'graph_id')
 
-def graphUriRef(incarnation, fieldId):
-    return valueref.ValueRef(GraphUriMapping(),
+def graphUriRef(incarnation, fieldId, graphs=None):
+    return valueref.ValueRef(GraphUriMapping(graphs),
                              sqlnodes.SqlFieldRef(incarnation, fieldId))
 
 class TypeMapping(valueref.ValueMapping):
@@ -114,6 +141,26 @@ def typeValueRef(incarnation, fieldId):
 def valueRef(incarnation, fieldId):
     return sqlnodes.SqlTypedFieldRef(incarnation, fieldId)
 
+class TermIdMapping(valueref.ValueMapping):
+    """A value mapping converting the term IDs of the terms table
+    into terms and back. Comparisons between term IDs are done on the
+    integer values, and terms are only retrieved for values that are
+    actually used as terms, e.g., query results."""
+
+    __slots__ = ()
+
+    def intToExt(self, internal):
+        return sqlnodes.SqlFunctionCall('relrdf_term_value', internal)
+
+    def extToInt(self, external):
+        return sqlnodes.SqlFunctionCall('relrdf_term_lookup', external)
+
+def termIdRef(incarnation, fieldId):
+    ref = valueref.ValueRef(TermIdMapping(),
+                            sqlnodes.SqlFieldRef(incarnation, fieldId))
+    ref.staticType = rdfNodeType
+    return ref
+
 class BasicMapper(transform.PureRelationalTransformer):
     """A base mapper for the Postgres basic schema. It handles the
     mapping of type expressions."""
@@ -133,6 +180,12 @@ class BasicMapper(transform.PureRelationalTransformer):
         """Returns the URI of the graph that should receive modifications."""
         raise NotImplementedError
 
+    def getCacheToken(self):
+        """Return a value describing the database state the SQL
+        generated by this mapper depends on. SQL compiled from a
+        query can be reused as long as the token doesn't change."""
+        return None
+
     def DynType(self, expr, subexpr):
         typeIdExpr = sqlnodes.SqlFunctionCall('rdf_term_get_data_type_id', subexpr)
         return valueref.ValueRef(TypeMapping('type_uri'), typeIdExpr)
@@ -155,17 +208,18 @@ class BasicGraphMapper(BasicMapper):
         self.modelbase = modelbase
         self.baseGraph = baseGraph
 
-        # Cache for the statement pattern replacement expressions.
+        # Cache for the statement pattern replacement expressions, as
+        # (base graph ID, `transform.IncarnationTemplate`) pairs.
         self.stmtReplDefault = None
         self.stmtReplOther = None
 
     def _getDefaultGraph(self):
-        return valueref.ValueRef(GraphUriMapping(),
+        return valueref.ValueRef(GraphUriMapping(self.modelbase.getGraphCache()),
                                  sqlnodes.SqlInt(self.baseGraphId));
 
-    def replStatementPattern(self, expr):
+    def _makeStmtRepl(self, defaultGraph):
         # Always either select the default graph or the rest.
-        if isinstance(expr[0], nodes.DefaultGraph):
+        if defaultGraph:
             graphSelector = nodes.Equal(sqlnodes.SqlFieldRef(1, 'graph_id'),
                                         sqlnodes.SqlInt(self.baseGraphId))
         else:
@@ -185,12 +239,27 @@ class BasicGraphMapper(BasicMapper):
         replExpr = \
           nodes.MapResult(['context', 'subject', 'predicate', 'object'],
                           rel,
-                          graphUriRef(1, 'graph_id'),
+                          graphUriRef(1, 'graph_id',
+                                      self.modelbase.getGraphCache()),
                           valueRef(2, 'subject'),
                           valueRef(2, 'predicate'),
                           valueRef(2, 'object'))
 
-        return (replExpr,
+        return transform.IncarnationTemplate(replExpr)
+
+    def replStatementPattern(self, expr):
+        if isinstance(expr[0], nodes.DefaultGraph):
+            cached = self.stmtReplDefault
+            if cached is None or cached[0] != self.baseGraphId:
+                cached = self.stmtReplDefault = \
+                    (self.baseGraphId, self._makeStmtRepl(True))
+        else:
+            cached = self.stmtReplOther
+            if cached is None or cached[0] != self.baseGraphId:
+                cached = self.stmtReplOther = \
+                    (self.baseGraphId, self._makeStmtRepl(False))
+
+        return (cached[1],
                 ('context', 'subject', 'predicate', 'object'))
 
     # TODO: This should belong to a more generic superclass.
@@ -239,6 +308,10 @@ class BasicGraphMapper(BasicMapper):
 
         return sqlnodes.SqlAs(incarnation, expr)
 
+    def getCacheToken(self):
+        # The graph ID is embedded in the generated SQL.
+        return self.modelbase.lookupGraphId(self.baseGraph)
+
     def process(self, expr):
         # Lookup the base graph for every transformation.
         self.baseGraphId = self.modelbase.lookupGraphId(self.baseGraph)
@@ -259,104 +332,183 @@ class GraphMapper(BasicGraphMapper, transform.StandardReifTransformer):
     def getModifGraph(self):
         return self.baseGraph
 
-class BaseResults(object):
-    __slots__ = ('connection',
-                 'cursor',
-                 'length',
-                 'types',)
 
-    def __init__(self, connection, sqlText):
-        self.connection = connection
-        self.cursor = connection.cursor()
+class QuadGraphMapper(GraphMapper):
+    """A single graph mapper using the denormalized quads table,
+    which holds the graph ID together with the statement itself. Every
+    statement pattern is mapped to a single relation instead of a join
+    of the graph_statement and statements tables. The table must have
+    been created with ``relrdf_enable_quads()`` (see
+    `modelbase.BasicModelbase.setQuadTable`)."""
 
-        # Send the query to the database (iterating on this object
-        # will produce the actual results.)
-        if isinstance(sqlText, unicode):
-            sqlText = sqlText.encode('utf-8')
-        self.cursor.execute(sqlText)
+    __slots__ = ()
 
-        self.length = self.cursor.rowcount
+    name = "Single Graph (quads table)"
 
-        self.types = {}
+    def __init__(self, modelbase, baseGraph, **args):
+        if not modelbase.hasQuadTable():
+            raise InstantiationError(_("The database has no quads table"))
 
-    def resultType(self):
-        return NotImplemented
+        super(QuadGraphMapper, self).__init__(modelbase, baseGraph)
 
-    def __len__(self):
-        return self.length
+    def _makeStmtRepl(self, defaultGraph):
+        if defaultGraph:
+            graphSelector = nodes.Equal(sqlnodes.SqlFieldRef(1, 'graph_id'),
+                                        sqlnodes.SqlInt(self.baseGraphId))
+        else:
+            graphSelector = nodes.Different(sqlnodes.SqlFieldRef(1, 'graph_id'),
+                                            sqlnodes.SqlInt(self.baseGraphId))
 
-    def _typeLookup(self, typeId):
+        replExpr = \
+          nodes.MapResult(['context', 'subject', 'predicate', 'object'],
+                          nodes.Select(sqlnodes.SqlRelation(1, 'quads'),
+                                       graphSelector),
+                          graphUriRef(1, 'graph_id',
+                                      self.modelbase.getGraphCache()),
+                          valueRef(1, 'subject'),
+                          valueRef(1, 'predicate'),
+                          valueRef(1, 'object'))
 
-        # Try cache lookup first
-        try:
-            return self.types[typeId]
-        except KeyError:
-            pass
+        return transform.IncarnationTemplate(replExpr)
 
-        # Query database for information about type ID
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT type_uri, lang_tag FROM types WHERE id = %d" % typeId);
-        result = cursor.fetchone()
 
-        # Not in database? (Should not happen)
-        assert not result is None, "Database result uses unknown type ID %d!" % typeId
+class TermIdGraphMapper(GraphMapper):
+    """A single graph mapper using dictionary encoded terms. Every
+    statement pattern is mapped to a single term_quads relation, whose
+    subject, predicate and object are IDs in the terms table. The
+    tables must have been created with ``relrdf_enable_term_ids()``
+    (see `modelbase.BasicModelbase.setTermIdTables`)."""
 
-        # Save back, continue
-        self.types[typeId] = result
-        return result
+    __slots__ = ()
 
-    def _convertResult(self, rawValue, typeId, blankMap):
-        if isinstance(rawValue, str):
-            try:
-                rawValue = rawValue.decode('utf8')
-            except UnicodeDecodeError:
-                rawValue = "<<Character encoding error>>"
+    name = "Single Graph (term IDs)"
 
-        if rawValue is None:
-            value = None
+    def __init__(self, modelbase, baseGraph, **args):
+        if not modelbase.hasTermIdTables():
+            raise InstantiationError(_("The database has no term ID "
+                                       "tables"))
+
+        super(TermIdGraphMapper, self).__init__(modelbase, baseGraph)
+
+    def _makeStmtRepl(self, defaultGraph):
+        if defaultGraph:
+            graphSelector = nodes.Equal(sqlnodes.SqlFieldRef(1, 'graph_id'),
+                                        sqlnodes.SqlInt(self.baseGraphId))
+        else:
+            graphSelector = nodes.Different(sqlnodes.SqlFieldRef(1, 'graph_id'),
+                                            sqlnodes.SqlInt(self.baseGraphId))
 
-        # Resource
-        elif typeId == 0:
-            value = uri.Uri(rawValue)
+        replExpr = \
+          nodes.MapResult(['context', 'subject', 'predicate', 'object'],
+                          nodes.Select(sqlnodes.SqlRelation(1, 'term_quads'),
+                                       graphSelector),
+                          graphUriRef(1, 'graph_id',
+                                      self.modelbase.getGraphCache()),
+                          termIdRef(1, 'subject'),
+                          termIdRef(1, 'predicate'),
+                          termIdRef(1, 'object'))
+
+        return transform.IncarnationTemplate(replExpr)
+
+# Default number of rows fetched at once from streamed results.
+STREAM_BATCH_SIZE = 1000
 
-            # Needs reinstantiation?
-            if value.isBlank() and value.endswith('#reinst'):
-                try:
-                    value = blankMap[rawValue]
-                except KeyError:
-                    value = blankMap[rawValue] = uri.newBlank()
+# Number of rows fetched and decoded at once from the client-side
+# results.
+FETCH_BATCH_SIZE = 5000
 
-        # Plain literal
-        elif typeId == 1:
-            value = literal.Literal(rawValue)
+# Source of unique names for server-side cursors.
+_cursorIds = itertools.count()
 
-        # Literal
+class BaseResults(object):
+    __slots__ = ('connection',
+                 'cursor',
+                 'length',
+                 'typeCatalog',
+                 'decoder',
+
+                 '_sqlText',
+                 '_cursorName',
+                 '_batchSize',)
+
+    def __init__(self, connection, typeCatalog, sqlText, params=None,
+                 batchSize=None):
+        self.connection = connection
+        self.typeCatalog = typeCatalog
+        self.cursor = connection.cursor()
+
+        if isinstance(sqlText, unicode):
+            sqlText = sqlText.encode('utf-8')
+        self._sqlText = sqlText
+        self._batchSize = batchSize
+
+        if batchSize is None:
+            # Send the query to the database (iterating on this object
+            # will produce the actual results.)
+            self._cursorName = None
+            if params is None:
+                self.cursor.execute(sqlText)
+            else:
+                self.cursor.execute(sqlText, params)
+
+            self.length = self.cursor.rowcount
         else:
+            # Stream the results through a server-side cursor. Rows
+            # are fetched in batches while iterating, and the length
+            # is only computed if requested.
+            assert params is None
+            self._cursorName = 'relrdf_cursor%d' % _cursorIds.next()
+            self.cursor.execute('DECLARE %s NO SCROLL CURSOR FOR %s' %
+                                (self._cursorName, sqlText))
 
-            # Get type URI and language tag
-            (typeUri, langTag) = self._typeLookup(typeId)
+            self.length = None
 
-            # Expect everything that's not a resource to be some
-            # sort of literal
-            value = literal.Literal(rawValue, typeUri, langTag)
+        self.decoder = termdecode.TermDecoder(self._lookupType)
 
-        return value
+    def resultType(self):
+        return NotImplemented
 
-    def _splitPair(self, pair):
+    def _countRows(self):
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT count(*) FROM (%s) AS results' %
+                       self._sqlText)
+        count = cursor.fetchone()[0]
+        cursor.close()
+        return count
 
-        # Split the string representation of a value/type-id pair
-        # as it's coming from the database into both components
-        # (Note the first part is enclosed in quotes and the second
-        #  one is a hexadecimal number)
+    def __len__(self):
+        if self.length is None:
+            # Streamed results. Count them in a separate query.
+            self.length = self._countRows()
+        return self.length
 
-        if pair is None:
-            return (None, None)
+    def _iterBatches(self):
+        """Iterate over the raw result rows, in lists of rows."""
+        if self._cursorName is None:
+            rows = self.cursor.fetchmany(FETCH_BATCH_SIZE)
+            while len(rows) > 0:
+                yield rows
+                rows = self.cursor.fetchmany(FETCH_BATCH_SIZE)
         else:
-            (val, _, typeId) = pair.rpartition('^^')
-            return (val[1:-1], int(typeId, 16))
+            fetchText = 'FETCH %d FROM %s' % (self._batchSize,
+                                              self._cursorName)
+            while True:
+                self.cursor.execute(fetchText)
+                rows = self.cursor.fetchall()
+                if len(rows) == 0:
+                    break
+                yield rows
+
+    def _lookupType(self, typeId):
+        # Types created by the current transaction aren't in the
+        # catalog yet, and can only be seen through our connection.
+        # The decoder caches them for the lifetime of the results.
+        return self.typeCatalog.getType(typeId, self.connection)
 
     def close(self):
         if self.cursor is not None:
+            if self._cursorName is not None:
+                self.cursor.execute('CLOSE %s' % self._cursorName)
             self.cursor.close()
             self.cursor = None
 
@@ -372,24 +524,19 @@ class BaseResults(object):
 class ColumnResults(BaseResults):
     __slots__ = ('columnNames',)
 
-    def __init__(self, connection, columnNames, sqlText):
-        super(ColumnResults, self).__init__(connection, sqlText)
+    def __init__(self, connection, typeCatalog, columnNames, sqlText,
+                 params=None, batchSize=None):
+        super(ColumnResults, self).__init__(connection, typeCatalog,
+                                            sqlText, params, batchSize)
         self.columnNames = columnNames
 
     def resultType(self):
         return results.RESULTS_COLUMNS
 
     def iterAll(self):
-        row = self.cursor.fetchone()
-        while row is not None:
-            result = []
-            blankMap = {}
-            for pair in row:
-                (val, type) = self._splitPair(pair)
-                result.append(self._convertResult(val, type, blankMap))
-            yield tuple(result)
-
-            row = self.cursor.fetchone()
+        for rows in self._iterBatches():
+            for row in self.decoder.decodeRows(rows):
+                yield row
 
         self.close()
 
@@ -399,30 +546,29 @@ class ColumnResults(BaseResults):
 class StmtResults(BaseResults):
     __slots__ = ('stmtsPerRow',)
 
-    def __init__(self, connection, stmtsPerRow, sqlText):
-        super(StmtResults, self).__init__(connection, sqlText)
+    def __init__(self, connection, typeCatalog, stmtsPerRow, sqlText,
+                 params=None, batchSize=None):
+        super(StmtResults, self).__init__(connection, typeCatalog,
+                                          sqlText, params, batchSize)
         self.stmtsPerRow = stmtsPerRow
-        self.length *= stmtsPerRow
+        if self.length is not None:
+            self.length *= stmtsPerRow
 
     def resultType(self):
         return results.RESULTS_STMTS
 
-    def iterAll(self):
-        row = self.cursor.fetchone()
-        while row is not None:
-
-            # The blank node reinstationation map is kept across statements, as
-            # statements in the same row might refer to the same blank nodes.
-            blankMap = {}
+    def _countRows(self):
+        return super(StmtResults, self)._countRows() * self.stmtsPerRow
 
-            for i in range(self.stmtsPerRow):
-                result = []
-                for pair in row[i*3 : i*3+3]:
-                    (val, type) = self._splitPair(pair)
-                    result.append(self._convertResult(val, type, blankMap))
-                yield tuple(result)
-
-            row = self.cursor.fetchone()
+    def iterAll(self):
+        # Blank nodes are reinstantiated once per row, since
+        # statements in the same row might refer to the same blank
+        # nodes.
+        rowLength = self.stmtsPerRow * 3
+        for rows in self._iterBatches():
+            for row in self.decoder.decodeRows(rows):
+                for i in xrange(0, rowLength, 3):
+                    yield row[i:i + 3]
 
         self.close()
 
@@ -432,8 +578,9 @@ class StmtResults(BaseResults):
 class ExistsResults(BaseResults):
     __slots__ = ('_value',)
 
-    def __init__(self, connection, sqlText):
-        super(ExistsResults, self).__init__(connection, sqlText)
+    def __init__(self, connection, typeCatalog, sqlText, params=None):
+        super(ExistsResults, self).__init__(connection, typeCatalog,
+                                            sqlText, params)
         self._value = None
 
     def resultType(self):
@@ -452,12 +599,14 @@ class ExistsResults(BaseResults):
     value = property(getValue)
 
 
-class BasicModel(object):
+class BasicModel(Model):
     __slots__ = ('modelbase',
                  'mappingTransf',
                  'modelArgs',
                  '_connection',
-                 '_changeCursor',)
+                 '_changeCursor',
+                 '_batchSize',
+                 '_joinOrdering',)
 
     def __init__(self, modelbase, connection, mappingTransf, **modelArgs):
         self.modelbase = modelbase
@@ -469,6 +618,36 @@ class BasicModel(object):
         # progress.
         self._changeCursor = None
 
+        # Batch size for streamed results, or None if results aren't
+        # streamed.
+        self._batchSize = None
+
+        # Reorder joins based on the store statistics. Off until
+        # benchmarks (see test/benchjoins.py) show it pays off.
+        self._joinOrdering = False
+
+    def setStreaming(self, streaming, batchSize=None):
+        if streaming:
+            if batchSize is None:
+                batchSize = STREAM_BATCH_SIZE
+            self._batchSize = batchSize
+        else:
+            self._batchSize = None
+
+    def getStreaming(self):
+        return self._batchSize
+
+    def setJoinOrdering(self, joinOrdering):
+        """Enable or disable cost based join ordering (see
+        `relrdf.mapping.joinorder`). If disabled, which is the
+        default, relations are joined in the order they appear in the
+        query.
+
+        The order is chosen when a query is compiled, and compiled
+        queries are cached, so it reflects the statistics at the time
+        the query was first run."""
+        self._joinOrdering = bool(joinOrdering)
+
     def _exprToSql(self, expr):
         # Get rid of Dataset nodes.
         expr = transform.DatasetTransformer().process(expr)
@@ -495,8 +674,13 @@ class BasicModel(object):
         # Convert select predicates to SQL
         expr = sqltranslate.translateSelectToSqlBool(expr)
 
+        # Choose the join order.
+        if self._joinOrdering:
+            estimator = stats.BasicEstimator(self.modelbase.getStatistics())
+            expr = joinorder.orderJoins(expr, estimator)
+
         # Generate SQL.
-        return emit.emit(expr)
+        return emit.emit(expr, self.modelbase.getTypeCatalog())
 
     _versionIdPattern = re.compile('[0-9]')
 
@@ -535,8 +719,166 @@ class BasicModel(object):
             self.rollback()
             raise
 
+    def _compile(self, expr):
+        """Translate `expr` into SQL. Return the SQL text and the
+        graphs that were resolved at compile time (see
+        `GraphCache.stopRecording`)."""
+        graphs = self.modelbase.getGraphCache()
+        graphs.startRecording()
+        try:
+            sqlText = self._exprToSql(expr)
+        finally:
+            usedGraphs = graphs.stopRecording()
+
+        return sqlText, usedGraphs
+
+    def _entryValid(self, entry, cacheToken):
+        """Check whether a query cache entry can be used."""
+        return entry[0] == cacheToken and \
+            self.modelbase.getGraphCache().checkGraphs(entry[1])
+
+    def _queryCacheKey(self, queryLanguage, queryText):
+        # Only line ends and surrounding whitespace are normalized,
+        # anything else could be significant (e.g., in comments.)
+        queryText = '\n'.join(queryText.strip().splitlines())
+
+        return (queryLanguage.lower(),
+                queryText,
+                frozenset(self.getPrefixes().iteritems()),
+                self.__class__,
+                self.mappingTransf.__class__,
+                tuple(sorted(self.modelArgs.iteritems())),
+                self._joinOrdering)
+
+    def _resultShape(self, expr):
+        # Find the main result mapping expression.
+        mappingExpr = expr
+        while not isinstance(mappingExpr, nodes.QueryResult):
+            mappingExpr = mappingExpr[0]
+
+        if mappingExpr.__class__ == nodes.MapResult:
+            # Get the column names before transforming to SQL.
+            return ColumnResults, tuple(mappingExpr.columnNames)
+        elif mappingExpr.__class__ == nodes.StatementResult:
+            # Get the statement count before transforming to SQL.
+            return StmtResults, len(mappingExpr) - 1
+        elif mappingExpr.__class__ == nodes.ExistsResult:
+            return ExistsResults, None
+        else:
+            assert False, 'No mapping expression'
+
+    def _makeResults(self, resultCls, shape, sqlText, params=None):
+        typeCatalog = self.modelbase.getTypeCatalog()
+        if resultCls is ColumnResults:
+            return ColumnResults(self._connection, typeCatalog, list(shape),
+                                 sqlText, params, self._batchSize)
+        elif resultCls is StmtResults:
+            return StmtResults(self._connection, typeCatalog, shape,
+                               sqlText, params, self._batchSize)
+        else:
+            return resultCls(self._connection, typeCatalog, sqlText, params)
+
+    def _queryTemplate(self, template, params):
+        """Run a query from a template, using a server-side prepared
+        statement.
+
+        The template is compiled once for every combination of
+        parameter kinds (see `Template.getTermKind`), with
+        placeholders in the place of the actual parameter values. The
+        values are passed to the prepared statement as bind
+        parameters. Templates whose placeholders don't appear
+        unchanged in the compiled SQL are run as plain queries."""
+        terms = template.getTerms(params)
+        names = sorted(terms.keys())
+
+        if self._batchSize is not None:
+            # Server-side cursors cannot be declared for prepared
+            # statements.
+            return self.query(template.queryLanguage,
+                              template.substitute(terms))
+
+        cache = self.modelbase.getQueryCache()
+        cacheKey = self._queryCacheKey(template.queryLanguage,
+                                       template.template) + \
+            (tuple([(name, template.getTermKind(terms[name]))
+                    for name in names]),)
+        cacheToken = self.mappingTransf.getCacheToken()
+
+        entry = cache.get(cacheKey)
+        if entry is None or not self._entryValid(entry, cacheToken):
+            placeholders = template.getPlaceholders(terms)
+            queryText = template.substitute(placeholders)
+            queryObject = parsequery.parseQuery(template.queryLanguage,
+                                                queryText, model=self,
+                                                **self.modelArgs)
+            expr = queryObject.getExpression()
+
+            if isinstance(expr, nodes.ModifOperation):
+                # Modifications aren't prepared, run them as usual.
+                return self.query(template.queryLanguage,
+                                  template.substitute(terms))
+
+            resultCls, shape = self._resultShape(expr)
+            sqlText, usedGraphs = self._compile(expr)
+
+            # Replace the placeholder values by references to the
+            # statement parameters. Placeholders changed during
+            # compilation can't be replaced, and the template is
+            # never prepared then (the SQL text is cached as None).
+            paramNames = []
+            for name in names:
+                quoted = emit.quote(placeholders[name])
+                if quoted not in sqlText:
+                    sqlText = None
+                    paramNames = []
+                    break
+                paramNames.append(name)
+                sqlText = sqlText.replace(quoted, '$%d' % len(paramNames))
+
+            entry = (cacheToken, usedGraphs, resultCls, shape, sqlText,
+                     tuple(paramNames))
+            cache.put(cacheKey, entry)
+
+        resultCls, shape, sqlText, paramNames = entry[2:]
+
+        if sqlText is None:
+            return self.query(template.queryLanguage,
+                              template.substitute(terms))
+
+        self.modelbase.flush()
+
+        stmtName = self.modelbase.prepareStatement(sqlText, len(paramNames))
+        values = [unicode(terms[name]).encode('utf-8')
+                  for name in paramNames]
+        if len(values) > 0:
+            execText = 'EXECUTE %s (%s)' % \
+                (stmtName, ', '.join(['%s'] * len(values)))
+        else:
+            execText = 'EXECUTE %s' % stmtName
+            values = None
+
+        return self._makeResults(resultCls, shape, execText, values)
+
     def query(self, firstArg, queryText=None, fileName=_("<unknown>"),
               **keywords):
+        # Queries given as text can be looked up in the compiled
+        # query cache.
+        cacheKey = None
+        if isinstance(firstArg, basestring) and \
+                isinstance(queryText, basestring):
+            cache = self.modelbase.getQueryCache()
+            cacheKey = self._queryCacheKey(firstArg, queryText)
+            cacheToken = self.mappingTransf.getCacheToken()
+
+            entry = cache.get(cacheKey)
+            if entry is not None and self._entryValid(entry, cacheToken):
+                self.modelbase.flush()
+                return self._makeResults(*entry[2:])
+
+        if isinstance(firstArg, BaseTemplate):
+            assert queryText is None
+            return self._queryTemplate(firstArg, keywords)
+
         if isinstance(firstArg, parsequery.BaseQuery):
             queryObject = firstArg
         else:
@@ -554,25 +896,14 @@ class BasicModel(object):
         if isinstance(expr, nodes.ModifOperation):
             return self._processModifOp(expr)
 
-        # Find the main result mapping expression.
-        mappingExpr = expr
-        while not isinstance(mappingExpr, nodes.QueryResult):
-            mappingExpr = mappingExpr[0]
+        resultCls, shape = self._resultShape(expr)
+        sqlText, usedGraphs = self._compile(expr)
 
-        if mappingExpr.__class__ == nodes.MapResult:
-            # Get the column names before transforming to SQL.
-            columnNames = list(mappingExpr.columnNames)
-            return ColumnResults(self._connection, columnNames,
-                                 self._exprToSql(expr))
-        elif mappingExpr.__class__ == nodes.StatementResult:
-            # Get the statement count before transforming to SQL.
-            stmtsPerRow = len(mappingExpr) - 1
-            return StmtResults(self._connection, stmtsPerRow,
-                               self._exprToSql(expr))
-        elif mappingExpr.__class__ == nodes.ExistsResult:
-            return ExistsResults(self._connection, self._exprToSql(expr))
-        else:
-            assert False, 'No mapping expression'
+        if cacheKey is not None:
+            cache.put(cacheKey, (cacheToken, usedGraphs, resultCls, shape,
+                                 sqlText))
+
+        return self._makeResults(resultCls, shape, sqlText)
 
     def querySQL(self, firstArg, queryText=None, fileName=_("<unknown>"),
                  **keywords):
@@ -625,6 +956,8 @@ class TwoWayModel(BasicModel):
 
 _modelFactories = {
     'plain': (BasicModel, GraphMapper),
+    'quads': (BasicModel, QuadGraphMapper),
+    'termids': (BasicModel, TermIdGraphMapper),
     'twoway': (TwoWayModel, GraphMapper)
     }
 
@@ -23,6 +23,7 @@
 
 
 from relrdf.error import InstantiationError
+from relrdf.expression import uri, interning
 
 class SingleGraphRdfSink(object):
     """An RDF sink that sends all tuples to a single graph in the
@@ -32,7 +33,8 @@ class SingleGraphRdfSink(object):
                  'baseGraph',
                  'verbose',
                  'delete',
-                 'graphId',)
+                 'graphId',
+                 '_graphIds')
 
     def __init__(self, modelbase, baseGraph, verbose=False, delete=False):
         self.modelbase = modelbase
@@ -40,6 +42,9 @@ class SingleGraphRdfSink(object):
         self.verbose = verbose
         self.delete = delete
 
+        # IDs of the graphs named by encodedTriple calls.
+        self._graphIds = {}
+
         self.setGraph(self.baseGraph)
 
     def setGraph(self, graphUri):
@@ -52,7 +57,98 @@ class SingleGraphRdfSink(object):
         self.modelbase.queueTriple(self.graphId, self.delete, subject,
                                    pred, object)
 
+    def encodedTriple(self, subject, pred, object, isResource,
+                      typeUri=None, lang=None, graphUri=None):
+        if graphUri is None:
+            graphId = self.graphId
+        else:
+            try:
+                graphId = self._graphIds[graphUri]
+            except KeyError:
+                graphId = int(self.modelbase.lookupGraphId(
+                        graphUri.decode('utf-8'), create=True))
+                self._graphIds[graphUri] = graphId
+
+        self.modelbase.queueEncoded(graphId, self.delete, subject, pred,
+                                    object, isResource, typeUri, lang)
+
+    def close(self):
+        self.modelbase = None
+
+
+class StagingSink(object):
+    """A sink storing statements in a staging table (see
+    `BasicModelbase.getStagingSink`). Rows are sent to the database
+    in batches, and when the sink is closed."""
+
+    __slots__ = ('modelbase',
+                 'table',
+                 'count',
+
+                 '_lines',
+                 '_graphUris')
+
+    def __init__(self, modelbase, table):
+        self.modelbase = modelbase
+        self.table = table
+
+        # Number of statements received.
+        self.count = 0
+
+        # Rows in COPY format not yet sent to the database.
+        self._lines = []
+
+        # Normalized (encoded) graph URIs.
+        self._graphUris = {}
+
+    def triple(self, subject, pred, object):
+        if isinstance(object, uri.Uri):
+            self.encodedTriple(interning.encode(subject),
+                               interning.encode(pred),
+                               interning.encode(object), True)
+        else:
+            typeUri = lang = None
+            if object.typeUri is not None:
+                typeUri = interning.encode(object.typeUri)
+            elif object.lang is not None:
+                lang = unicode(object.lang.lower()).encode('utf-8')
+            self.encodedTriple(interning.encode(subject),
+                               interning.encode(pred),
+                               interning.encode(object), False,
+                               typeUri, lang)
+
+    def encodedTriple(self, subject, pred, object, isResource,
+                      typeUri=None, lang=None, graphUri=None):
+        escape = self.modelbase._copyEscape
+
+        if graphUri is not None:
+            try:
+                graphUri = self._graphUris[graphUri]
+            except KeyError:
+                normalized = self.modelbase.getPrefixes(). \
+                    normalizeUri(graphUri.decode('utf-8'))
+                graphUri = self._graphUris[graphUri] = \
+                    escape(unicode(normalized).encode('utf-8'))
+
+        self._lines.append('%s\t%s\t%s\t%s\t%s\t%s\t%s\n' %
+                           (graphUri or '\\N', escape(subject),
+                            escape(pred), isResource and 't' or 'f',
+                            typeUri is not None and escape(typeUri) or '\\N',
+                            lang is not None and escape(lang) or '\\N',
+                            escape(object)))
+        self.count += 1
+
+        if len(self._lines) >= self.modelbase.ROWS_PER_COPY:
+            self.flush()
+
+    def flush(self):
+        """Send the pending rows to the database."""
+        if len(self._lines) > 0:
+            self.modelbase.stageLines(self.table, self._lines)
+            self._lines = []
+
     def close(self):
+        self.flush()
         self.modelbase = None
 
 
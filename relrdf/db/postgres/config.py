@@ -104,11 +104,53 @@ class PlainModelConfiguration(Configuration):
         return parser
 
 
+class QuadsModelConfiguration(PlainModelConfiguration):
+    __slots__ = ()
+
+    name = 'quads'
+
+    @classmethod
+    def _createCmdLineParser(cls):
+        parser = ArgumentParser(
+            description=_("Options to access plain graphs through the "
+                          "quads table"))
+
+        parser.add_argument('--graphid', '--uri', metavar='URI',
+                            help=_("set the graph identified by URI "
+                                   "as default graph"),
+                            required=True)
+
+        return parser
+
+
+class TermIdsModelConfiguration(PlainModelConfiguration):
+    __slots__ = ()
+
+    name = 'termids'
+
+    @classmethod
+    def _createCmdLineParser(cls):
+        parser = ArgumentParser(
+            description=_("Options to access plain graphs through the "
+                          "dictionary encoded term tables"))
+
+        parser.add_argument('--graphid', '--uri', metavar='URI',
+                            help=_("set the graph identified by URI "
+                                   "as default graph"),
+                            required=True)
+
+        return parser
+
+
 def getConfigClass(path):
     if len(path) == 0:
         return PostgresConfiguration
     elif path[0] == 'plain':
         return PlainModelConfiguration
+    elif path[0] == 'quads':
+        return QuadsModelConfiguration
+    elif path[0] == 'termids':
+        return TermIdsModelConfiguration
     else:
         raise InstantiationError(_("'%s' is not a valid model type for a "
                                    "Postgres modelbase") % path[0])
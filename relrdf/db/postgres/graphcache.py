@@ -0,0 +1,123 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""A cache of the graph URIs and IDs in a modelbase."""
+
+
+class GraphCache(object):
+    """A bidirectional mapping between graph URIs and graph IDs,
+    filled lazily from the ``graphs`` table.
+
+    `lookupId` and `lookupUri` are callables retrieving the ID for a
+    (normalized) graph URI and the URI for a graph ID from the
+    database, and returning ``None`` if the graph doesn't
+    exist. Missing graphs are not cached, since they may be created
+    later.
+
+    Graph caches are referenced from value mappings in query
+    expressions. Copying an expression doesn't copy the cache."""
+
+    __slots__ = ('_lookupId',
+                 '_lookupUri',
+
+                 '_ids',
+                 '_uris',
+                 '_recorded')
+
+    def __init__(self, lookupId, lookupUri):
+        self._lookupId = lookupId
+        self._lookupUri = lookupUri
+
+        self._recorded = None
+        self.clear()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memoDict):
+        return self
+
+    def clear(self):
+        """Forget all cached graphs."""
+        self._ids = {}
+        self._uris = {}
+
+    def add(self, graphUri, graphId):
+        """Register a new graph."""
+        self._ids[graphUri] = graphId
+        self._uris[graphId] = graphUri
+
+    def startRecording(self):
+        """Start recording the graphs found by `getId` and `getUri`."""
+        self._recorded = set()
+
+    def stopRecording(self):
+        """Stop recording and return the graphs found since the
+        last call to `startRecording` as a set of ``(URI, ID)``
+        pairs."""
+        recorded = frozenset(self._recorded)
+        self._recorded = None
+        return recorded
+
+    def checkGraphs(self, graphs):
+        """Check that the ``(URI, ID)`` pairs in `graphs` (as
+        returned by `stopRecording`) are still valid."""
+        for graphUri, graphId in graphs:
+            if self.getId(graphUri) != graphId:
+                return False
+        return True
+
+    def remove(self, graphUri):
+        """Forget about a graph, e.g., because it was deleted."""
+        graphId = self._ids.pop(graphUri, None)
+        if graphId is not None:
+            del self._uris[graphId]
+
+    def getId(self, graphUri):
+        """Return the ID of the graph with the given (normalized) URI,
+        or ``None`` if there is no such graph."""
+        graphId = self._ids.get(graphUri)
+        if graphId is None:
+            graphId = self._lookupId(graphUri)
+            if graphId is None:
+                return None
+            self.add(graphUri, graphId)
+
+        if self._recorded is not None:
+            self._recorded.add((graphUri, graphId))
+        return graphId
+
+    def getUri(self, graphId):
+        """Return the URI of the graph with the given ID, or ``None``
+        if there is no such graph."""
+        graphUri = self._uris.get(graphId)
+        if graphUri is None:
+            graphUri = self._lookupUri(graphId)
+            if graphUri is None:
+                return None
+            self.add(graphUri, graphId)
+
+        if self._recorded is not None:
+            self._recorded.add((graphUri, graphId))
+        return graphUri
@@ -29,11 +29,25 @@ from os import path
 RDF_TERM_SQL = 'rdf_term/rdf_term.sql'
 INITDB_SQL = 'initdb.sql'
 SCHEMA_SQL = 'schema/create-basicschema-1.sql'
+UPGRADE_SQL = 'schema/upgrade-basicschema-%d.sql'
 USER_SQL = 'schema/create-user.sql'
 
+# Current version of the basic schema. SCHEMA_SQL creates version 1,
+# every later version N is reached by running UPGRADE_SQL % N on the
+# previous one.
+SCHEMA_VERSION = 7
+
 scriptDir = path.dirname(__file__)
 
 
+def getUpgradeScripts(version):
+    """Return the paths of the SQL scripts needed to upgrade a basic
+    schema from `version` to the current version, in the order they
+    must be run."""
+    return [path.join(scriptDir, UPGRADE_SQL % v)
+            for v in range(version + 1, SCHEMA_VERSION + 1)]
+
+
 def usage():
     print """
 Usage:
@@ -56,6 +70,14 @@ Actions:
 
   --create-user=name  Create a new user
   --init-user=name    Give all necessary privileges to the specified user
+
+  --enable-quads   Create the denormalized quads table used by the
+                   'quads' model type (can take a while)
+  --disable-quads  Drop the quads table
+
+  --enable-term-ids   Create the dictionary encoded term tables used
+                      by the 'termids' model type (can take a while)
+  --disable-term-ids  Drop the term tables
 """ % path.basename(sys.argv[0])
     exit(1)
 
@@ -65,7 +87,8 @@ def main():
     try:
         shortOpts = "d:h:p:U:"
         longOpts = ["help", "fast", "create-db", "init-db", "create-user=",
-                    "init-user="]
+                    "init-user=", "enable-quads", "disable-quads",
+                    "enable-term-ids", "disable-term-ids"]
         opts, args = getopt.getopt(argv, shortOpts, longOpts)
     except getopt.GetoptError:
         usage()
@@ -78,6 +101,8 @@ def main():
     initDB = False
     createUsers = []
     initUsers = []
+    quads = None
+    termIds = None
     pgOpts = []
     for opt, val in opts:
         if opt == '-d':
@@ -99,9 +124,18 @@ def main():
             createUsers.append(val)
         elif opt == '--init-user':
             initUsers.append(val)
+        elif opt == '--enable-quads':
+            quads = True
+        elif opt == '--disable-quads':
+            quads = False
+        elif opt == '--enable-term-ids':
+            termIds = True
+        elif opt == '--disable-term-ids':
+            termIds = False
 
     # Nothing to do?
-    if not createDB and not initDB and createUsers == [] and initUsers == []:
+    if not createDB and not initDB and createUsers == [] and \
+            initUsers == [] and quads is None and termIds is None:
         usage()
         sys.exit(1)
 
@@ -129,10 +163,12 @@ def main():
     # Initialize database.
     if initDB:
         # The schema.
-        sqlFile = path.join(scriptDir, SCHEMA_SQL)
-        if 0 != call(['psql', '-d', db] + pgOpts + ['-f', sqlFile]):
-            print "Failed to create schema for database '%s'!" % db
-            exit(1)
+        sqlFiles = [path.join(scriptDir, SCHEMA_SQL)] + \
+            getUpgradeScripts(1)
+        for sqlFile in sqlFiles:
+            if 0 != call(['psql', '-d', db] + pgOpts + ['-f', sqlFile]):
+                print "Failed to create schema for database '%s'!" % db
+                exit(1)
 
     # Create user(s).
     for user in createUsers:
@@ -150,6 +186,19 @@ def main():
                 % (user, db)
             exit(1)
 
+    # Create or drop the optional tables.
+    for name, enabled in (('quads', quads), ('term_ids', termIds)):
+        if enabled is None:
+            continue
+        if enabled:
+            sqlCmd = 'SELECT relrdf_enable_%s();' % name
+        else:
+            sqlCmd = 'SELECT relrdf_disable_%s();' % name
+        if 0 != call(['psql', '-d', db] + pgOpts + ['-c', sqlCmd]):
+            print "Failed to change the %s tables in database '%s'!" % \
+                (name, db)
+            exit(1)
+
     print "\nAll done!"
 
 
@@ -23,34 +23,57 @@
 
 
 import string
-
-import pgdb
+import sys
+import threading
+import Queue
 
 from relrdf.localization import _
 from relrdf import error
 from relrdf.error import InstantiationError
-from relrdf.expression import uri, literal
+from relrdf.expression import uri, literal, interning
 from relrdf.util.nsshortener import NamespaceUriShortener
+from relrdf.modelbase import Modelbase
 from relrdf import commonns
 
 import basicquery
 import basicsinks
+import managedb
+import pool
+import graphcache
 
-class BasicModelbase(object):
+class BasicModelbase(Modelbase):
     """Model base for the basic schema."""
 
     __slots__ = ('db',
                  'verbose',
+                 'bulkLoad',
 
+                 '_pool',
                  '_prefixes',
+                 '_graphs',
                  '_connection',
                  '_modifCursor',
                  '_deleting',
-                 '_pendingRows')
+                 '_pendingRows',
+                 '_literalTypeIds',
+                 '_modified',
+
+                 'pipelined',
+                 '_writer',
+                 '_writerQueue',
+                 '_writerError')
 
     # Maximum number of rows per insert query.
     ROWS_PER_QUERY = 10000
 
+    # Maximum number of rows per COPY operation (bulk load mode).
+    ROWS_PER_COPY = 100000
+
+    # Maximum number of full batches waiting for the background
+    # writer (pipelined mode). One more batch may be in the process
+    # of being written.
+    PIPELINE_DEPTH = 1
+
     name = "PostgreSQL (basic schema)"
     parameterInfo = ({"name": "host",
                       "label": "Database Host",
@@ -80,49 +103,77 @@ class BasicModelbase(object):
     def getModelInfo(self, **parameters):
         return basicquery.getModelMappers()
 
-    def __init__(self, db, verbose=False, **params):
-        self.db = db
+    def __init__(self, connPool, verbose=False, bulkLoad=False,
+                 pipelined=False):
+        self.db = connPool.params['database']
         self.verbose = verbose
 
-        # Create the connection.
-        self._connection = pgdb.connect(database=self.db, **params)
+        # If true, pending rows are sent to the database using COPY
+        # instead of one INSERT per row.
+        self.bulkLoad = bulkLoad
 
-        # Get the prefixes from the database:
-        cursor = self._connection.cursor()
-        cursor.execute("""
-            SELECT p.prefix, p.namespace
-            FROM prefixes p
-            """)
+        # If true, full batches of pending rows are written by a
+        # background thread (see `setPipelined`).
+        self.pipelined = pipelined
+        self._writer = None
+        self._writerQueue = None
+        self._writerError = None
 
-        self._prefixes = NamespaceUriShortener()
+        # Check a connection out of the pool. It is returned when the
+        # modelbase is closed.
+        self._pool = connPool
+        self._connection = connPool.getConnection()
 
-        row = cursor.fetchone()
-        while row is not None:
-            (prefix, namespace) = row
-            self._prefixes[prefix] = uri.Namespace(namespace)
-            row = cursor.fetchone()
+        # The prefixes are cached by the pool.
+        self._prefixes = NamespaceUriShortener()
+        self._prefixes.addPrefixes(connPool.getPrefixes())
 
-        cursor.close()
+        # Graph URIs and IDs are cached as they are looked up.
+        self._graphs = graphcache.GraphCache(self._selectGraphId,
+                                             self._selectGraphUri)
 
         # Prepare for database modification.
         self._modifCursor = self._connection.cursor()
         self._modifSetup()
 
-    def lookupGraphId(self, graphUri, create=False):
-        # Normalize URI
-        graphUri = self._prefixes.normalizeUri(graphUri).encode('utf-8')
+    def _selectGraphId(self, graphUri):
+        self._waitWriter()
 
-        # Get a cursor.
         cursor = self._connection.cursor()
-
-        # Lookup the graph.
         cursor.execute("""
             SELECT graph_id
             FROM graphs
-            WHERE graph_uri = '%s';""" % graphUri)
+            WHERE graph_uri = %s""", (graphUri.encode('utf-8'),))
+        result = cursor.fetchone()
+        cursor.close()
+
+        if result is None:
+            return None
+        return result[0]
+
+    def _selectGraphUri(self, graphId):
+        self._waitWriter()
+
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT graph_uri
+            FROM graphs
+            WHERE graph_id = %d""" % graphId)
         result = cursor.fetchone()
-        if not result is None:
-            return result[0]
+        cursor.close()
+
+        if result is None:
+            return None
+        return result[0].decode('utf-8')
+
+    def lookupGraphId(self, graphUri, create=False):
+        # Normalize URI
+        graphUri = unicode(self._prefixes.normalizeUri(graphUri))
+
+        # Lookup the graph.
+        graphId = self._graphs.getId(graphUri)
+        if graphId is not None:
+            return graphId
 
         # Should not create? Return ID of an empty graph
         # (graph IDs normally start at 1).
@@ -130,16 +181,30 @@ class BasicModelbase(object):
             return 0
 
         # Insert new graph.
+        self._waitWriter()
+        cursor = self._connection.cursor()
         cursor.execute("""
             INSERT INTO graphs (graph_uri)
-            VALUES ('%s')
-            RETURNING graph_id;""" % graphUri)
+            VALUES (%s)
+            RETURNING graph_id""", (graphUri.encode('utf-8'),))
         result = cursor.fetchone()
+        cursor.close()
         assert not result is None, "Could not create a new graph!"
+        self._modified = True
 
         # Done.
+        self._graphs.add(graphUri, result[0])
         return result[0]
 
+    def lookupGraphUri(self, graphId):
+        """Return the URI of the graph with ID `graphId`, or
+        ``None`` if there is no such graph."""
+        return self._graphs.getUri(graphId)
+
+    def getGraphCache(self):
+        """Return the graph URI and ID cache of this modelbase."""
+        return self._graphs
+
 
     #
     # Basic model base functions
@@ -155,6 +220,143 @@ class BasicModelbase(object):
     def getPrefixes(self):
         return self._prefixes
 
+    def getQueryCache(self):
+        """Return the compiled query cache for this modelbase's
+        database."""
+        return self._pool.queryCache
+
+    def getTypeCatalog(self):
+        """Return the literal type catalog for this modelbase's
+        database."""
+        return self._pool.typeCatalog
+
+    def getStatistics(self):
+        """Return the store statistics for this modelbase's
+        database (see `stats.StoreStatistics`)."""
+        return self._pool.statistics
+
+    def _hasOptionalTables(self, name):
+        """Return true if the optional tables `name` (``'quads'`` or
+        ``'term_ids'``) exist."""
+        self._waitWriter()
+
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT relrdf_has_%s()""" % name)
+        result = cursor.fetchone()[0]
+        cursor.close()
+
+        return bool(result)
+
+    def _setOptionalTables(self, name, enabled):
+        """Create (and fill) or drop the optional tables `name`."""
+        self.flush()
+
+        if enabled:
+            self._modifCursor.execute("""
+                SELECT relrdf_enable_%s();
+                """ % name)
+        else:
+            self._modifCursor.execute("""
+                SELECT relrdf_disable_%s();
+                """ % name)
+        self._modified = True
+
+        # Compiled queries may refer to the tables.
+        self._pool.queryCache.clear()
+
+    def hasQuadTable(self):
+        """Return true if the database has a quads table (see
+        `basicquery.QuadGraphMapper`)."""
+        return self._hasOptionalTables('quads')
+
+    def setQuadTable(self, enabled):
+        """Create (and fill) or drop the quads table. Creating it
+        copies every statement once per graph it belongs to, and may
+        take a while on large databases."""
+        self._setOptionalTables('quads', enabled)
+
+    def hasTermIdTables(self):
+        """Return true if the database has the dictionary encoded
+        term tables (see `basicquery.TermIdGraphMapper`)."""
+        return self._hasOptionalTables('term_ids')
+
+    def setTermIdTables(self, enabled):
+        """Create (and fill) or drop the dictionary encoded term
+        tables. Creating them assigns an ID to every term in the
+        database, and may take a while on large databases."""
+        self._setOptionalTables('term_ids', enabled)
+
+    def analyze(self):
+        """Compute the statistics in the ``relrdf_stats`` table from
+        scratch. The new statistics become visible to other
+        connections after a commit."""
+        self.flush()
+
+        if self.verbose:
+            print "Computing statistics..."
+        self._modifCursor.execute("""
+            SELECT relrdf_analyze();
+            """)
+        self._modified = True
+
+        self._pool.statistics.clear()
+
+    def prepareStatement(self, sqlText, paramCount):
+        """Return the name of a server-side prepared statement for
+        `sqlText` in this modelbase's connection, preparing it if
+        necessary. `sqlText` refers to its `paramCount` parameters as
+        ``$1``, ``$2``, etc., all of them of type ``text``."""
+        if isinstance(sqlText, unicode):
+            sqlText = sqlText.encode('utf-8')
+
+        prepared = self._pool.getPreparedStatements(self._connection)
+        try:
+            return prepared[sqlText]
+        except KeyError:
+            pass
+
+        self._waitWriter()
+
+        name = 'relrdf_stmt%d' % len(prepared)
+        if paramCount > 0:
+            paramTypes = ' (%s)' % ', '.join(['text'] * paramCount)
+        else:
+            paramTypes = ''
+
+        cursor = self._connection.cursor()
+        cursor.execute('PREPARE %s%s AS %s' % (name, paramTypes, sqlText))
+        cursor.close()
+
+        prepared[sqlText] = name
+        return name
+
+    def setBulkLoad(self, bulkLoad):
+        self.bulkLoad = bool(bulkLoad)
+
+    def setPipelined(self, pipelined):
+        """Enable or disable pipelined mode.
+
+        In pipelined mode, full batches of pending rows are handed to
+        a background thread, which writes them to the database while
+        the caller goes on queueing statements. The writer uses this
+        modelbase's connection, so that the rows remain part of the
+        current transaction. Other operations of the modelbase wait
+        until all handed batches are written before using the
+        connection, but models obtained from `getModel` don't, and
+        must only be queried after a `flush` or `commit`. At most
+        `PIPELINE_DEPTH` batches wait for the writer; queueing
+        statements blocks when the limit is reached.
+
+        Errors found by the writer are raised by the next call
+        handing a batch or using the connection (in particular,
+        `flush` and `commit`), and every such call after it, until the
+        transaction is rolled back."""
+        pipelined = bool(pipelined)
+        if not pipelined:
+            self._stopWriter()
+        self.pipelined = pipelined
+
 
     #
     # Modification related methods
@@ -173,12 +375,36 @@ class BasicModelbase(object):
             ON COMMIT DROP;
             """)
 
+        # Staging table for bulk loading. Rows are copied here as
+        # plain text, with the object type already resolved, and
+        # converted to rdf_term values in a single statement.
+        self._modifCursor.execute("""
+            CREATE TEMPORARY TABLE statements_raw (
+              graph_id integer,
+              subject text,
+              predicate text,
+              object_type integer,
+              object text
+            )
+            ON COMMIT DROP;
+            """)
+
         self._pendingRows = []
 
+        # Type IDs for (type URI, language tag) pairs, as resolved
+        # by the database. New types may be created during the
+        # transaction, so this cache is only valid until rollback.
+        self._literalTypeIds = {}
+
         # As long as there are no statements in _pendingRows, we are
         # neither deleting nor inserting.
         self._deleting = None
 
+        # True if the current transaction modified the database in
+        # any way. It may then hold locks other connections would wait
+        # for.
+        self._modified = False
+
     def queueTriple(self, graphId, delete, subject, pred, object):
         assert isinstance(subject, uri.Uri)
         assert isinstance(pred, uri.Uri)
@@ -192,13 +418,26 @@ class BasicModelbase(object):
             isResource = 1
         elif isinstance(object, literal.Literal):
             if not object.typeUri is None:
-                typeUri = unicode(object.typeUri).encode('utf-8')
+                typeUri = interning.encode(object.typeUri)
             elif not object.lang is None:
                 lang = unicode(object.lang.lower()).encode('utf-8')
         else:
             assert False, "Unexpected object type '%d'" \
                    % object.__class__.__name__
 
+        # URIs interned by the importers already know their encoding.
+        self.queueEncoded(graphId, delete,
+                          interning.encode(subject),
+                          interning.encode(pred),
+                          interning.encode(object),
+                          isResource, typeUri, lang)
+
+    def queueEncoded(self, graphId, delete, subject, pred, object,
+                     isResource, typeUri, lang):
+        """Like `queueTriple`, but with the statement components
+        already in row format: subject, predicate, object, type URI
+        and (lower case) language tag as UTF-8 encoded strings, and
+        `isResource` telling whether the object is a URI."""
         delete = bool(delete)
         if self._deleting is None:
             self._deleting = delete
@@ -209,14 +448,15 @@ class BasicModelbase(object):
             self._deleting = delete
 
         # Collect the row.
-        self._pendingRows.append((graphId,
-                                  unicode(subject).encode('utf-8'),
-                                  unicode(pred).encode('utf-8'),
-                                  unicode(object).encode('utf-8'),
+        self._pendingRows.append((graphId, subject, pred, object,
                                   isResource, typeUri, lang))
 
-        if len(self._pendingRows) >= self.ROWS_PER_QUERY:
-            self._writePendingRows()
+        if self.bulkLoad:
+            maxRows = self.ROWS_PER_COPY
+        else:
+            maxRows = self.ROWS_PER_QUERY
+        if len(self._pendingRows) >= maxRows:
+            self._writePendingRows(background=True)
 
     def insertByQuery(self, graphId, stmtQuery, stmtsPerRow):
         # Get rid of any pending rows.
@@ -250,22 +490,193 @@ class BasicModelbase(object):
         # Move the data to its final destination.
         self.flush()
 
-    def _writePendingRows(self):
+    def _writePendingRows(self, background=False):
+        """Send the pending rows to the statements_temp1 table. If
+        `background` is true and the modelbase is in pipelined mode,
+        the rows are handed to the background writer instead."""
+        rows = self._pendingRows
+        self._pendingRows = []
+
+        if background and self.pipelined:
+            self._handOff(rows, self.bulkLoad)
+        else:
+            self._writeRows(rows, self.bulkLoad)
+
+    def _writeRows(self, rows, bulkLoad):
         if self.verbose:
-            print "Inserting %d rows..." % (len(self._pendingRows))
+            print "Inserting %d rows..." % (len(rows))
+
+        if bulkLoad:
+            self._copyRows(rows)
+        else:
+            self._modifCursor.executemany("""
+                INSERT INTO statements_temp1 (graph_id, subject, predicate,
+                                              object)
+                VALUES (
+                  %d,
+                  rdf_term(0, %s),
+                  rdf_term(0, %s),
+                  rdf_term_create(%s, %d, %s, %s))""",
+                rows)
+
+    def _handOff(self, rows, bulkLoad):
+        """Hand `rows` to the background writer, starting it if
+        necessary. Blocks while `PIPELINE_DEPTH` batches are already
+        waiting."""
+        if self._writerError is not None:
+            self._waitWriter()
+
+        if self._writer is None:
+            self._writerQueue = Queue.Queue(self.PIPELINE_DEPTH)
+            self._writer = threading.Thread(target=self._runWriter,
+                                            name='relrdf-writer')
+            self._writer.setDaemon(True)
+            self._writer.start()
+
+        self._writerQueue.put((rows, bulkLoad))
+
+    def _runWriter(self):
+        """Main loop of the background writer thread. A ``None``
+        item stops the thread. After an error, batches are discarded
+        until the error is cleared by a rollback."""
+        queue = self._writerQueue
+        while True:
+            item = queue.get()
+            try:
+                if item is None:
+                    return
+
+                if self._writerError is None:
+                    try:
+                        self._writeRows(*item)
+                    except:
+                        self._writerError = sys.exc_info()
+            finally:
+                queue.task_done()
+
+    def _waitWriter(self):
+        """Wait until the background writer has written all batches
+        handed to it, so that the connection can be used again, and
+        raise the error found by the writer, if any."""
+        if self._writer is not None:
+            self._writerQueue.join()
+
+        if self._writerError is not None:
+            excType, excValue, tb = self._writerError
+            raise excType, excValue, tb
+
+    def _stopWriter(self, discard=False):
+        """Stop the background writer thread after it has written
+        all batches handed to it, or, if `discard` is true, after the
+        batch being written, throwing the others away."""
+        if self._writer is None:
+            return
+
+        queue = self._writerQueue
+        if discard:
+            while True:
+                try:
+                    queue.get_nowait()
+                except Queue.Empty:
+                    break
+                queue.task_done()
+
+        queue.put(None)
+        self._writer.join()
+
+        self._writer = None
+        self._writerQueue = None
+
+    def _literalTypeId(self, typeUri, lang):
+        """Return the type ID for a literal with the given type URI
+        or language tag (both already UTF-8 encoded), creating a new
+        entry in the types table if necessary."""
+        if typeUri is None and lang is None:
+            # Simple literal.
+            return 1
+
+        try:
+            return self._literalTypeIds[typeUri, lang]
+        except KeyError:
+            pass
+
+        # Committed types are in the shared catalog.
+        catalogKey = [value is not None and value.decode('utf-8') or None
+                      for value in (typeUri, lang)]
+        typeId = self._pool.typeCatalog.lookupTypeId(*catalogKey)
+
+        if typeId is None:
+            self._modifCursor.execute("""
+                SELECT rdf_term_literal_type_to_id(%s, %s)""",
+                (typeUri, lang))
+            typeId = self._modifCursor.fetchone()[0]
+
+        self._literalTypeIds[typeUri, lang] = typeId
+        return typeId
+
+    _copyEscapes = (('\\', '\\\\'),
+                    ('\t', '\\t'),
+                    ('\n', '\\n'),
+                    ('\r', '\\r'))
 
-        self._modifCursor.executemany("""
+    @classmethod
+    def _copyEscape(cls, value):
+        """Escape a string for use as a column value in PostgreSQL's
+        COPY text format."""
+        for char, escaped in cls._copyEscapes:
+            if char in value:
+                value = value.replace(char, escaped)
+        return value
+
+    def _copyIn(self, table, columns, lines):
+        """Send the already formatted `lines` into `table` using
+        ``COPY ... FROM STDIN``."""
+        if hasattr(self._modifCursor, 'copy_from'):
+            # PyGreSQL 5 and later support COPY through the cursor.
+            self._modifCursor.copy_from(lines, table, columns=columns)
+        else:
+            # Older versions require the low-level connection.
+            cnx = self._connection._cnx
+            cnx.query("COPY %s (%s) FROM STDIN" %
+                      (table, ', '.join(columns)))
+            for line in lines:
+                cnx.putline(line)
+            cnx.putline('\\.\n')
+            cnx.endcopy()
+
+    def _copyRows(self, rows):
+        """Bulk load `rows` into the statements_temp1 table."""
+        escape = self._copyEscape
+        typeId = self._literalTypeId
+
+        lines = []
+        for (graphId, subject, pred, object, isResource, typeUri,
+             lang) in rows:
+            if isResource:
+                objectType = 0
+            else:
+                objectType = typeId(typeUri, lang)
+
+            lines.append('%d\t%s\t%s\t%d\t%s\n' %
+                         (graphId, escape(subject), escape(pred),
+                          objectType, escape(object)))
+
+        self._copyIn('statements_raw',
+                     ('graph_id', 'subject', 'predicate', 'object_type',
+                      'object'),
+                     lines)
+
+        self._modifCursor.execute("""
             INSERT INTO statements_temp1 (graph_id, subject, predicate,
                                           object)
-            VALUES (
-              %d,
-              rdf_term(0, %s),
-              rdf_term(0, %s),
-              rdf_term_create(%s, %d, %s, %s))""",
-            self._pendingRows)
+            SELECT graph_id,
+                   rdf_term(0, subject),
+                   rdf_term(0, predicate),
+                   rdf_term(object_type, object)
+            FROM statements_raw;
 
-        self._pendingRows = []
-        self._deleting = None
+            TRUNCATE TABLE statements_raw;
+            """)
 
     def flush(self):
         """Perform all pending operations.
@@ -275,16 +686,28 @@ class BasicModelbase(object):
         structures in the database itself. This operation does not
         perform a commit."""
 
-        if len(self._pendingRows) == 0:
+        # In pipelined mode, the connection is only available after
+        # the background writer is done.
+        self._waitWriter()
+
+        # Full batches may already be in statements_temp1.
+        if self._deleting is None:
             return
 
-        self._writePendingRows()
+        if len(self._pendingRows) > 0:
+            self._writePendingRows()
+        self._modified = True
 
         # Delete?
         if self._deleting:
             # Remove existing statements.
             if self.verbose:
                 print "Removing statements from graph...",
+            # Lock the graphs before graph_statement, like
+            # insert_statements() does.
+            self._modifCursor.execute("""
+                SELECT relrdf_compare_lock()
+                """)
             self._modifCursor.execute("""
                 DELETE FROM graph_statement gs
                 USING  statements s, statements_temp1 st
@@ -297,6 +720,19 @@ class BasicModelbase(object):
             if self.verbose:
                 print "%d removed" % self._modifCursor.rowcount
 
+            # Graph sizes in the statistics are cheap to recount.
+            self._modifCursor.execute("""
+                SELECT relrdf_stats_count_graph(g.graph_id)
+                FROM (SELECT DISTINCT graph_id
+                      FROM statements_temp1) g
+                """)
+
+            # Removed statements must leave the comparison graphs
+            # before unused statements can be found.
+            self._modifCursor.execute("""
+                SELECT relrdf_compare_apply()
+                """)
+
             # Note: This is a /lot/ more efficient than
             # "... WHERE id NOT IN (SELECT stmt_id FROM statements)"
             if self.verbose:
@@ -305,10 +741,18 @@ class BasicModelbase(object):
                 DELETE FROM statements
                 USING statements ss LEFT JOIN graph_statement gs
                       ON gs.stmt_id = ss.id
-                WHERE gs.stmt_id IS NULL);
+                WHERE statements.id = ss.id AND gs.stmt_id IS NULL
                 """)
+            removed = self._modifCursor.rowcount
             if self.verbose:
-                print "%d removed" % self._modifCursor.rowcount
+                print "%d removed" % removed
+
+            # Predicate and type counts aren't updated on removal. They
+            # stay as upper bounds until the statistics are recomputed.
+            if removed > 0:
+                self._modifCursor.execute("""
+                    SELECT relrdf_stats_add('total', '', %d, 0, 0)
+                    """ % -removed)
 
         else:
             if self.verbose:
@@ -324,44 +768,158 @@ class BasicModelbase(object):
             TRUNCATE TABLE statements_temp1
             """)
 
+        self._deleting = None
+
+
+    #
+    # Staging
+    #
+
+    # Columns of a staging table.
+    STAGING_COLUMNS = ('graph_uri', 'subject', 'predicate', 'is_resource',
+                       'type_uri', 'lang', 'object')
+
+    def getStagingSink(self, name):
+        # Staging tables are regular tables, so that other
+        # connections can merge them. Graphs and literal types are
+        # only resolved when merging, since creating them from
+        # several connections at once would lead to conflicts.
+        self._waitWriter()
+        self._modifCursor.execute("""
+            CREATE TABLE %s (
+              graph_uri text,
+              subject text NOT NULL,
+              predicate text NOT NULL,
+              is_resource boolean NOT NULL,
+              type_uri text,
+              lang text,
+              object text NOT NULL
+            )""" % name)
+        self._modified = True
+
+        return basicsinks.StagingSink(self, name)
+
+    def stageLines(self, name, lines):
+        """Copy `lines`, already in COPY text format, into the staging
+        table `name`."""
+        if self.verbose:
+            print "Staging %d rows into %s..." % (len(lines), name)
+
+        self._copyIn(name, self.STAGING_COLUMNS, lines)
+
+    def mergeStaging(self, names, sink):
+        if sink.delete:
+            raise error.ModifyError(_("Staged statements can only be "
+                                "inserted"))
+
+        self.flush()
+
+        for name in names:
+            if self.verbose:
+                print "Merging %s..." % name
+
+            self._modifCursor.execute("""
+                INSERT INTO graphs (graph_uri)
+                  SELECT DISTINCT t.graph_uri
+                  FROM %(table)s t
+                  WHERE t.graph_uri IS NOT NULL AND
+                        NOT EXISTS (SELECT 1
+                                    FROM graphs g
+                                    WHERE g.graph_uri = t.graph_uri);
+
+                SELECT rdf_term_literal_type_to_id(l.type_uri, l.lang)
+                FROM (SELECT DISTINCT type_uri, lang
+                      FROM %(table)s
+                      WHERE type_uri IS NOT NULL OR
+                            lang IS NOT NULL) l;
+
+                INSERT INTO statements_temp1 (graph_id, subject, predicate,
+                                              object)
+                  SELECT COALESCE(g.graph_id, %(graphId)d),
+                         rdf_term(0, t.subject),
+                         rdf_term(0, t.predicate),
+                         rdf_term(CASE WHEN t.is_resource THEN 0
+                                       ELSE COALESCE(tt.id, tl.id, 1) END,
+                                  t.object)
+                  FROM %(table)s t
+                       LEFT JOIN graphs g ON g.graph_uri = t.graph_uri
+                       LEFT JOIN types tt ON tt.type_uri = t.type_uri
+                       LEFT JOIN types tl ON tl.lang_tag = t.lang;
+
+                DROP TABLE %(table)s;
+                """ % {'table': name, 'graphId': sink.graphId})
+
+        if self.verbose:
+            print "Inserting statements...",
+        self._modifCursor.execute("""
+            SELECT insert_statements();
+            """)
+        if self.verbose:
+            print "%s new" % self._modifCursor.fetchone()[0]
+
+        self._modified = True
+
+    def dropStaging(self, names):
+        self.rollback()
+        for name in names:
+            self._modifCursor.execute("""
+                DROP TABLE IF EXISTS %s""" % name)
+        self.commit()
+
 
     #
     # Comparison
     #
 
     def prepareTwoWay(self, graphA, graphB):
-        cursor = self._connection.cursor()
-
-        # Create comparison graphs
+        """Make sure the comparison graphs for the graphs with IDs
+        `graphA` and `graphB` are up to date, and return their URIs
+        (statements only in `graphA`, only in `graphB`, and in
+        both).
+
+        Comparison graphs are kept in the database and reused as long
+        as none of the compared graphs changes. Changes made through
+        a modelbase are applied to them incrementally (see
+        ``relrdf_compare_apply()``). When they have to be built, they
+        are committed on their own, unless this modelbase has
+        uncommitted changes of any kind (including those made by
+        `analyze`, `setQuadTable` and `setTermIdTables`)."""
         baseGraphName = "cmp_%d_%d_" % (graphA, graphB)
         graphUris = [commonns.relrdf[baseGraphName + suffix + '#']
                      for suffix in ('A', 'B', 'AB')]
-        graphs = [self.lookupGraphId(uri, create=True) for uri in graphUris]
 
-        # Clear previous data
-        cursor.execute("""
-            DELETE FROM graph_statement
-            WHERE graph_id
-            IN (%d, %d, %d)""" % (graphs[0], graphs[1], graphs[2]));
+        self.flush()
+        if self._modified:
+            # A separate connection wouldn't see our changes, and
+            # could wait forever for our locks.
+            self._compareGraphs(self._connection, graphA, graphB, graphUris)
+        else:
+            conn = self._pool.getConnection()
+            try:
+                self._compareGraphs(conn, graphA, graphB, graphUris)
+                conn.commit()
+            finally:
+                self._pool.releaseConnection(conn)
+
+        return graphUris
 
-        # Insert data
+    def _compareGraphs(self, conn, graphA, graphB, graphUris):
+        cursor = conn.cursor()
         cursor.execute("""
-             INSERT INTO graph_statement (stmt_id, graph_id)
-               SELECT COALESCE(a.stmt_id, b.stmt_id),
-                      CASE WHEN a.stmt_id IS NULL THEN %d
-                           WHEN b.stmt_id IS NULL THEN %d
-                           ELSE %d END
-               FROM (SELECT stmt_id
-                     FROM graph_statement
-                     WHERE graph_id = %d) AS a
-                    FULL JOIN
-                    (SELECT stmt_id
-                     FROM graph_statement
-                     WHERE graph_id = %d) AS b
-                    ON a.stmt_id = b.stmt_id
-             """ % (graphs[0], graphs[1], graphs[2], graphA, graphB))
+            SELECT relrdf_compare_graphs(%d, %d, %%s, %%s, %%s)
+            """ % (graphA, graphB),
+            tuple([unicode(self._prefixes.normalizeUri(uri)).encode('utf-8')
+                   for uri in graphUris]))
+        built = cursor.fetchone()[0]
+        cursor.close()
 
-        return graphUris
+        if self.verbose:
+            if built:
+                print "Comparison graphs built"
+            else:
+                print "Comparison graphs up to date"
+
+        return built
 
 
     #
@@ -369,25 +927,35 @@ class BasicModelbase(object):
     #
 
     def rollback(self):
+        # Batches still waiting for the writer would be rolled back
+        # anyway, and so would be the cause of any writer error.
+        self._stopWriter(discard=True)
+        self._writerError = None
+
         self._connection.rollback()
 
+        # Graphs created by the transaction are gone.
+        self._graphs.clear()
+
         self._modifSetup()
 
     def commit(self):
         self.flush()
 
         self._connection.commit()
+        self._modified = False
 
         if self.verbose:
             print "All done!"
 
     def close(self):
-        # Changes must be explicitly committed.
-        self.rollback()
-
-        # Close the connection.
+        # Close the cursor and return the connection to the
+        # pool. Changes must be explicitly committed, the pool rolls
+        # back anything else.
+        self._stopWriter(discard=True)
         self._modifCursor.close()
-        self._connection.close()
+        self._pool.releaseConnection(self._connection)
+        self._connection = None
 
 
 def checkSchemaVersion(name, version, minVer, maxVer):
@@ -404,20 +972,48 @@ def checkSchemaVersion(name, version, minVer, maxVer):
                                    "RelRDF installation") %
                                  (version, name))
 
-def getModelbase(db, **modelbaseArgs):
-    # FIXME: This will cause slowness in situations where many
-    # model bases must be created (e.g., Internet server).
-    conn = pgdb.connect(database=db, **modelbaseArgs)
-
+def upgradeSchema(conn, version):
+    """Upgrade the schema in the database connected to by `conn`
+    from `version` to the current version. Changes are committed."""
     cursor = conn.cursor()
-    cursor.execute("select name, version from relrdf_schema_version")
-    name, version = cursor.fetchone()
-    cursor.close()
-
-    conn.close()
+    try:
+        for sqlFile in managedb.getUpgradeScripts(version):
+            f = open(sqlFile)
+            try:
+                cursor.execute(f.read())
+            finally:
+                f.close()
+        conn.commit()
+    except:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
 
-    if name == 'basic':
-        checkSchemaVersion(name, version, 1, 1)
-        return BasicModelbase(db, **modelbaseArgs)
-    else:
+def getModelbase(db, verbose=False, bulkLoad=False, poolSize=None,
+                 poolIdleTimeout=None, queryCacheSize=None, pipelined=False,
+                 **connArgs):
+    # Connections and schema information are shared by all
+    # modelbases using the same connection parameters.
+    connPool = pool.getPool(db, size=poolSize, idleTimeout=poolIdleTimeout,
+                            **connArgs)
+    if queryCacheSize is not None:
+        connPool.queryCache.maxSize = queryCacheSize
+
+    name, version = connPool.getSchemaVersion()
+    if name != 'basic':
         raise InstantiationError(_("Unsupported schema '%s'") % name)
+
+    checkSchemaVersion(name, version, 1, managedb.SCHEMA_VERSION)
+
+    # Older versions can be migrated in place.
+    if version < managedb.SCHEMA_VERSION:
+        conn = connPool.getConnection()
+        try:
+            upgradeSchema(conn, version)
+        finally:
+            connPool.releaseConnection(conn)
+        connPool.invalidate()
+
+    return BasicModelbase(connPool, verbose=verbose, bulkLoad=bulkLoad,
+                          pipelined=pipelined)
@@ -0,0 +1,254 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""Process-wide pooling of Postgres connections.
+
+Opening a connection and reading the schema metadata is expensive
+compared to running a typical query. Connections released by
+modelbases are kept in a pool associated to their connection
+parameters, and reused by later modelbases using the same
+parameters. Metadata that only changes when the schema is modified
+(schema version, namespace prefixes) is read only once per pool, and
+the literal types and store statistics are shared by all users of the
+pool.
+"""
+
+import time
+import threading
+
+import pgdb
+
+from relrdf.expression import uri
+from relrdf.util.nsshortener import NamespaceUriShortener
+from relrdf.util.methodsync import SyncMethodsMixin, synchronized
+from relrdf.util.lrucache import LruCache
+
+from typecatalog import TypeCatalog
+from stats import StoreStatistics
+
+
+# Default maximum number of idle connections kept per pool.
+DEFAULT_SIZE = 10
+
+# Default time (in seconds) an idle connection is kept before being
+# closed.
+DEFAULT_IDLE_TIMEOUT = 300
+
+# Default maximum number of compiled queries cached per pool.
+DEFAULT_QUERY_CACHE_SIZE = 500
+
+
+class ConnectionPool(SyncMethodsMixin):
+    """A pool of connections to a single database, all opened with
+    the same connection parameters."""
+
+    __slots__ = ('params',
+                 'size',
+                 'idleTimeout',
+                 'queryCache',
+                 'typeCatalog',
+                 'statistics',
+
+                 '_idle',
+                 '_prepared',
+                 '_schemaVersion',
+                 '_prefixes')
+
+    def __init__(self, size=DEFAULT_SIZE, idleTimeout=DEFAULT_IDLE_TIMEOUT,
+                 **params):
+        super(ConnectionPool, self).__init__()
+
+        self.params = params
+        self.size = size
+        self.idleTimeout = idleTimeout
+
+        # Idle connections, as (connection, release time) pairs. The
+        # most recently released connections are at the end.
+        self._idle = []
+
+        # Prepared statements for each open connection, as
+        # dictionaries mapping SQL text to statement name, indexed by
+        # connection ID.
+        self._prepared = {}
+
+        # Cached metadata.
+        self._schemaVersion = None
+        self._prefixes = None
+
+        # Compiled queries, shared by all models using this pool. See
+        # `basicquery.BasicModel.query`.
+        self.queryCache = LruCache(DEFAULT_QUERY_CACHE_SIZE)
+
+        # Literal types, shared by all modelbases using this pool.
+        self.typeCatalog = TypeCatalog(self._query)
+
+        # Statement counts used for join ordering.
+        self.statistics = StoreStatistics(self._query)
+
+    def _close(self, conn):
+        self._prepared.pop(id(conn), None)
+        try:
+            conn.close()
+        except pgdb.Error:
+            pass
+
+    def _evict(self, now):
+        """Close idle connections exceeding the pool size or the idle
+        timeout. Must be called with the lock held."""
+        while len(self._idle) > 0 and \
+                (len(self._idle) > self.size or
+                 now - self._idle[0][1] > self.idleTimeout):
+            conn, released = self._idle.pop(0)
+            self._close(conn)
+
+    @synchronized
+    def getConnection(self):
+        """Check a connection out of the pool, opening a new one if no
+        idle connection is available."""
+        self._evict(time.time())
+
+        if len(self._idle) > 0:
+            conn, released = self._idle.pop()
+            return conn
+
+        return pgdb.connect(**self.params)
+
+    def releaseConnection(self, conn):
+        """Return a connection to the pool. Any open transaction in
+        the connection is rolled back."""
+        try:
+            conn.rollback()
+        except pgdb.Error:
+            # The connection is unusable, drop it.
+            self._close(conn)
+            return
+
+        self._release(conn)
+
+    @synchronized
+    def _release(self, conn):
+        now = time.time()
+        self._idle.append((conn, now))
+        self._evict(now)
+
+    @synchronized
+    def clear(self):
+        """Close all idle connections in the pool."""
+        for conn, released in self._idle:
+            self._close(conn)
+        self._idle = []
+
+    @synchronized
+    def getPreparedStatements(self, conn):
+        """Return the dictionary of statements prepared in connection
+        `conn`, mapping SQL text to statement name. The dictionary
+        must only be modified by the current holder of the connection,
+        and is discarded when the connection is closed."""
+        return self._prepared.setdefault(id(conn), {})
+
+    def _query(self, sqlText):
+        """Run `sqlText` using a pooled connection and return all
+        resulting rows."""
+        conn = self.getConnection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sqlText)
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            self.releaseConnection(conn)
+
+        return rows
+
+    def getSchemaVersion(self):
+        """Return the schema name and version stored in the database
+        as a ``(name, version)`` tuple."""
+        if self._schemaVersion is None:
+            rows = self._query("""
+                SELECT name, version
+                FROM relrdf_schema_version""")
+            self._schemaVersion = tuple(rows[0])
+
+        return self._schemaVersion
+
+    def getPrefixes(self):
+        """Return the namespace prefixes stored in the database, as a
+        `NamespaceUriShortener`. The returned object is shared and
+        must not be modified."""
+        if self._prefixes is None:
+            prefixes = NamespaceUriShortener()
+            for prefix, namespace in self._query("""
+                    SELECT p.prefix, p.namespace
+                    FROM prefixes p"""):
+                prefixes[prefix] = uri.Namespace(namespace)
+            self._prefixes = prefixes
+
+        return self._prefixes
+
+    def invalidate(self):
+        """Forget the cached schema metadata. It will be read again
+        from the database when next requested."""
+        self._schemaVersion = None
+        self._prefixes = None
+        self.queryCache.clear()
+        self.typeCatalog.clear()
+        self.statistics.clear()
+
+
+_pools = {}
+_poolsLock = threading.Lock()
+
+def getPool(db, size=None, idleTimeout=None, **params):
+    """Return the process-wide connection pool for database `db` and
+    connection parameters `params`, creating it if necessary.
+
+    If `size` or `idleTimeout` are not ``None``, they replace the
+    current settings of the pool."""
+    params['database'] = db
+    key = tuple(sorted(params.items()))
+
+    _poolsLock.acquire()
+    try:
+        try:
+            pool = _pools[key]
+        except KeyError:
+            pool = _pools[key] = ConnectionPool(**params)
+    finally:
+        _poolsLock.release()
+
+    if size is not None:
+        pool.size = size
+    if idleTimeout is not None:
+        pool.idleTimeout = idleTimeout
+
+    return pool
+
+def clearPools():
+    """Close all idle connections in all pools."""
+    _poolsLock.acquire()
+    try:
+        for pool in _pools.values():
+            pool.clear()
+    finally:
+        _poolsLock.release()
@@ -113,6 +113,8 @@ Datum rdf_term_get_language_id(PG_FUNCTION_ARGS);
 Datum rdf_term_to_string(PG_FUNCTION_ARGS);
 
 int compare_terms(RdfTerm *term1, RdfTerm *term2);
+int compare_terms_bytes(RdfTerm *term1, RdfTerm *term2);
+bool equal_terms(RdfTerm *term1, RdfTerm *term2);
 bool to_bool(RdfTerm *term);
 RdfTerm *create_term_bool(bool flag);
 
@@ -125,6 +127,11 @@ Datum rdf_term_equal(PG_FUNCTION_ARGS);
 Datum rdf_term_different(PG_FUNCTION_ARGS);
 Datum rdf_term_greater_equal(PG_FUNCTION_ARGS);
 Datum rdf_term_greater(PG_FUNCTION_ARGS);
+Datum rdf_term_byte_compare(PG_FUNCTION_ARGS);
+Datum rdf_term_byte_less(PG_FUNCTION_ARGS);
+Datum rdf_term_byte_less_equal(PG_FUNCTION_ARGS);
+Datum rdf_term_byte_greater_equal(PG_FUNCTION_ARGS);
+Datum rdf_term_byte_greater(PG_FUNCTION_ARGS);
 Datum rdf_term_to_bool(PG_FUNCTION_ARGS);
 Datum rdf_term_not_raw(PG_FUNCTION_ARGS);
 Datum rdf_term_not(PG_FUNCTION_ARGS);
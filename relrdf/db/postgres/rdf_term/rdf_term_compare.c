@@ -5,9 +5,13 @@
 
 /* == Compare == */
 
-inline int
-compare_terms(RdfTerm *term1, RdfTerm *term2)
+/* Compare the types and, for numeric and date/time types, the values
+   of two terms. Returns 0 if the textual representations must be
+   compared to decide, setting *text_compare. */
+static inline int
+compare_types_values(RdfTerm *term1, RdfTerm *term2, bool *text_compare)
 {
+	*text_compare = false;
 
 	/* Types compatible? Use (somewhat arbitrary) type order otherwise. */
 	if(!types_compatible(term1->type_id, term2->type_id))
@@ -53,8 +57,79 @@ compare_terms(RdfTerm *term1, RdfTerm *term2)
 			return 1;
 	}
   
-	/* Compare textual */
-	return strcoll(term1->text, term2->text);
+	*text_compare = true;
+	return 0;
+}
+
+/* Byte-wise comparison of the textual representations */
+static inline int
+compare_text_bytes(RdfTerm *term1, RdfTerm *term2)
+{
+	int32_t len1 = get_text_len(term1);
+	int32_t len2 = get_text_len(term2);
+	int result = memcmp(term1->text, term2->text, Min(len1, len2));
+	
+	if(result != 0)
+		return result;
+	return (len1 < len2 ? -1 : (len1 > len2 ? 1 : 0));
+}
+
+/* Collation aware comparison, for ORDER BY semantics. Strings the
+   locale considers equal are ordered byte-wise, so that comparison
+   yields 0 exactly when equal_terms holds (as PostgreSQL does for
+   text). */
+inline int
+compare_terms(RdfTerm *term1, RdfTerm *term2)
+{
+	bool text_compare;
+	int result = compare_types_values(term1, term2, &text_compare);
+	
+	if(!text_compare)
+		return result;
+	
+	result = strcoll(term1->text, term2->text);
+	if(result != 0)
+		return result;
+	return compare_text_bytes(term1, term2);
+}
+
+/* Byte order comparison. Agrees with compare_terms for all but the
+   textual representations, which are compared byte-wise. */
+inline int
+compare_terms_bytes(RdfTerm *term1, RdfTerm *term2)
+{
+	bool text_compare;
+	int result = compare_types_values(term1, term2, &text_compare);
+	
+	if(!text_compare)
+		return result;
+	return compare_text_bytes(term1, term2);
+}
+
+/* Equality test. Doesn't need to look at the locale: textual
+   representations (IRIs, blank nodes and all literals not stored as
+   numbers or dates) are equal iff they are byte-wise equal. */
+inline bool
+equal_terms(RdfTerm *term1, RdfTerm *term2)
+{
+	uint32_t type_id1 = term1->type_id;
+	uint32_t type_id2 = term2->type_id;
+	
+	/* Fast path: same textual type, compare lengths, then bytes. The
+	   only distinct textual types considered equal are simple
+	   literals and xsd:string. */
+	if(is_text_type(type_id1) && is_text_type(type_id2))
+	{
+		if(type_id1 != type_id2 &&
+		   !(type_id1 == TYPE_ID_SIMPLE_LIT && type_id2 == TYPE_ID_STRING) &&
+		   !(type_id1 == TYPE_ID_STRING && type_id2 == TYPE_ID_SIMPLE_LIT))
+			return false;
+		if(VARSIZE(term1) != VARSIZE(term2))
+			return false;
+		return memcmp(term1->text, term2->text, get_text_len(term1)) == 0;
+	}
+	
+	return compare_terms_bytes(term1, term2) == 0;
 }
 
 /* == Boolean operations == */
@@ -99,7 +174,7 @@ rdf_term_types_check_compatible(PG_FUNCTION_ARGS)
 	/* It's a type error to compare values of unknown
 	   type that are not equal */
   if(term1->type_id >= STORAGE_TYPE_UNKNOWN)
-    if(compare_terms(term1, term2) != 0)
+    if(!equal_terms(term1, term2))
       PG_RETURN_NULL();
 	    
 	PG_RETURN_BOOL(true);
@@ -115,7 +190,7 @@ rdf_term_types_check_incompatible(PG_FUNCTION_ARGS)
 	if(!types_compatible(term1->type_id, term2->type_id))
 	  PG_RETURN_NULL();	  
   if(term1->type_id >= STORAGE_TYPE_UNKNOWN)
-    if(compare_terms(term1, term2) != 0)
+    if(!equal_terms(term1, term2))
       PG_RETURN_NULL();
 	    
 	PG_RETURN_BOOL(false);
@@ -158,7 +233,7 @@ rdf_term_equal(PG_FUNCTION_ARGS)
 	RdfTerm *term1 = PG_GETARG_RDF_TERM(0);
 	RdfTerm *term2 = PG_GETARG_RDF_TERM(1);
 	
-	PG_RETURN_BOOL(compare_terms(term1, term2) == 0);	
+	PG_RETURN_BOOL(equal_terms(term1, term2));	
 }
 
 PG_FUNCTION_INFO_V1(rdf_term_different);
@@ -168,7 +243,7 @@ rdf_term_different(PG_FUNCTION_ARGS)
 	RdfTerm *term1 = PG_GETARG_RDF_TERM(0);
 	RdfTerm *term2 = PG_GETARG_RDF_TERM(1);
 	
-	PG_RETURN_BOOL(compare_terms(term1, term2) != 0);	
+	PG_RETURN_BOOL(!equal_terms(term1, term2));	
 }
 
 PG_FUNCTION_INFO_V1(rdf_term_greater_equal);
@@ -191,6 +266,59 @@ rdf_term_greater(PG_FUNCTION_ARGS)
 	PG_RETURN_BOOL(compare_terms(term1, term2) > 0);	
 }
 
+/* Byte order comparison operators, for the rdf_term_byte_ops
+   operator class */
+
+PG_FUNCTION_INFO_V1(rdf_term_byte_compare);
+Datum
+rdf_term_byte_compare(PG_FUNCTION_ARGS)
+{
+	RdfTerm *term1 = PG_GETARG_RDF_TERM(0);
+	RdfTerm *term2 = PG_GETARG_RDF_TERM(1);
+	
+	PG_RETURN_INT32(compare_terms_bytes(term1, term2));	
+}
+
+PG_FUNCTION_INFO_V1(rdf_term_byte_less);
+Datum
+rdf_term_byte_less(PG_FUNCTION_ARGS)
+{
+	RdfTerm *term1 = PG_GETARG_RDF_TERM(0);
+	RdfTerm *term2 = PG_GETARG_RDF_TERM(1);
+	
+	PG_RETURN_BOOL(compare_terms_bytes(term1, term2) < 0);	
+}
+
+PG_FUNCTION_INFO_V1(rdf_term_byte_less_equal);
+Datum
+rdf_term_byte_less_equal(PG_FUNCTION_ARGS)
+{
+	RdfTerm *term1 = PG_GETARG_RDF_TERM(0);
+	RdfTerm *term2 = PG_GETARG_RDF_TERM(1);
+	
+	PG_RETURN_BOOL(compare_terms_bytes(term1, term2) <= 0);	
+}
+
+PG_FUNCTION_INFO_V1(rdf_term_byte_greater_equal);
+Datum
+rdf_term_byte_greater_equal(PG_FUNCTION_ARGS)
+{
+	RdfTerm *term1 = PG_GETARG_RDF_TERM(0);
+	RdfTerm *term2 = PG_GETARG_RDF_TERM(1);
+	
+	PG_RETURN_BOOL(compare_terms_bytes(term1, term2) >= 0);	
+}
+
+PG_FUNCTION_INFO_V1(rdf_term_byte_greater);
+Datum
+rdf_term_byte_greater(PG_FUNCTION_ARGS)
+{
+	RdfTerm *term1 = PG_GETARG_RDF_TERM(0);
+	RdfTerm *term2 = PG_GETARG_RDF_TERM(1);
+	
+	PG_RETURN_BOOL(compare_terms_bytes(term1, term2) > 0);	
+}
+
 /* Boolean operators and predicates */
 
 PG_FUNCTION_INFO_V1(rdf_term_to_bool);
@@ -337,23 +337,11 @@ rdf_term_send(PG_FUNCTION_ARGS)
 	pq_begintypsend(&buf);
 	pq_sendint(&buf, term->type_id, 4);
 	
-	/* Text type? */
-	if(is_text_type(term->type_id))
-	{
-	
-		/* Write length and text*/
-		len = get_text_len(term);
-		pq_sendint(&buf, len, 4);
-		pq_sendtext(&buf, term->text, len);
-		
-	}
-	else
-	{
-	
-		/* Just write numerical value */
-		pq_sendfloat8(&buf, term->num);
-	
-	}
+	/* Write length and text. The original text is kept for all
+	   types, and is what rdf_term_recv expects. */
+	len = get_text_len(term);
+	pq_sendint(&buf, len, 4);
+	pq_sendtext(&buf, term->text, len);
 	
 	/* Done */
 	PG_RETURN_BYTEA_P(pq_endtypsend(&buf));
@@ -145,7 +145,9 @@ rdf_term_hash(PG_FUNCTION_ARGS)
 	RdfTerm *term = PG_GETARG_RDF_TERM(0);	
 	uint32_t type_id = term->type_id;
 	
-	/* Values of compatible types must have the same hash value */
+	/* Values of compatible types must have the same hash value.
+	   Textual values are hashed byte-wise, which is consistent with
+	   equal_terms, and thus independent of the database locale. */
 	Datum hash = hash_uint32(type_id & TYPE_COMPATIBLE_MASK);
 	
 	/* Hash the rest using hash_any
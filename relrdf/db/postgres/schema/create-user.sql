@@ -1,7 +1,15 @@
 
 GRANT ALL ON 
   types, data_types_id_seq, language_tags_id_seq, 
-  prefixes, relrdf_schema_version,
+  prefixes, relrdf_schema_version, relrdf_stats, relrdf_comparisons,
   statements, statements_id_seq, 
   graphs, graphs_graph_id_seq, graph_statement TO :user;
 
+-- The optional tables only exist after relrdf_enable_quads() and
+-- relrdf_enable_term_ids(). They are granted to every user of the
+-- statements table, including the new one.
+SELECT relrdf_grant_users('quads')
+  WHERE relrdf_has_quads();
+SELECT relrdf_grant_users(t.name)
+  FROM (VALUES ('terms'), ('terms_id_seq'), ('term_quads')) t (name)
+  WHERE relrdf_has_term_ids();
@@ -0,0 +1,76 @@
+-- -*- SQL -*-
+--
+-- This file is part of RelRDF, a library for storage and
+-- comparison of RDF models.
+--
+-- Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+--                         Software Engineering (IESE).
+--
+-- RelRDF is free software; you can redistribute it and/or
+-- modify it under the terms of the GNU Lesser General Public
+-- License as published by the Free Software Foundation; either
+-- version 2 of the License, or (at your option) any later version.
+--
+-- This library is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+-- Lesser General Public License for more details.
+--
+-- You should have received a copy of the GNU Lesser General Public
+-- License along with this library; if not, write to the
+-- Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+-- Boston, MA 02111-1307, USA. 
+
+-- Upgrade the basic schema from version 1 to version 2.
+--
+-- Version 2 replaces the row by row insert_statements() function
+-- with a set based implementation.
+
+UPDATE relrdf_schema_version SET version = 2 WHERE name = 'basic';
+
+
+-- Insert raw statements from statements_temp1 into the graphs given
+-- by their graph_id column. Returns the number of statements that
+-- were new to the statements table.
+CREATE OR REPLACE FUNCTION insert_statements()
+    RETURNS integer AS $$
+  DECLARE
+    inserted integer;
+  BEGIN
+    -- Concurrent loaders could otherwise insert the same statements
+    -- twice, since there is no unique constraint to protect us.
+    LOCK TABLE statements, graph_statement IN SHARE ROW EXCLUSIVE MODE;
+
+    -- Insert the statements not yet present in the statements
+    -- table. The input is not guaranteed to be duplicate-free.
+    INSERT INTO statements (subject, predicate, object)
+      SELECT DISTINCT st.subject, st.predicate, st.object
+      FROM statements_temp1 st
+      WHERE st.subject IS NOT NULL AND
+            st.predicate IS NOT NULL AND
+            st.object IS NOT NULL AND
+            NOT EXISTS (SELECT 1
+                        FROM statements s
+                        WHERE s.subject = st.subject AND
+                              s.predicate = st.predicate AND
+                              s.object = st.object);
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+
+    -- Add the statements to their graphs.
+    INSERT INTO graph_statement (graph_id, stmt_id)
+      SELECT DISTINCT st.graph_id, s.id
+      FROM statements_temp1 st JOIN statements s
+        ON s.subject = st.subject AND
+           s.predicate = st.predicate AND
+           s.object = st.object
+      WHERE NOT EXISTS (SELECT 1
+                        FROM graph_statement gs
+                        WHERE gs.graph_id = st.graph_id AND
+                              gs.stmt_id = s.id);
+
+    -- Drop the raw statements.
+    TRUNCATE TABLE statements_temp1;
+
+    RETURN inserted;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
@@ -0,0 +1,296 @@
+-- -*- SQL -*-
+--
+-- This file is part of RelRDF, a library for storage and
+-- comparison of RDF models.
+--
+-- Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+--                         Software Engineering (IESE).
+--
+-- RelRDF is free software; you can redistribute it and/or
+-- modify it under the terms of the GNU Lesser General Public
+-- License as published by the Free Software Foundation; either
+-- version 2 of the License, or (at your option) any later version.
+--
+-- This library is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+-- Lesser General Public License for more details.
+--
+-- You should have received a copy of the GNU Lesser General Public
+-- License along with this library; if not, write to the
+-- Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+-- Boston, MA 02111-1307, USA. 
+
+-- Upgrade the basic schema from version 2 to version 3.
+--
+-- Version 3 adds the relrdf_stats table, holding statement counts
+-- for the whole store, per predicate, per graph and per object
+-- type. The statistics are computed from scratch by relrdf_analyze()
+-- and kept approximately current by insert_statements().
+
+UPDATE relrdf_schema_version SET version = 3 WHERE name = 'basic';
+
+
+-- Statement statistics. The kind column tells what a row counts:
+--
+--   'total'      all statements, item is the empty string.
+--   'predicate'  statements with predicate URI item.
+--   'graph'      statements in the graph with ID item.
+--   'type'       statements whose object has type ID item (0 for
+--                resources, see the types table).
+--
+-- The subjects and objects columns hold the number of distinct
+-- subjects and objects for the 'total' and 'predicate' rows, and are
+-- NULL otherwise. Deleting statements doesn't update the distinct
+-- counts, which are then upper bounds until the next
+-- relrdf_analyze().
+DROP TABLE IF EXISTS relrdf_stats;
+CREATE TABLE relrdf_stats (
+  kind varchar(15) NOT NULL,
+  item text NOT NULL,
+  triples bigint NOT NULL,
+  subjects bigint,
+  objects bigint,
+  PRIMARY KEY (kind, item)
+);
+
+
+-- Give the roles allowed to modify the statements table (see
+-- create-user.sql) all privileges on the table or sequence
+-- objName. Tables created after users were initialized must be
+-- granted this way, since statements are inserted and removed with
+-- the privileges of the importing user.
+CREATE OR REPLACE FUNCTION relrdf_grant_users(objName text)
+    RETURNS void AS $$
+  DECLARE
+    r record;
+  BEGIN
+    FOR r IN SELECT rolname
+             FROM pg_roles
+             WHERE rolname <> current_user AND
+                   has_table_privilege(rolname, 'statements',
+                                       'INSERT') LOOP
+      EXECUTE 'GRANT ALL ON ' || quote_ident(objName) || ' TO ' ||
+        quote_ident(r.rolname);
+    END LOOP;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+SELECT relrdf_grant_users('relrdf_stats');
+
+
+-- Add to (or, with negative values, subtract from) the counts in a
+-- single statistics row, creating it if necessary.
+CREATE OR REPLACE FUNCTION relrdf_stats_add(p_kind varchar, p_item text,
+                                            p_triples bigint,
+                                            p_subjects bigint,
+                                            p_objects bigint)
+    RETURNS void AS $$
+  BEGIN
+    -- Distinct counts are NULL for the rows not keeping them.
+    UPDATE relrdf_stats
+      SET triples = greatest(triples + p_triples, 0),
+          subjects = CASE WHEN subjects IS NOT NULL
+                          THEN greatest(subjects + COALESCE(p_subjects, 0),
+                                        0) END,
+          objects = CASE WHEN objects IS NOT NULL
+                         THEN greatest(objects + COALESCE(p_objects, 0),
+                                       0) END
+      WHERE kind = p_kind AND item = p_item;
+    IF NOT FOUND THEN
+      INSERT INTO relrdf_stats (kind, item, triples, subjects, objects)
+        VALUES (p_kind, p_item, greatest(p_triples, 0),
+                CASE WHEN p_subjects IS NOT NULL
+                     THEN greatest(p_subjects, 0) END,
+                CASE WHEN p_objects IS NOT NULL
+                     THEN greatest(p_objects, 0) END);
+    END IF;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+
+-- Recount the statements in a single graph.
+CREATE OR REPLACE FUNCTION relrdf_stats_count_graph(graphId integer)
+    RETURNS void AS $$
+  DECLARE
+    total bigint;
+  BEGIN
+    SELECT count(*) INTO total
+      FROM graph_statement
+      WHERE graph_id = graphId;
+
+    DELETE FROM relrdf_stats
+      WHERE kind = 'graph' AND item = graphId::text;
+    IF total > 0 THEN
+      INSERT INTO relrdf_stats (kind, item, triples)
+        VALUES ('graph', graphId::text, total);
+    END IF;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+
+-- Compute all statistics from scratch.
+CREATE OR REPLACE FUNCTION relrdf_analyze()
+    RETURNS void AS $$
+  BEGIN
+    -- Keep the statistics consistent with the data.
+    LOCK TABLE statements, graph_statement IN SHARE MODE;
+
+    DELETE FROM relrdf_stats;
+
+    INSERT INTO relrdf_stats (kind, item, triples, subjects, objects)
+      SELECT 'total', '', count(*), count(DISTINCT subject),
+             count(DISTINCT object)
+      FROM statements;
+
+    INSERT INTO relrdf_stats (kind, item, triples, subjects, objects)
+      SELECT 'predicate', text(rdf_term_to_string(predicate)), count(*),
+             count(DISTINCT subject), count(DISTINCT object)
+      FROM statements
+      GROUP BY predicate;
+
+    INSERT INTO relrdf_stats (kind, item, triples)
+      SELECT 'graph', graph_id::text, count(*)
+      FROM graph_statement
+      GROUP BY graph_id;
+
+    INSERT INTO relrdf_stats (kind, item, triples)
+      SELECT 'type', rdf_term_get_type_id(object)::text, count(*)
+      FROM statements
+      GROUP BY rdf_term_get_type_id(object);
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+
+-- Insert raw statements from statements_temp1 into the graphs given
+-- by their graph_id column, and update the statistics
+-- accordingly. Returns the number of statements that were new to the
+-- statements table.
+CREATE OR REPLACE FUNCTION insert_statements()
+    RETURNS integer AS $$
+  DECLARE
+    inserted integer;
+    added integer;
+    lastId integer;
+    graphCount integer;
+    graphId integer;
+    delta record;
+  BEGIN
+    -- Concurrent loaders could otherwise insert the same statements
+    -- twice, since there is no unique constraint to protect us.
+    LOCK TABLE statements, graph_statement IN SHARE ROW EXCLUSIVE MODE;
+
+    -- With the lock held, the statements inserted below are exactly
+    -- those with an ID above lastId.
+    SELECT COALESCE(max(id), 0) INTO lastId FROM statements;
+
+    -- Insert the statements not yet present in the statements
+    -- table. The input is not guaranteed to be duplicate-free.
+    INSERT INTO statements (subject, predicate, object)
+      SELECT DISTINCT st.subject, st.predicate, st.object
+      FROM statements_temp1 st
+      WHERE st.subject IS NOT NULL AND
+            st.predicate IS NOT NULL AND
+            st.object IS NOT NULL AND
+            NOT EXISTS (SELECT 1
+                        FROM statements s
+                        WHERE s.subject = st.subject AND
+                              s.predicate = st.predicate AND
+                              s.object = st.object);
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+
+    -- Count the new statements per predicate. Subjects and objects
+    -- are only counted if they are new to the predicate.
+    IF inserted > 0 THEN
+      FOR delta IN
+        SELECT text(rdf_term_to_string(n.predicate)) AS item,
+               count(*) AS triples,
+               count(DISTINCT CASE WHEN NOT EXISTS
+                       (SELECT 1
+                        FROM statements s
+                        WHERE s.subject = n.subject AND
+                              s.predicate = n.predicate AND
+                              s.id <= lastId)
+                     THEN n.subject END) AS subjects,
+               count(DISTINCT CASE WHEN NOT EXISTS
+                       (SELECT 1
+                        FROM statements s
+                        WHERE s.object = n.object AND
+                              s.predicate = n.predicate AND
+                              s.id <= lastId)
+                     THEN n.object END) AS objects
+        FROM statements n
+        WHERE n.id > lastId
+        GROUP BY n.predicate
+      LOOP
+        PERFORM relrdf_stats_add('predicate', delta.item, delta.triples,
+                                 delta.subjects, delta.objects);
+      END LOOP;
+
+      FOR delta IN
+        SELECT rdf_term_get_type_id(n.object)::text AS item,
+               count(*) AS triples
+        FROM statements n
+        WHERE n.id > lastId
+        GROUP BY rdf_term_get_type_id(n.object)
+      LOOP
+        PERFORM relrdf_stats_add('type', delta.item, delta.triples,
+                                 NULL, NULL);
+      END LOOP;
+
+      -- The overall distinct counts are estimated from the new
+      -- subjects and objects in the batch.
+      PERFORM relrdf_stats_add('total', '', inserted,
+        (SELECT count(DISTINCT n.subject)
+         FROM statements n
+         WHERE n.id > lastId AND
+               NOT EXISTS (SELECT 1
+                           FROM statements s
+                           WHERE s.subject = n.subject AND
+                                 s.id <= lastId)),
+        (SELECT count(DISTINCT n.object)
+         FROM statements n
+         WHERE n.id > lastId AND
+               NOT EXISTS (SELECT 1
+                           FROM statements s
+                           WHERE s.object = n.object AND
+                                 s.id <= lastId)));
+    END IF;
+
+    -- Add the statements to their graphs.
+    INSERT INTO graph_statement (graph_id, stmt_id)
+      SELECT DISTINCT st.graph_id, s.id
+      FROM statements_temp1 st JOIN statements s
+        ON s.subject = st.subject AND
+           s.predicate = st.predicate AND
+           s.object = st.object
+      WHERE NOT EXISTS (SELECT 1
+                        FROM graph_statement gs
+                        WHERE gs.graph_id = st.graph_id AND
+                              gs.stmt_id = s.id);
+    GET DIAGNOSTICS added = ROW_COUNT;
+
+    -- Batches normally go to a single graph, whose count can be
+    -- updated directly. Otherwise, recount the graphs involved.
+    SELECT count(DISTINCT graph_id), min(graph_id)
+      INTO graphCount, graphId
+      FROM statements_temp1;
+    IF graphCount = 1 THEN
+      PERFORM relrdf_stats_add('graph', graphId::text, added, NULL, NULL);
+    ELSIF graphCount > 1 THEN
+      FOR graphId IN
+        SELECT DISTINCT graph_id FROM statements_temp1
+      LOOP
+        PERFORM relrdf_stats_count_graph(graphId);
+      END LOOP;
+    END IF;
+
+    -- Drop the raw statements.
+    TRUNCATE TABLE statements_temp1;
+
+    RETURN inserted;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+
+SELECT relrdf_analyze();
@@ -0,0 +1,134 @@
+-- -*- SQL -*-
+--
+-- This file is part of RelRDF, a library for storage and
+-- comparison of RDF models.
+--
+-- Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+--                         Software Engineering (IESE).
+--
+-- RelRDF is free software; you can redistribute it and/or
+-- modify it under the terms of the GNU Lesser General Public
+-- License as published by the Free Software Foundation; either
+-- version 2 of the License, or (at your option) any later version.
+--
+-- This library is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+-- Lesser General Public License for more details.
+--
+-- You should have received a copy of the GNU Lesser General Public
+-- License along with this library; if not, write to the
+-- Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+-- Boston, MA 02111-1307, USA. 
+
+-- Upgrade the basic schema from version 3 to version 4.
+--
+-- Version 4 adds an optional, denormalized quads table, holding a
+-- copy of every statement for every graph it belongs to. Queries
+-- mapped to it (see the 'quads' model type) need a single relation
+-- per statement pattern instead of a join of graph_statement and
+-- statements. The table is created and filled by
+-- relrdf_enable_quads() and kept up to date by triggers on
+-- graph_statement, so nothing changes for databases not using it.
+
+UPDATE relrdf_schema_version SET version = 4 WHERE name = 'basic';
+
+
+-- Copy a new graph membership into the quads table.
+CREATE OR REPLACE FUNCTION relrdf_quads_insert()
+    RETURNS trigger AS $$
+  BEGIN
+    INSERT INTO quads (graph_id, stmt_id, subject, predicate, object)
+      SELECT NEW.graph_id, s.id, s.subject, s.predicate, s.object
+      FROM statements s
+      WHERE s.id = NEW.stmt_id;
+    RETURN NULL;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+-- Remove a deleted graph membership from the quads table.
+CREATE OR REPLACE FUNCTION relrdf_quads_delete()
+    RETURNS trigger AS $$
+  BEGIN
+    DELETE FROM quads
+      WHERE graph_id = OLD.graph_id AND
+            stmt_id = OLD.stmt_id;
+    RETURN NULL;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+
+-- Return true if the quads table exists.
+CREATE OR REPLACE FUNCTION relrdf_has_quads()
+    RETURNS boolean AS $$
+  SELECT EXISTS (SELECT 1
+                 FROM pg_class
+                 WHERE relname = 'quads' AND
+                       relkind = 'r' AND
+                       pg_table_is_visible(oid));
+$$ LANGUAGE SQL STABLE;
+
+
+-- Create and fill the quads table, and start maintaining it. Does
+-- nothing if the table already exists.
+CREATE OR REPLACE FUNCTION relrdf_enable_quads()
+    RETURNS void AS $$
+  BEGIN
+    IF relrdf_has_quads() THEN
+      RETURN;
+    END IF;
+
+    -- No changes while the table is being filled.
+    LOCK TABLE statements, graph_statement IN SHARE MODE;
+
+    CREATE TABLE quads (
+      graph_id integer NOT NULL,
+      stmt_id integer NOT NULL,
+      subject rdf_term NOT NULL,
+      predicate rdf_term NOT NULL,
+      object rdf_term NOT NULL,
+      PRIMARY KEY (graph_id, stmt_id)
+    );
+
+    INSERT INTO quads (graph_id, stmt_id, subject, predicate, object)
+      SELECT gs.graph_id, s.id, s.subject, s.predicate, s.object
+      FROM graph_statement gs JOIN statements s
+        ON s.id = gs.stmt_id;
+
+    -- Indexes are built after filling the table, which is much
+    -- faster. As for the statements table, objects are only hash
+    -- indexed, since long literals don't fit into btree entries.
+    CREATE INDEX quads_subject_predicate_index
+      ON quads (subject, predicate, graph_id);
+    CREATE INDEX quads_predicate_index
+      ON quads (predicate, graph_id);
+    CREATE INDEX quads_object_hash_index
+      ON quads USING hash (object);
+
+    CREATE TRIGGER relrdf_quads_insert_trigger
+      AFTER INSERT ON graph_statement
+      FOR EACH ROW EXECUTE PROCEDURE relrdf_quads_insert();
+    CREATE TRIGGER relrdf_quads_delete_trigger
+      AFTER DELETE ON graph_statement
+      FOR EACH ROW EXECUTE PROCEDURE relrdf_quads_delete();
+
+    ANALYZE quads;
+
+    -- The triggers run with the privileges of the importing user.
+    PERFORM relrdf_grant_users('quads');
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+-- Stop maintaining the quads table and drop it.
+CREATE OR REPLACE FUNCTION relrdf_disable_quads()
+    RETURNS void AS $$
+  BEGIN
+    IF NOT relrdf_has_quads() THEN
+      RETURN;
+    END IF;
+
+    DROP TRIGGER relrdf_quads_insert_trigger ON graph_statement;
+    DROP TRIGGER relrdf_quads_delete_trigger ON graph_statement;
+    DROP TABLE quads;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
@@ -0,0 +1,208 @@
+-- -*- SQL -*-
+--
+-- This file is part of RelRDF, a library for storage and
+-- comparison of RDF models.
+--
+-- Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+--                         Software Engineering (IESE).
+--
+-- RelRDF is free software; you can redistribute it and/or
+-- modify it under the terms of the GNU Lesser General Public
+-- License as published by the Free Software Foundation; either
+-- version 2 of the License, or (at your option) any later version.
+--
+-- This library is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+-- Lesser General Public License for more details.
+--
+-- You should have received a copy of the GNU Lesser General Public
+-- License along with this library; if not, write to the
+-- Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+-- Boston, MA 02111-1307, USA. 
+
+-- Upgrade the basic schema from version 4 to version 5.
+--
+-- Version 5 adds optional dictionary encoded term storage: a terms
+-- table assigning an integer ID to every term, and a term_quads
+-- table holding the statements of every graph as term IDs. Queries
+-- mapped to it (see the 'termids' model type) join and filter on
+-- integers, and only convert IDs back to terms for the values they
+-- return. As for the quads table, the tables are created by
+-- relrdf_enable_term_ids() and kept up to date by triggers on
+-- graph_statement.
+--
+-- Terms are identified using the = operator on rdf_term, which is
+-- also used to tell statements apart in the statements table.
+
+UPDATE relrdf_schema_version SET version = 5 WHERE name = 'basic';
+
+
+-- Return the ID of a term, adding it to the dictionary if necessary.
+-- Callers must prevent concurrent additions (graph_statement is
+-- always written with the statements table locked).
+CREATE OR REPLACE FUNCTION relrdf_term_id(t rdf_term)
+    RETURNS bigint AS $$
+  DECLARE
+    termId bigint;
+  BEGIN
+    SELECT id INTO termId FROM terms WHERE term = t;
+    IF NOT FOUND THEN
+      termId := nextval('terms_id_seq');
+      INSERT INTO terms (id, term) VALUES (termId, t);
+    END IF;
+    RETURN termId;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE STRICT;
+
+-- Return the ID of a term, or 0 if it isn't in the dictionary.
+-- Used by queries for the constants they compare with. Term IDs
+-- start at 1, so that 0 never matches a stored term, and comparisons
+-- with missing terms are false (=) or true (<>) instead of NULL.
+-- (The term functions are written in PL/pgSQL, since SQL function
+-- bodies are checked when created, and the terms table may not exist
+-- yet.)
+CREATE OR REPLACE FUNCTION relrdf_term_lookup(t rdf_term)
+    RETURNS bigint AS $$
+  BEGIN
+    RETURN COALESCE((SELECT id FROM terms WHERE term = t), 0);
+  END
+$$ LANGUAGE 'plpgsql' STABLE STRICT;
+
+-- Return the term with the given ID. Used by queries for the values
+-- they return.
+CREATE OR REPLACE FUNCTION relrdf_term_value(termId bigint)
+    RETURNS rdf_term AS $$
+  BEGIN
+    RETURN (SELECT term FROM terms WHERE id = termId);
+  END
+$$ LANGUAGE 'plpgsql' STABLE STRICT;
+
+
+-- Copy a new graph membership into the term_quads table.
+CREATE OR REPLACE FUNCTION relrdf_term_quads_insert()
+    RETURNS trigger AS $$
+  BEGIN
+    INSERT INTO term_quads (graph_id, stmt_id, subject, predicate, object)
+      SELECT NEW.graph_id, s.id, relrdf_term_id(s.subject),
+             relrdf_term_id(s.predicate), relrdf_term_id(s.object)
+      FROM statements s
+      WHERE s.id = NEW.stmt_id;
+    RETURN NULL;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+-- Remove a deleted graph membership from the term_quads table. Terms
+-- stay in the dictionary.
+CREATE OR REPLACE FUNCTION relrdf_term_quads_delete()
+    RETURNS trigger AS $$
+  BEGIN
+    DELETE FROM term_quads
+      WHERE graph_id = OLD.graph_id AND
+            stmt_id = OLD.stmt_id;
+    RETURN NULL;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+
+-- Return true if the term tables exist.
+CREATE OR REPLACE FUNCTION relrdf_has_term_ids()
+    RETURNS boolean AS $$
+  SELECT EXISTS (SELECT 1
+                 FROM pg_class
+                 WHERE relname = 'term_quads' AND
+                       relkind = 'r' AND
+                       pg_table_is_visible(oid));
+$$ LANGUAGE SQL STABLE;
+
+
+-- Create and fill the term tables, and start maintaining them. Does
+-- nothing if the tables already exist.
+CREATE OR REPLACE FUNCTION relrdf_enable_term_ids()
+    RETURNS void AS $$
+  BEGIN
+    IF relrdf_has_term_ids() THEN
+      RETURN;
+    END IF;
+
+    -- No changes while the tables are being filled.
+    LOCK TABLE statements, graph_statement IN SHARE MODE;
+
+    -- 0 stands for missing terms, see relrdf_term_lookup().
+    CREATE SEQUENCE terms_id_seq MINVALUE 1 START 1;
+    CREATE TABLE terms (
+      id bigint PRIMARY KEY,
+      term rdf_term NOT NULL
+    );
+
+    -- Fill the dictionary with a single pass over the distinct
+    -- terms, instead of looking up every term separately.
+    INSERT INTO terms (id, term)
+      SELECT nextval('terms_id_seq'), t.term
+      FROM (SELECT subject AS term FROM statements
+            UNION
+            SELECT predicate FROM statements
+            UNION
+            SELECT object FROM statements) t;
+
+    CREATE INDEX terms_term_hash_index
+      ON terms USING hash (term);
+    ANALYZE terms;
+
+    CREATE TABLE term_quads (
+      graph_id integer NOT NULL,
+      stmt_id integer NOT NULL,
+      subject bigint NOT NULL,
+      predicate bigint NOT NULL,
+      object bigint NOT NULL,
+      PRIMARY KEY (graph_id, stmt_id)
+    );
+
+    INSERT INTO term_quads (graph_id, stmt_id, subject, predicate, object)
+      SELECT gs.graph_id, s.id, ts.id, tp.id, tobj.id
+      FROM graph_statement gs
+        JOIN statements s ON s.id = gs.stmt_id
+        JOIN terms ts ON ts.term = s.subject
+        JOIN terms tp ON tp.term = s.predicate
+        JOIN terms tobj ON tobj.term = s.object;
+
+    -- Integer keys are small enough to index in all the usual
+    -- orders.
+    CREATE INDEX term_quads_spo_index
+      ON term_quads (subject, predicate, object, graph_id);
+    CREATE INDEX term_quads_pos_index
+      ON term_quads (predicate, object, subject, graph_id);
+    CREATE INDEX term_quads_osp_index
+      ON term_quads (object, subject, predicate, graph_id);
+
+    CREATE TRIGGER relrdf_term_quads_insert_trigger
+      AFTER INSERT ON graph_statement
+      FOR EACH ROW EXECUTE PROCEDURE relrdf_term_quads_insert();
+    CREATE TRIGGER relrdf_term_quads_delete_trigger
+      AFTER DELETE ON graph_statement
+      FOR EACH ROW EXECUTE PROCEDURE relrdf_term_quads_delete();
+
+    ANALYZE term_quads;
+
+    -- The triggers run with the privileges of the importing user.
+    PERFORM relrdf_grant_users('terms');
+    PERFORM relrdf_grant_users('terms_id_seq');
+    PERFORM relrdf_grant_users('term_quads');
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+-- Stop maintaining the term tables and drop them.
+CREATE OR REPLACE FUNCTION relrdf_disable_term_ids()
+    RETURNS void AS $$
+  BEGIN
+    IF NOT relrdf_has_term_ids() THEN
+      RETURN;
+    END IF;
+
+    DROP TRIGGER relrdf_term_quads_insert_trigger ON graph_statement;
+    DROP TRIGGER relrdf_term_quads_delete_trigger ON graph_statement;
+    DROP TABLE term_quads;
+    DROP TABLE terms;
+    DROP SEQUENCE terms_id_seq;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
@@ -0,0 +1,125 @@
+-- -*- SQL -*-
+--
+-- This file is part of RelRDF, a library for storage and
+-- comparison of RDF models.
+--
+-- Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+--                         Software Engineering (IESE).
+--
+-- RelRDF is free software; you can redistribute it and/or
+-- modify it under the terms of the GNU Lesser General Public
+-- License as published by the Free Software Foundation; either
+-- version 2 of the License, or (at your option) any later version.
+--
+-- This library is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+-- Lesser General Public License for more details.
+--
+-- You should have received a copy of the GNU Lesser General Public
+-- License along with this library; if not, write to the
+-- Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+-- Boston, MA 02111-1307, USA. 
+
+-- Upgrade the basic schema from version 5 to version 6.
+--
+-- Version 6 adds a byte order B-tree operator class for rdf_term
+-- (rdf_term_byte_ops). Its equality operator is the regular = (which
+-- compares textual values byte-wise), but unlike the default
+-- operator class, it doesn't order textual values using the database
+-- locale. Indexes only used for equality lookups are rebuilt with it,
+-- so that building and searching them doesn't involve strcoll().
+--
+-- The operator class is defined here instead of in rdf_term.sql, so
+-- that existing databases get it as well. It needs a version of
+-- rdf_term.so providing the rdf_term_byte_* functions.
+
+UPDATE relrdf_schema_version SET version = 6 WHERE name = 'basic';
+
+
+CREATE OR REPLACE FUNCTION rdf_term_byte_compare(rdf_term, rdf_term)
+  RETURNS int4
+  AS 'rdf_term'
+  LANGUAGE C IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION rdf_term_byte_less(rdf_term, rdf_term)
+  RETURNS bool
+  AS 'rdf_term'
+  LANGUAGE C IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION rdf_term_byte_less_equal(rdf_term, rdf_term)
+  RETURNS bool
+  AS 'rdf_term'
+  LANGUAGE C IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION rdf_term_byte_greater_equal(rdf_term, rdf_term)
+  RETURNS bool
+  AS 'rdf_term'
+  LANGUAGE C IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION rdf_term_byte_greater(rdf_term, rdf_term)
+  RETURNS bool
+  AS 'rdf_term'
+  LANGUAGE C IMMUTABLE STRICT;
+
+CREATE OPERATOR ~<~ (
+	procedure = rdf_term_byte_less,
+	leftarg = rdf_term,
+	rightarg = rdf_term,
+	commutator = ~>~,
+	negator = ~>=~,
+	restrict = scalarltsel,
+	join = scalarltjoinsel
+);
+
+CREATE OPERATOR ~<=~ (
+	procedure = rdf_term_byte_less_equal,
+	leftarg = rdf_term,
+	rightarg = rdf_term,
+	commutator = ~>=~,
+	negator = ~>~,
+	restrict = scalarltsel,
+	join = scalarltjoinsel
+);
+
+CREATE OPERATOR ~>=~ (
+	procedure = rdf_term_byte_greater_equal,
+	leftarg = rdf_term,
+	rightarg = rdf_term,
+	commutator = ~<=~,
+	negator = ~<~,
+	restrict = scalargtsel,
+	join = scalargtjoinsel
+);
+
+CREATE OPERATOR ~>~ (
+	procedure = rdf_term_byte_greater,
+	leftarg = rdf_term,
+	rightarg = rdf_term,
+	commutator = ~<~,
+	negator = ~<=~,
+	restrict = scalargtsel,
+	join = scalargtjoinsel
+);
+
+CREATE OPERATOR CLASS rdf_term_byte_ops
+	FOR TYPE rdf_term USING btree AS
+		OPERATOR 1 ~<~,
+		OPERATOR 2 ~<=~,
+		OPERATOR 3 =,
+		OPERATOR 4 ~>=~,
+		OPERATOR 5 ~>~,
+		FUNCTION 1 rdf_term_byte_compare(rdf_term, rdf_term);
+
+
+-- Statement lookups by predicate and by subject are equality
+-- lookups. Range queries and ORDER BY on these columns can't use the
+-- indexes anymore, but they are rare in SPARQL queries.
+
+DROP INDEX statements_predicate_index;
+CREATE INDEX statements_predicate_index
+  ON statements (predicate rdf_term_byte_ops);
+
+DROP INDEX statements_subject_predicate_index;
+CREATE INDEX statements_subject_predicate_index
+  ON statements (subject rdf_term_byte_ops, predicate rdf_term_byte_ops);
@@ -0,0 +1,404 @@
+-- -*- SQL -*-
+--
+-- This file is part of RelRDF, a library for storage and
+-- comparison of RDF models.
+--
+-- Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+--                         Software Engineering (IESE).
+--
+-- RelRDF is free software; you can redistribute it and/or
+-- modify it under the terms of the GNU Lesser General Public
+-- License as published by the Free Software Foundation; either
+-- version 2 of the License, or (at your option) any later version.
+--
+-- This library is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+-- Lesser General Public License for more details.
+--
+-- You should have received a copy of the GNU Lesser General Public
+-- License along with this library; if not, write to the
+-- Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+-- Boston, MA 02111-1307, USA. 
+
+-- Upgrade the basic schema from version 6 to version 7.
+--
+-- Version 7 keeps the comparison graphs built for two-way models
+-- (see relrdf_compare_graphs()) across sessions. The graphs compared
+-- are recorded in the relrdf_comparisons table, and the timeout
+-- column of the graphs table, unused so far, holds the time every
+-- compared graph was last modified. The comparison graphs are up to date as
+-- long as they are not older than the graphs compared. Statements
+-- inserted into or deleted from the compared graphs are applied to
+-- the comparison graphs, so that they stay up to date.
+
+UPDATE relrdf_schema_version SET version = 7 WHERE name = 'basic';
+
+
+CREATE TABLE relrdf_comparisons (
+  graph_a integer NOT NULL,
+  graph_b integer NOT NULL,
+  graph_only_a integer NOT NULL,
+  graph_only_b integer NOT NULL,
+  graph_both integer NOT NULL,
+  PRIMARY KEY (graph_a, graph_b)
+);
+
+CREATE INDEX relrdf_comparisons_graph_b_index
+  ON relrdf_comparisons (graph_b);
+
+SELECT relrdf_grant_users('relrdf_comparisons');
+
+
+-- Return the ID of the graph with the given URI, creating the graph
+-- if necessary.
+CREATE OR REPLACE FUNCTION relrdf_graph_id(graphUri text)
+    RETURNS integer AS $$
+  DECLARE
+    graphId integer;
+  BEGIN
+    SELECT graph_id INTO graphId
+      FROM graphs
+      WHERE graph_uri = graphUri;
+    IF graphId IS NULL THEN
+      INSERT INTO graphs (graph_uri)
+        VALUES (graphUri)
+        RETURNING graph_id INTO graphId;
+    END IF;
+    RETURN graphId;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+-- Return true if the comparison graphs for graphs graphA and graphB
+-- are at least as recent as both graphs. Graphs never modified since
+-- schema version 7 have no modification time.
+CREATE OR REPLACE FUNCTION relrdf_compare_current(graphA integer,
+                                                  graphB integer,
+                                                  graphBoth integer)
+    RETURNS boolean AS $$
+  SELECT COALESCE(
+           (SELECT timeout FROM graphs WHERE graph_id = $3) >=
+           (SELECT max(COALESCE(timeout, '-infinity'))
+            FROM graphs
+            WHERE graph_id IN ($1, $2)),
+           false);
+$$ LANGUAGE 'sql' STABLE;
+
+-- Make sure the comparison graphs for graphs graphA and graphB
+-- (holding the statements only in graphA, only in graphB and in both
+-- graphs, and identified by the given URIs) exist and are up to
+-- date. Returns true if they had to be built, or false if the
+-- existing ones could be used.
+CREATE OR REPLACE FUNCTION relrdf_compare_graphs(graphA integer,
+                                                 graphB integer,
+                                                 uriOnlyA text,
+                                                 uriOnlyB text,
+                                                 uriBoth text)
+    RETURNS boolean AS $$
+  DECLARE
+    graphOnlyA integer;
+    graphOnlyB integer;
+    graphBoth integer;
+  BEGIN
+    graphOnlyA := relrdf_graph_id(uriOnlyA);
+    graphOnlyB := relrdf_graph_id(uriOnlyB);
+    graphBoth := relrdf_graph_id(uriBoth);
+
+    -- Wait for pending modifications to the compared graphs, and
+    -- keep other sessions from building the same comparison
+    -- concurrently.
+    PERFORM 1
+      FROM graphs
+      WHERE graph_id IN (graphA, graphB)
+      ORDER BY graph_id
+      FOR SHARE;
+    PERFORM 1 FROM graphs WHERE graph_id = graphBoth FOR UPDATE;
+
+    IF EXISTS (SELECT 1
+               FROM relrdf_comparisons
+               WHERE graph_a = graphA AND graph_b = graphB AND
+                     graph_only_a = graphOnlyA AND
+                     graph_only_b = graphOnlyB AND
+                     graph_both = graphBoth) AND
+       relrdf_compare_current(graphA, graphB, graphBoth) THEN
+      RETURN false;
+    END IF;
+
+    -- Build the comparison graphs from scratch.
+    DELETE FROM graph_statement
+      WHERE graph_id IN (graphOnlyA, graphOnlyB, graphBoth);
+
+    INSERT INTO graph_statement (stmt_id, graph_id)
+      SELECT COALESCE(a.stmt_id, b.stmt_id),
+             CASE WHEN a.stmt_id IS NULL THEN graphOnlyB
+                  WHEN b.stmt_id IS NULL THEN graphOnlyA
+                  ELSE graphBoth END
+      FROM (SELECT stmt_id
+            FROM graph_statement
+            WHERE graph_id = graphA) AS a
+           FULL JOIN
+           (SELECT stmt_id
+            FROM graph_statement
+            WHERE graph_id = graphB) AS b
+           ON a.stmt_id = b.stmt_id;
+
+    DELETE FROM relrdf_comparisons
+      WHERE graph_a = graphA AND graph_b = graphB;
+    INSERT INTO relrdf_comparisons (graph_a, graph_b, graph_only_a,
+                                    graph_only_b, graph_both)
+      VALUES (graphA, graphB, graphOnlyA, graphOnlyB, graphBoth);
+
+    UPDATE graphs SET timeout = clock_timestamp()
+      WHERE graph_id IN (graphOnlyA, graphOnlyB, graphBoth);
+
+    PERFORM relrdf_stats_count_graph(graphOnlyA);
+    PERFORM relrdf_stats_count_graph(graphOnlyB);
+    PERFORM relrdf_stats_count_graph(graphBoth);
+
+    RETURN true;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+-- Lock the graphs referenced by the raw statements in
+-- statements_temp1 against concurrent comparisons. Graph rows must
+-- always be locked before graph_statement, as relrdf_compare_graphs()
+-- does, so this has to be called before graph_statement is locked or
+-- modified.
+CREATE OR REPLACE FUNCTION relrdf_compare_lock()
+    RETURNS void AS $$
+  BEGIN
+    PERFORM 1
+      FROM graphs
+      WHERE graph_id IN (SELECT graph_id FROM statements_temp1)
+      ORDER BY graph_id
+      FOR UPDATE;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+-- Record the modification of the graphs referenced by the raw
+-- statements in statements_temp1, which have just been inserted into
+-- or deleted from them, and apply the changes to the comparisons
+-- involving these graphs. Comparisons already out of date are left
+-- alone, they will be built again when needed. This is called for
+-- every batch, so it returns right away if the graphs aren't
+-- compared at all.
+CREATE OR REPLACE FUNCTION relrdf_compare_apply()
+    RETURNS void AS $$
+  DECLARE
+    stamp timestamp;
+    cmps relrdf_comparisons[];
+    cmp relrdf_comparisons;
+    i integer;
+  BEGIN
+    -- Wait for comparisons of the graphs being built concurrently.
+    -- Callers normally hold these locks already.
+    PERFORM relrdf_compare_lock();
+
+    -- With the locks held, no comparison of the graphs can be
+    -- created until we commit. Graphs that aren't compared don't
+    -- need a modification time, since comparisons built later are
+    -- more recent anyway.
+    IF NOT EXISTS (SELECT 1
+                   FROM relrdf_comparisons c
+                   WHERE c.graph_a IN (SELECT graph_id
+                                       FROM statements_temp1) OR
+                         c.graph_b IN (SELECT graph_id
+                                       FROM statements_temp1)) THEN
+      RETURN;
+    END IF;
+
+    stamp := clock_timestamp();
+
+    -- Find the comparisons to update before marking the graphs as
+    -- modified.
+    cmps := ARRAY(
+      SELECT c
+      FROM relrdf_comparisons c
+      WHERE (c.graph_a IN (SELECT graph_id FROM statements_temp1) OR
+             c.graph_b IN (SELECT graph_id FROM statements_temp1)) AND
+            relrdf_compare_current(c.graph_a, c.graph_b, c.graph_both));
+
+    UPDATE graphs SET timeout = stamp
+      WHERE graph_id IN (SELECT DISTINCT graph_id
+                         FROM statements_temp1);
+
+    FOR i IN 1 .. COALESCE(array_upper(cmps, 1), 0) LOOP
+      cmp := cmps[i];
+
+      -- Classify the affected statements again. Statements deleted
+      -- from both graphs aren't inserted anymore.
+      DELETE FROM graph_statement
+        WHERE graph_id IN (cmp.graph_only_a, cmp.graph_only_b,
+                           cmp.graph_both) AND
+              stmt_id IN (SELECT s.id
+                          FROM statements s JOIN statements_temp1 st
+                            ON s.subject = st.subject AND
+                               s.predicate = st.predicate AND
+                               s.object = st.object
+                          WHERE st.graph_id IN (cmp.graph_a,
+                                                cmp.graph_b));
+
+      INSERT INTO graph_statement (stmt_id, graph_id)
+        SELECT d.id,
+               CASE WHEN a.stmt_id IS NULL THEN cmp.graph_only_b
+                    WHEN b.stmt_id IS NULL THEN cmp.graph_only_a
+                    ELSE cmp.graph_both END
+        FROM (SELECT DISTINCT s.id
+              FROM statements s JOIN statements_temp1 st
+                ON s.subject = st.subject AND
+                   s.predicate = st.predicate AND
+                   s.object = st.object
+              WHERE st.graph_id IN (cmp.graph_a, cmp.graph_b)) AS d
+             LEFT JOIN graph_statement a
+               ON a.graph_id = cmp.graph_a AND a.stmt_id = d.id
+             LEFT JOIN graph_statement b
+               ON b.graph_id = cmp.graph_b AND b.stmt_id = d.id
+        WHERE a.stmt_id IS NOT NULL OR b.stmt_id IS NOT NULL;
+
+      UPDATE graphs SET timeout = stamp
+        WHERE graph_id IN (cmp.graph_only_a, cmp.graph_only_b,
+                           cmp.graph_both);
+
+      PERFORM relrdf_stats_count_graph(cmp.graph_only_a);
+      PERFORM relrdf_stats_count_graph(cmp.graph_only_b);
+      PERFORM relrdf_stats_count_graph(cmp.graph_both);
+    END LOOP;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
+
+
+-- Insert raw statements from statements_temp1 into the graphs given
+-- by their graph_id column, and update the statistics
+-- accordingly, as well as the comparisons involving the graphs (see
+-- relrdf_compare_apply()). Returns the number of statements that were new to the
+-- statements table.
+CREATE OR REPLACE FUNCTION insert_statements()
+    RETURNS integer AS $$
+  DECLARE
+    inserted integer;
+    added integer;
+    lastId integer;
+    graphCount integer;
+    graphId integer;
+    delta record;
+  BEGIN
+    PERFORM relrdf_compare_lock();
+
+    -- Concurrent loaders could otherwise insert the same statements
+    -- twice, since there is no unique constraint to protect us.
+    LOCK TABLE statements, graph_statement IN SHARE ROW EXCLUSIVE MODE;
+
+    -- With the lock held, the statements inserted below are exactly
+    -- those with an ID above lastId.
+    SELECT COALESCE(max(id), 0) INTO lastId FROM statements;
+
+    -- Insert the statements not yet present in the statements
+    -- table. The input is not guaranteed to be duplicate-free.
+    INSERT INTO statements (subject, predicate, object)
+      SELECT DISTINCT st.subject, st.predicate, st.object
+      FROM statements_temp1 st
+      WHERE st.subject IS NOT NULL AND
+            st.predicate IS NOT NULL AND
+            st.object IS NOT NULL AND
+            NOT EXISTS (SELECT 1
+                        FROM statements s
+                        WHERE s.subject = st.subject AND
+                              s.predicate = st.predicate AND
+                              s.object = st.object);
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+
+    -- Count the new statements per predicate. Subjects and objects
+    -- are only counted if they are new to the predicate.
+    IF inserted > 0 THEN
+      FOR delta IN
+        SELECT text(rdf_term_to_string(n.predicate)) AS item,
+               count(*) AS triples,
+               count(DISTINCT CASE WHEN NOT EXISTS
+                       (SELECT 1
+                        FROM statements s
+                        WHERE s.subject = n.subject AND
+                              s.predicate = n.predicate AND
+                              s.id <= lastId)
+                     THEN n.subject END) AS subjects,
+               count(DISTINCT CASE WHEN NOT EXISTS
+                       (SELECT 1
+                        FROM statements s
+                        WHERE s.object = n.object AND
+                              s.predicate = n.predicate AND
+                              s.id <= lastId)
+                     THEN n.object END) AS objects
+        FROM statements n
+        WHERE n.id > lastId
+        GROUP BY n.predicate
+      LOOP
+        PERFORM relrdf_stats_add('predicate', delta.item, delta.triples,
+                                 delta.subjects, delta.objects);
+      END LOOP;
+
+      FOR delta IN
+        SELECT rdf_term_get_type_id(n.object)::text AS item,
+               count(*) AS triples
+        FROM statements n
+        WHERE n.id > lastId
+        GROUP BY rdf_term_get_type_id(n.object)
+      LOOP
+        PERFORM relrdf_stats_add('type', delta.item, delta.triples,
+                                 NULL, NULL);
+      END LOOP;
+
+      -- The overall distinct counts are estimated from the new
+      -- subjects and objects in the batch.
+      PERFORM relrdf_stats_add('total', '', inserted,
+        (SELECT count(DISTINCT n.subject)
+         FROM statements n
+         WHERE n.id > lastId AND
+               NOT EXISTS (SELECT 1
+                           FROM statements s
+                           WHERE s.subject = n.subject AND
+                                 s.id <= lastId)),
+        (SELECT count(DISTINCT n.object)
+         FROM statements n
+         WHERE n.id > lastId AND
+               NOT EXISTS (SELECT 1
+                           FROM statements s
+                           WHERE s.object = n.object AND
+                                 s.id <= lastId)));
+    END IF;
+
+    -- Add the statements to their graphs.
+    INSERT INTO graph_statement (graph_id, stmt_id)
+      SELECT DISTINCT st.graph_id, s.id
+      FROM statements_temp1 st JOIN statements s
+        ON s.subject = st.subject AND
+           s.predicate = st.predicate AND
+           s.object = st.object
+      WHERE NOT EXISTS (SELECT 1
+                        FROM graph_statement gs
+                        WHERE gs.graph_id = st.graph_id AND
+                              gs.stmt_id = s.id);
+    GET DIAGNOSTICS added = ROW_COUNT;
+
+    -- Batches normally go to a single graph, whose count can be
+    -- updated directly. Otherwise, recount the graphs involved.
+    SELECT count(DISTINCT graph_id), min(graph_id)
+      INTO graphCount, graphId
+      FROM statements_temp1;
+    IF graphCount = 1 THEN
+      PERFORM relrdf_stats_add('graph', graphId::text, added, NULL, NULL);
+    ELSIF graphCount > 1 THEN
+      FOR graphId IN
+        SELECT DISTINCT graph_id FROM statements_temp1
+      LOOP
+        PERFORM relrdf_stats_count_graph(graphId);
+      END LOOP;
+    END IF;
+
+    -- Bring the comparisons of the graphs up to date.
+    PERFORM relrdf_compare_apply();
+
+    -- Drop the raw statements.
+    TRUNCATE TABLE statements_temp1;
+
+    RETURN inserted;
+  END
+$$ LANGUAGE 'plpgsql' VOLATILE;
@@ -0,0 +1,345 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""Store statistics and cardinality estimation for the basic schema.
+
+Statistics are read from the ``relrdf_stats`` table, which is
+computed from scratch by `BasicModelbase.analyze` and kept
+approximately current while statements are inserted.
+"""
+
+import time
+
+from relrdf.expression import nodes
+from relrdf.mapping import sqlnodes
+from relrdf.util.methodsync import SyncMethodsMixin, synchronized
+
+
+# Time (in seconds) statistics are kept before being read again.
+MAX_AGE = 600
+
+# Row count assumed for tables with no statistics at all.
+DEFAULT_ROWS = 1000.0
+
+# Fraction of rows assumed to match an equality condition on a column
+# with no statistics.
+DEFAULT_SELECTIVITY = 0.01
+
+
+class StoreStatistics(SyncMethodsMixin):
+    """Statement counts for the whole store, per predicate, per graph
+    and per object type.
+
+    `query` is a callable running an SQL query and returning its rows
+    (see `pool.ConnectionPool`)."""
+
+    __slots__ = ('_query',
+
+                 '_readTime',
+                 '_rows',
+                 '_distinct',
+                 '_predicates',
+                 '_graphs',
+                 '_types')
+
+    def __init__(self, query):
+        super(StoreStatistics, self).__init__()
+
+        self._query = query
+        self.clear()
+
+    @synchronized
+    def clear(self):
+        """Forget the current statistics."""
+        self._readTime = None
+
+        # Row counts per table.
+        self._rows = {}
+
+        # Number of distinct values per (table, column).
+        self._distinct = {}
+
+        # (statements, subjects, objects) triples per predicate URI.
+        self._predicates = {}
+
+        # Statement counts per graph ID and per object type ID.
+        self._graphs = {}
+        self._types = {}
+
+    def _refresh(self):
+        """Read the statistics if they're missing or too old. Must be
+        called with the lock held."""
+        now = time.time()
+        if self._readTime is not None and now - self._readTime < MAX_AGE:
+            return
+
+        self._rows = {}
+        self._distinct = {}
+        self._predicates = {}
+        self._graphs = {}
+        self._types = {}
+        for kind, item, triples, subjects, objects in self._query("""
+                SELECT kind, item, triples, subjects, objects
+                FROM relrdf_stats"""):
+            if kind == 'total':
+                self._rows['statements'] = triples
+                self._distinct['statements', 'subject'] = subjects
+                self._distinct['statements', 'object'] = objects
+            elif kind == 'predicate':
+                self._predicates[item.decode('utf-8')] = \
+                    (triples, subjects, objects)
+            elif kind == 'graph':
+                self._graphs[int(item)] = triples
+            elif kind == 'type':
+                self._types[int(item)] = triples
+
+        self._rows['graph_statement'] = sum(self._graphs.itervalues())
+        self._distinct['statements', 'predicate'] = len(self._predicates)
+        self._distinct['graph_statement', 'graph_id'] = len(self._graphs)
+        if 'statements' in self._rows:
+            self._distinct['graph_statement', 'stmt_id'] = \
+                self._rows['statements']
+
+        self._readTime = now
+
+    def _tableRows(self, table):
+        return max(self._rows.get(table, DEFAULT_ROWS), 1)
+
+    @synchronized
+    def getRows(self, table):
+        """Return the estimated number of rows in `table`."""
+        self._refresh()
+        return self._tableRows(table)
+
+    @synchronized
+    def getDistinct(self, table, column):
+        """Return the estimated number of distinct values in `column`
+        of `table`."""
+        self._refresh()
+        try:
+            return self._distinct[table, column]
+        except KeyError:
+            return self._tableRows(table) * DEFAULT_SELECTIVITY
+
+    @synchronized
+    def getPredicateStats(self, predicate):
+        """Return a ``(statements, subjects, objects)`` tuple with the
+        number of statements with predicate URI `predicate`, and the
+        number of distinct subjects and objects in them."""
+        self._refresh()
+        return self._predicates.get(predicate, (0, 0, 0))
+
+    def getPredicateCount(self, predicate):
+        """Return the estimated number of statements with predicate
+        URI `predicate`."""
+        return self.getPredicateStats(predicate)[0]
+
+    @synchronized
+    def getGraphSize(self, graphId):
+        """Return the estimated number of statements in graph
+        `graphId`."""
+        self._refresh()
+        return self._graphs.get(graphId, 0)
+
+    @synchronized
+    def getPredicates(self):
+        """Return a dictionary mapping predicate URIs to
+        ``(statements, subjects, objects)`` tuples (see
+        `getPredicateStats`)."""
+        self._refresh()
+        return dict(self._predicates)
+
+    @synchronized
+    def getGraphSizes(self):
+        """Return a dictionary mapping graph IDs to statement
+        counts."""
+        self._refresh()
+        return dict(self._graphs)
+
+    @synchronized
+    def getTypeCounts(self):
+        """Return a dictionary mapping object type IDs (0 for
+        resources) to statement counts."""
+        self._refresh()
+        return dict(self._types)
+
+
+def _constantValue(expr):
+    """Return the constant `expr` stands for, or ``None``. Term ID
+    lookups (see `basicquery.TermIdMapping`) stand for the constant
+    term they look up."""
+    if isinstance(expr, sqlnodes.SqlFunctionCall) and \
+            expr.name == 'relrdf_term_lookup' and len(expr) == 1:
+        expr = expr[0]
+
+    if isinstance(expr, (nodes.Uri, nodes.Literal, sqlnodes.SqlInt)):
+        return expr
+    else:
+        return None
+
+def _fieldConstant(cond, incarnation):
+    """If `cond` compares a field of `incarnation` with a constant,
+    return a ``(field name, constant)`` pair, otherwise return
+    ``None``."""
+    if not isinstance(cond, sqlnodes.SqlEqual):
+        return None
+
+    fields = [operand for operand in cond
+              if isinstance(operand, sqlnodes.SqlFieldRef) and
+              operand.incarnation == incarnation]
+    constants = [_constantValue(operand) for operand in cond
+                 if _constantValue(operand) is not None]
+    if len(fields) == 0 or len(constants) == 0:
+        return None
+
+    return fields[0].fieldId, constants[0]
+
+
+class BasicEstimator(object):
+    """A cardinality estimator for the relations of the basic schema
+    (see `relrdf.mapping.joinorder`), using `StoreStatistics`."""
+
+    __slots__ = ('stats',)
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def _condRows(self, table, incarnation, cond):
+        """Return the estimated number of rows from `table` satisfying
+        `cond`, or ``None`` if `cond` can't be estimated."""
+        if isinstance(cond, sqlnodes.SqlOr):
+            total = 0
+            for subexpr in cond:
+                rows = self._condRows(table, incarnation, subexpr)
+                if rows is None:
+                    return None
+                total += rows
+            return total
+
+        if isinstance(cond, sqlnodes.SqlDifferent) and \
+                table == 'graph_statement' and len(cond) == 2:
+            field, value = cond
+            if not isinstance(field, sqlnodes.SqlFieldRef):
+                field, value = value, field
+            if isinstance(field, sqlnodes.SqlFieldRef) and \
+                    field.fieldId == 'graph_id' and \
+                    isinstance(value, sqlnodes.SqlInt):
+                return self.stats.getRows(table) - \
+                    self.stats.getGraphSize(value.val)
+            return None
+
+        fieldConst = _fieldConstant(cond, incarnation)
+        if fieldConst is None:
+            return None
+        fieldId, value = fieldConst
+
+        if table == 'statements' and fieldId == 'predicate' and \
+                isinstance(value, nodes.Uri):
+            return self.stats.getPredicateCount(value.uri)
+        elif table == 'graph_statement' and fieldId == 'graph_id' and \
+                isinstance(value, sqlnodes.SqlInt):
+            return self.stats.getGraphSize(value.val)
+        elif fieldId in ('id', 'stmt_id'):
+            return 1
+        else:
+            return float(self.stats.getRows(table)) / \
+                max(self.stats.getDistinct(table, fieldId), 1)
+
+    def _predicateRows(self, incarnation, conds):
+        """If `conds` restrict the predicate of statements
+        `incarnation` to a constant, return the estimated number of
+        rows and the list of conditions left, otherwise return
+        ``None``."""
+        predicate = None
+        for cond in conds:
+            fieldConst = _fieldConstant(cond, incarnation)
+            if fieldConst is not None and fieldConst[0] == 'predicate' and \
+                    isinstance(fieldConst[1], nodes.Uri):
+                predicate = fieldConst[1].uri
+                break
+        if predicate is None:
+            return None
+
+        # Constant subjects and objects are estimated using the
+        # distinct counts for the predicate.
+        triples, subjects, objects = \
+            self.stats.getPredicateStats(predicate)
+        distinct = {'subject': subjects, 'object': objects}
+
+        rows = float(triples)
+        rest = []
+        for c in conds:
+            if c is cond:
+                continue
+            fieldConst = _fieldConstant(c, incarnation)
+            if fieldConst is not None and fieldConst[0] in distinct:
+                rows /= max(distinct[fieldConst[0]], 1)
+            else:
+                rest.append(c)
+
+        return rows, rest
+
+    def _tableEstimate(self, table, incarnation, conds):
+        rows = self.stats.getRows(table)
+        if table == 'statements':
+            predRows = self._predicateRows(incarnation, conds)
+            if predRows is not None:
+                rows, conds = predRows
+
+        for cond in conds:
+            condRows = self._condRows(table, incarnation, cond)
+            if condRows is not None:
+                # Assume that conditions are independent.
+                rows *= min(float(condRows) / self.stats.getRows(table), 1)
+
+        return rows
+
+    def estimate(self, rel, conds):
+        if not isinstance(rel, sqlnodes.SqlRelation):
+            # No statistics for other relations, assume they are
+            # large.
+            return self.stats.getRows('statements')
+
+        if rel.sqlCode in ('quads', 'term_quads'):
+            # A quad is a graph_statement row joined with its
+            # statement. Estimate both parts separately.
+            graphConds = []
+            stmtConds = []
+            for cond in conds:
+                if [operand for operand in cond
+                    if isinstance(operand, sqlnodes.SqlFieldRef) and
+                    operand.fieldId == 'graph_id']:
+                    graphConds.append(cond)
+                else:
+                    stmtConds.append(cond)
+
+            stmtRows = self._tableEstimate('statements', rel.incarnation,
+                                           stmtConds)
+            graphRows = self._tableEstimate('graph_statement',
+                                            rel.incarnation, graphConds)
+            return stmtRows * graphRows / self.stats.getRows('statements')
+        elif rel.sqlCode in ('statements', 'graph_statement'):
+            return self._tableEstimate(rel.sqlCode, rel.incarnation, conds)
+        else:
+            return self.stats.getRows('statements')
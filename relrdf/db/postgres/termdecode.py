@@ -0,0 +1,178 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""Conversion of `rdf_term` query results into RelRDF values.
+
+The text form of an `rdf_term` value, as produced by the database, is
+the value enclosed in single quotes followed by ``^^`` and the type
+ID as a hexadecimal number.
+
+Result rows are decoded in batches, one column at a time, and decoded
+values are cached, since most results repeat the same URIs and
+literals many times.
+"""
+
+from relrdf.expression import uri, literal
+
+
+# Suffix of blank nodes that must be replaced by fresh ones in every
+# result row.
+REINST_SUFFIX = '#reinst'
+
+
+class ReinstBlank(unicode):
+    """A blank node that must be reinstantiated in every result row.
+
+    Decoded rows contain these objects only temporarily, until they
+    are replaced by actual blank nodes."""
+
+    __slots__ = ()
+
+
+class TermDecoder(object):
+    """Decode result rows containing `rdf_term` values.
+
+    `lookupType` is a callable returning the ``(type URI, language
+    tag)`` pair for a type ID. It is called at most once per type ID."""
+
+    __slots__ = ('_lookupTypeFunc',
+                 '_types',
+                 '_cache',
+                 '_reinstSeen')
+
+    # Maximum number of decoded values kept in the cache. The cache
+    # is simply emptied when it fills up.
+    CACHE_SIZE = 10000
+
+    def __init__(self, lookupType):
+        self._lookupTypeFunc = lookupType
+        self._types = {}
+        self._cache = {}
+
+        # Set to true as soon as a blank node needing
+        # reinstantiation is decoded.
+        self._reinstSeen = False
+
+    def _lookupType(self, typeId):
+        try:
+            return self._types[typeId]
+        except KeyError:
+            pass
+
+        typeInfo = self._lookupTypeFunc(typeId)
+
+        # Not in database? (Should not happen)
+        assert typeInfo is not None, \
+            "Database result uses unknown type ID %d!" % typeId
+
+        self._types[typeId] = typeInfo
+        return typeInfo
+
+    def decodeTerm(self, pair):
+        """Decode a single value in text form, without using the
+        cache."""
+        if pair is None:
+            return None
+
+        pos = pair.rfind('^^')
+        rawValue = pair[1:pos - 1]
+        typeId = int(pair[pos + 2:], 16)
+
+        if isinstance(rawValue, str):
+            try:
+                rawValue = rawValue.decode('utf8')
+            except UnicodeDecodeError:
+                rawValue = u"<<Character encoding error>>"
+
+        # Resource
+        if typeId == 0:
+            value = uri.Uri(rawValue)
+
+            # Needs reinstantiation?
+            if value.isBlank() and value.endswith(REINST_SUFFIX):
+                self._reinstSeen = True
+                value = ReinstBlank(rawValue)
+
+        # Plain literal
+        elif typeId == 1:
+            value = literal.Literal(rawValue)
+
+        # Literal
+        else:
+            # Get type URI and language tag
+            (typeUri, langTag) = self._lookupType(typeId)
+
+            # Expect everything that's not a resource to be some
+            # sort of literal
+            value = literal.Literal(rawValue, lang=langTag, typeUri=typeUri)
+
+        return value
+
+    def decodeColumn(self, column):
+        """Decode a sequence of values in text form and return a list
+        with the results."""
+        cache = self._cache
+        if len(cache) > self.CACHE_SIZE:
+            cache.clear()
+
+        decoded = []
+        append = decoded.append
+        for pair in column:
+            try:
+                append(cache[pair])
+            except KeyError:
+                value = cache[pair] = self.decodeTerm(pair)
+                append(value)
+
+        return decoded
+
+    def _reinstantiate(self, row):
+        blankMap = {}
+        result = []
+        for value in row:
+            if value.__class__ is ReinstBlank:
+                try:
+                    value = blankMap[value]
+                except KeyError:
+                    blank = uri.newBlank()
+                    blankMap[value] = blank
+                    value = blank
+            result.append(value)
+        return tuple(result)
+
+    def decodeRows(self, rows):
+        """Decode a list of result rows and return a list of tuples.
+
+        Blank nodes needing reinstantiation are replaced by fresh
+        blank nodes, shared by all occurrences inside a single row."""
+        if len(rows) == 0:
+            return []
+
+        columns = [self.decodeColumn(column) for column in zip(*rows)]
+        decoded = zip(*columns)
+
+        if self._reinstSeen:
+            decoded = [self._reinstantiate(row) for row in decoded]
+
+        return decoded
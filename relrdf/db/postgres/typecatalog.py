@@ -0,0 +1,185 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""An in-memory copy of the literal types table."""
+
+from relrdf.util.methodsync import SyncMethodsMixin, synchronized
+from relrdf.mapping.emit import quote
+
+
+# Type IDs below this value are language tags, see the basic schema.
+LANG_TAG_ID_LIMIT = 4096
+
+
+class TypeCatalog(SyncMethodsMixin):
+    """A cache of the ``types`` table of a database, mapping type IDs
+    to ``(type URI, language tag)`` pairs and back.
+
+    Type IDs are never reused, so cached entries never become
+    invalid. New types are created by taking IDs from the
+    ``data_types_id_seq`` and ``language_tags_id_seq`` sequences. The
+    catalog checks the sequences whenever an unknown type is looked
+    up, and only reads the table rows above the last values it
+    saw. Since sequences aren't transactional, a type may be committed
+    after its ID was seen; types missed that way are looked up
+    individually.
+
+    `query` is a callable running an SQL query and returning its rows
+    (see `pool.ConnectionPool`). Since it normally runs in a separate
+    transaction, types created by uncommitted transactions are not
+    visible to the catalog."""
+
+    __slots__ = ('_query',
+
+                 '_types',
+                 '_ids',
+                 '_seqValues')
+
+    def __init__(self, query):
+        super(TypeCatalog, self).__init__()
+
+        self._query = query
+        self.clear()
+
+    @synchronized
+    def clear(self):
+        """Forget all cached types."""
+        self._types = {}
+        self._ids = {}
+
+        # Last values and called flags seen in the data type and
+        # language tag sequences.
+        self._seqValues = (-1, True, -1, True)
+
+    @staticmethod
+    def _decodeType(typeUri, langTag):
+        if typeUri is not None:
+            typeUri = typeUri.decode('utf-8')
+        if langTag is not None:
+            langTag = langTag.decode('utf-8')
+
+        return (typeUri, langTag)
+
+    def _addType(self, typeId, typeUri, langTag):
+        typeInfo = self._decodeType(typeUri, langTag)
+        self._types[typeId] = typeInfo
+        self._ids[typeInfo] = typeId
+
+    def _refresh(self):
+        """Read the types created since the last refresh. Must be
+        called with the lock held."""
+        rows = self._query("""
+            SELECT s1.last_value, s1.is_called, s2.last_value, s2.is_called
+            FROM data_types_id_seq s1, language_tags_id_seq s2""")
+        seqValues = tuple(rows[0])
+        if seqValues == self._seqValues:
+            return
+
+        # The last value of a sequence nextval() was never called on
+        # is its start value, which hasn't been taken yet.
+        dataValue, dataCalled, langValue, langCalled = self._seqValues
+        dataSeen = dataValue
+        if not dataCalled:
+            dataSeen -= 1
+        langSeen = langValue
+        if not langCalled:
+            langSeen -= 1
+
+        for typeId, typeUri, langTag in self._query("""
+                SELECT id, type_uri, lang_tag
+                FROM types
+                WHERE (id > %d AND id < %d) OR id > %d""" %
+                (langSeen, LANG_TAG_ID_LIMIT, dataSeen)):
+            self._addType(typeId, typeUri, langTag)
+
+        self._seqValues = seqValues
+
+    @synchronized
+    def getType(self, typeId, connection=None):
+        """Return the ``(type URI, language tag)`` pair for `typeId`.
+
+        If the type is not in the catalog, even after a refresh, it
+        is looked up using `connection`, if given. This makes types
+        created by the transaction in `connection` available. Such
+        types aren't added to the catalog, since the transaction may
+        still be rolled back, so callers should cache them for as
+        long as the transaction lasts. Return ``None`` if the type
+        cannot be found."""
+        try:
+            return self._types[typeId]
+        except KeyError:
+            pass
+
+        self._refresh()
+        try:
+            return self._types[typeId]
+        except KeyError:
+            pass
+
+        if connection is None:
+            return None
+
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT type_uri, lang_tag
+            FROM types
+            WHERE id = %d""" % typeId)
+        row = cursor.fetchone()
+        cursor.close()
+        if row is None:
+            return None
+
+        return self._decodeType(row[0], row[1])
+
+    @synchronized
+    def lookupTypeId(self, typeUri, langTag):
+        """Return the type ID for the given type URI or language tag,
+        or ``None`` if there is no (committed) type for them."""
+        try:
+            return self._ids[typeUri, langTag]
+        except KeyError:
+            pass
+
+        self._refresh()
+        try:
+            return self._ids[typeUri, langTag]
+        except KeyError:
+            pass
+
+        if typeUri is not None:
+            condition = 'type_uri = %s' % quote(typeUri)
+        elif langTag is not None:
+            condition = 'lang_tag = %s' % quote(langTag)
+        else:
+            return None
+
+        rows = self._query("""
+            SELECT id, type_uri, lang_tag
+            FROM types
+            WHERE %s""" % condition.encode('utf-8'))
+        if len(rows) == 0:
+            return None
+
+        self._addType(*rows[0])
+        return rows[0][0]
@@ -65,6 +65,12 @@ class ModifyError(Error):
     pass
 
 
+class MemoryLimitError(Error):
+    """Exception class for operations exceeding their memory limit.
+    """
+    pass
+
+
 class TemplateError(Error):
     """Exception class for errors related to query templates.
     """
@@ -0,0 +1,137 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2009 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""Interning of the terms produced while importing models.
+
+Importers create a new term object for every occurrence of a URI,
+although predicates, types and datatype URIs repeat for most
+statements, and the same subject is often used by several statements
+in a row. A `TermTable` maps equal URIs to a single `EncodedUri`
+object, which also keeps its UTF-8 encoding, so that modelbases
+don't have to encode it again for every statement (see `encode`).
+URIs known to be unique, such as those of the entities defined by an
+XMI file, should be created as `EncodedUri` objects directly, in order
+not to flood the table.
+"""
+
+from relrdf.expression import uri, literal
+
+
+# Default maximum number of URIs kept by a term table.
+DEFAULT_SIZE = 20000
+
+
+class EncodedUri(uri.Uri):
+    """A URI keeping its own UTF-8 encoding in attribute `utf8`."""
+
+    __slots__ = ('utf8',)
+
+    def __new__(cls, text):
+        term = super(EncodedUri, cls).__new__(cls, text)
+        term.utf8 = term.encode('utf-8')
+        return term
+
+
+def encode(term):
+    """Return the UTF-8 encoding of `term`, reusing the stored one if
+    `term` is an `EncodedUri`."""
+    if term.__class__ is EncodedUri:
+        return term.utf8
+    return term.encode('utf-8')
+
+
+class TermTable(object):
+    """An interning table for URIs holding at most `maxSize` entries.
+
+    The table is meant to live for a single import, and is not thread
+    safe. Entries are evicted in approximate least recently used
+    order: URIs are added to a generation of recent entries, which
+    becomes the old generation once it holds half the maximum size,
+    replacing the previous old generation. URIs found in the old
+    generation are moved back to the recent one. This keeps lookups
+    as cheap as a dictionary access, whereas maintaining the exact
+    order of use (as `relrdf.util.lrucache.LruCache` does) costs more
+    than the allocations it would save.
+
+    The number of URIs created by the table is counted in its
+    `misses` attribute."""
+
+    __slots__ = ('maxSize',
+                 'misses',
+
+                 '_recent',
+                 '_old')
+
+    def __init__(self, maxSize=DEFAULT_SIZE):
+        self.maxSize = maxSize
+        self.misses = 0
+
+        self._recent = {}
+        self._old = {}
+
+    def __len__(self):
+        return len(self._recent) + len(self._old)
+
+    def uri(self, text):
+        """Return the `EncodedUri` for `text`."""
+        term = self._recent.get(text)
+        if term is not None:
+            return term
+
+        term = self._old.get(text)
+        if term is None:
+            if text.__class__ is EncodedUri:
+                term = text
+            else:
+                term = EncodedUri(text)
+            self.misses += 1
+
+        recent = self._recent
+        recent[text] = term
+        if len(recent) >= self.maxSize // 2:
+            self._old = recent
+            self._recent = {}
+
+        return term
+
+    def literal(self, value, lang=None, typeUri=None):
+        """Return a new literal, with an interned type URI."""
+        if typeUri is not None:
+            typeUri = self.uri(typeUri)
+        return literal.Literal(value, lang, typeUri)
+
+    def intern(self, term):
+        """Return `term` with its URIs interned. `term` is either a
+        URI, which is replaced by the interned one, or a literal, whose
+        type URI is replaced in place."""
+        if isinstance(term, uri.Uri):
+            return self.uri(term)
+        elif isinstance(term, literal.Literal) and term.typeUri is not None:
+            term.typeUri = self.uri(term.typeUri)
+        return term
+
+    def clear(self):
+        """Remove all entries. The miss counter is kept."""
+        self._recent = {}
+        self._old = {}
@@ -22,6 +22,7 @@
 # Boston, MA 02111-1307, USA.
 
 
+import os
 import sys
 import copy
 import weakref
@@ -87,8 +88,39 @@ class NodeExtents(object):
                                             self.endColumn))
 
 
+_slotNamesCache = {}
+
+def slotNames(cls):
+    """Return the names of all slots defined by `cls` and its base
+    classes."""
+    try:
+        return _slotNamesCache[cls]
+    except KeyError:
+        pass
+
+    names = []
+    for base in cls.__mro__:
+        slots = base.__dict__.get('__slots__', ())
+        if isinstance(slots, basestring):
+            slots = (slots,)
+        for name in slots:
+            if name in ('__dict__', '__weakref__'):
+                continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_%s%s' % (base.__name__.lstrip('_'), name)
+            names.append(name)
+
+    names = tuple(names)
+    _slotNamesCache[cls] = names
+    return names
+
+
 class BasicExpressionNode(list):
-    """A node in a expression tree."""
+    """A node in a expression tree.
+
+    Basic nodes do no checking at all, and are used for expressions
+    unless the exclusive nodes are selected (see
+    `ExclusiveExpressionNode`)."""
 
     __slots__ = ('extents',
                  'startSubexpr',
@@ -125,6 +157,30 @@ class BasicExpressionNode(list):
         """Return a copy of the complete expression tree."""
         return copy.deepcopy(self)
 
+    def __deepcopy__(self, memoDict):
+        # This is considerably faster than the generic deep copy
+        # operation, which goes through `__reduce_ex__`.
+        cls = self.__class__
+        cp = cls.__new__(cls)
+        memoDict[id(self)] = cp
+
+        deepcopy = copy.deepcopy
+        list.extend(cp, [deepcopy(subexpr, memoDict) for subexpr in self])
+
+        for name in slotNames(cls):
+            try:
+                value = getattr(self, name)
+            except AttributeError:
+                continue
+            if value is not None:
+                value = deepcopy(value, memoDict)
+            setattr(cp, name, value)
+
+        if hasattr(self, '__dict__'):
+            cp.__dict__.update(deepcopy(self.__dict__, memoDict))
+
+        return cp
+
 
     #
     # Structural Checking
@@ -279,7 +335,12 @@ class ExclusiveExpressionNode(BasicExpressionNode):
     the basic list operations in such a way that subexpressions that
     were attached to a tree, get detached before being attached to a
     second tree, and their original location gets marked with a
-    `Pruned` node."""
+    `Pruned` node.
+
+    Since keeping track of parent nodes is expensive, exclusive nodes
+    are only used when the ``RELRDF_EXCLUSIVE_NODES`` environment
+    variable is set to a non-empty value when this module is
+    loaded."""
 
     __slots__ = ('id',
 
@@ -429,8 +490,12 @@ class ExclusiveExpressionNode(BasicExpressionNode):
         return super(ExclusiveExpressionNode, self).remove(x)
 
 
-#class ExpressionNode(BasicExpressionNode):
-class ExpressionNode(ExclusiveExpressionNode):
+if os.environ.get('RELRDF_EXCLUSIVE_NODES'):
+    _NodeBase = ExclusiveExpressionNode
+else:
+    _NodeBase = BasicExpressionNode
+
+class ExpressionNode(_NodeBase):
     __slots__ = ()
 
 
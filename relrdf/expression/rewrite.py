@@ -22,6 +22,8 @@
 # Boston, MA 02111-1307, USA.
 
 
+import types
+
 import nodes
 
 def curry(function, arg1):
@@ -69,17 +71,82 @@ def exprMatchApply(expr, nodeType, preOp=None, postOp=None):
     return exprApply(expr, preOp=preOpWrapper, postOp=postOpWrapper)
 
 
+def _classHandler(cls, name):
+    """Return the method `name` of class `cls` as a function taking
+    the processor object as first parameter, or ``None`` if `cls` has
+    no such method."""
+    attr = getattr(cls, name, None)
+    if attr is None:
+        return None
+    elif isinstance(attr, types.MethodType) and attr.im_self is None:
+        return attr.im_func
+    else:
+        # Static or class method.
+        return lambda processor, *args: attr(*args)
+
+
+class _DispatchTable(dict):
+    """A dictionary mapping expression node classes to the
+    ``(preorder function, postorder function)`` pairs used by a
+    processor class to process them. The preorder function may be
+    ``None``. Entries are calculated the first time a node class is
+    looked up."""
+
+    __slots__ = ('procCls',
+                 'prePrefix',
+                 'postPrefix')
+
+    def __init__(self, procCls, prePrefix, postPrefix):
+        super(_DispatchTable, self).__init__()
+
+        self.procCls = procCls
+        self.prePrefix = prePrefix
+        self.postPrefix = postPrefix
+
+    def __missing__(self, nodeCls):
+        name = nodeCls.__name__
+
+        if self.prePrefix is not None:
+            pre = _classHandler(self.procCls, self.prePrefix + name)
+            if pre is None:
+                pre = _classHandler(self.procCls, self.prePrefix + "Default")
+        else:
+            pre = None
+
+        post = _classHandler(self.procCls, self.postPrefix + name)
+        if post is None:
+            post = _classHandler(self.procCls, self.postPrefix + "Default")
+
+        entry = self[nodeCls] = (pre, post)
+        return entry
+
+
+_dispatchTables = {}
+
+def _getDispatchTable(procCls, prePrefix, postPrefix):
+    key = (procCls, prePrefix, postPrefix)
+    try:
+        return _dispatchTables[key]
+    except KeyError:
+        return _dispatchTables.setdefault(key, _DispatchTable(*key))
+
+
 class ExpressionProcessor(object):
     """A generic processor for expression trees. See the `process`
     method for more details."""
 
     __slots__ = ('prePrefix',
-                 'postPrefix')
+                 'postPrefix',
+
+                 '_dispatch')
 
     def __init__(self, prePrefix=None, postPrefix=""):
         self.prePrefix = prePrefix
         self.postPrefix = postPrefix
 
+        self._dispatch = _getDispatchTable(self.__class__, prePrefix,
+                                           postPrefix)
+
     def process(self, expr):
         """Calculate (build) a value from an expression tree `expr` using
         this object's methods.
@@ -109,34 +176,25 @@ class ExpressionProcessor(object):
         expected to return an iterable object, containing the values
         calculated for the subexpressions of `expr`. The method
         implementation is free to use any algorithm (including calling
-        this method recursively) to produce these values."""
+        this method recursively) to produce these values.
+
+        Methods are looked up in the class of `self` only once per
+        node class, and must not be changed afterwards."""
 
         assert isinstance(expr, nodes.ExpressionNode)
 
-        # Calculate the values for the subexpressions.
-        if self.prePrefix is not None and \
-            (hasattr(self, self.prePrefix + expr.__class__.__name__) or
-             hasattr(self, self.prePrefix + "Default")):
+        pre, post = self._dispatch[expr.__class__]
 
+        # Calculate the values for the subexpressions.
+        if pre is not None:
             # Invoke the preorder method.
-            if hasattr(self, self.prePrefix + expr.__class__.__name__):
-                method = getattr(self, self.prePrefix + expr.__class__.__name__)
-            else:
-                method = getattr(self, self.prePrefix + "Default")
-            procSubexprs = method(expr)
-
+            procSubexprs = pre(self, expr)
         else:
-
             # Use the default behavior
             procSubexprs = self._recurse(expr)
 
-        if hasattr(self, self.postPrefix + expr.__class__.__name__):
-            method = getattr(self, self.postPrefix + expr.__class__.__name__)
-        else:
-            method = getattr(self, self.postPrefix + "Default")
-
         # Invoke the postorder method.
-        return method(expr, *procSubexprs)
+        return post(self, expr, *procSubexprs)
 
     def _recurse(self, expr):
 
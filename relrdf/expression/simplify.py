@@ -37,17 +37,27 @@ def reduceUnary(expr, default=None):
     else:
         return expr, False
 
+def _flattenInto(nodeType, expr, flat):
+    for subexpr in expr:
+        if isinstance(subexpr, nodeType):
+            _flattenInto(nodeType, subexpr, flat)
+        else:
+            flat.append(subexpr)
+
 def flattenAssoc(nodeType, expr):
-    modif = False
-    i = 0
-    while i < len(expr):
-        subexpr = expr[i]
+    for subexpr in expr:
         if isinstance(subexpr, nodeType):
-            expr[i:i+1] = subexpr
-            modif = True
-        i += 1
+            break
+    else:
+        return expr, False
+
+    # Build the new subexpression list in one go. Replacing the
+    # nested nodes one by one makes this quadratic.
+    flat = []
+    _flattenInto(nodeType, expr, flat)
+    expr[:] = flat
 
-    return expr, modif
+    return expr, True
 
 def promoteSelect(expr):
     modif = False
@@ -123,51 +133,98 @@ def promoteMapValue(expr, id):
     return (expr, False)
 
 
-def simplifyNode(expr, subexprsModif):
-    modif = True
-    while modif:
-        modif = False
-
-        if isinstance(expr, nodes.Product):
-            expr, m = flattenAssoc(nodes.Product, expr)
-            modif = modif or m
-            expr, m = promoteSelect(expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.Or):
-            expr, m = flattenAssoc(nodes.Or, expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.And):
-            expr, m = flattenAssoc(nodes.And, expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.Union):
-            expr, m = flattenAssoc(nodes.Union, expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.Intersection):
-            expr, m = flattenAssoc(nodes.Intersection, expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.Select):
-            expr, m = flattenSelect(expr)
-            modif = modif or m
-
-#        for i, subexpr in enumerate(expr):
-#            if isinstance(subexpr, nodes.MapValue):
-#                expr, m = promoteMapValue(expr, i)
-#                if m:
-#                    modif = True;
-#                    break
-
-        subexprsModif = subexprsModif or modif
-
-    return expr, subexprsModif
+class Simplifier(object):
+    """A rule based expression simplifier.
+
+    Rules are functions taking an expression node and returning a
+    ``(expr, modif)`` tuple, where `expr` is the simplified
+    expression (possibly the original node, modified in place) and
+    `modif` tells whether any changes were made. Rules are registered
+    for node classes with `addRules`. The rules applied to a node are
+    those registered for the first registered class the node is an
+    instance of.
+
+    Expressions are simplified bottom up. Rules are applied to a node
+    after all its subexpressions have been simplified, until none of
+    them produces any changes. If a rule replaces the node, only the
+    parts of the new expression that weren't already simplified are
+    visited again."""
+
+    __slots__ = ('_nodeTypes',
+                 '_rules',
+                 '_rulesByClass')
+
+    def __init__(self):
+        self._nodeTypes = []
+        self._rules = {}
+        self._rulesByClass = {}
+
+    def addRules(self, nodeType, *rules):
+        """Register `rules` for the nodes of type `nodeType`."""
+        if nodeType not in self._rules:
+            self._nodeTypes.append(nodeType)
+            self._rules[nodeType] = []
+        self._rules[nodeType].extend(rules)
+        self._rulesByClass.clear()
+
+    def _getRules(self, nodeCls):
+        try:
+            return self._rulesByClass[nodeCls]
+        except KeyError:
+            pass
+
+        rules = ()
+        for nodeType in self._nodeTypes:
+            if issubclass(nodeCls, nodeType):
+                rules = tuple(self._rules[nodeType])
+                break
+
+        self._rulesByClass[nodeCls] = rules
+        return rules
+
+    def simplify(self, expr):
+        """Simplify `expr` and return the result."""
+        # Nodes already simplified, indexed by id. Nodes are kept here
+        # to guarantee that their ids aren't reused.
+        return self._simplify(expr, {})
+
+    def _simplify(self, expr, done):
+        if id(expr) in done:
+            return expr
+
+        for i, subexpr in enumerate(expr):
+            if id(subexpr) not in done:
+                newSubexpr = self._simplify(subexpr, done)
+                if newSubexpr is not subexpr:
+                    expr[i] = newSubexpr
+
+        rules = self._getRules(expr.__class__)
+        modif = True
+        while modif:
+            modif = False
+            for rule in rules:
+                newExpr, m = rule(expr)
+                if newExpr is not expr:
+                    if not isinstance(newExpr, nodes.ExpressionNode):
+                        return newExpr
+                    return self._simplify(newExpr, done)
+                modif = modif or m
+
+        done[id(expr)] = expr
+        return expr
+
+
+_simplifier = Simplifier()
+_simplifier.addRules(nodes.Product,
+                     rewrite.curry(flattenAssoc, nodes.Product),
+                     promoteSelect)
+_simplifier.addRules(nodes.Or, rewrite.curry(flattenAssoc, nodes.Or))
+_simplifier.addRules(nodes.And, rewrite.curry(flattenAssoc, nodes.And))
+_simplifier.addRules(nodes.Union, rewrite.curry(flattenAssoc, nodes.Union))
+_simplifier.addRules(nodes.Intersection,
+                     rewrite.curry(flattenAssoc, nodes.Intersection))
+_simplifier.addRules(nodes.Select, flattenSelect)
 
 def simplify(expr):
     """Simplify a expression."""
-
-    modif = True
-    while modif:
-        modif = False
-        expr, m = rewrite.exprApply(expr, postOp=simplifyNode)
-        modif = modif or m
-
-    return expr
-
+    return _simplifier.simplify(expr)
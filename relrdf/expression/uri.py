@@ -46,8 +46,8 @@ def isBlank(obj):
 def newBlank():
     return Uri(BLANK_NODE_NS + unicode(uuid4()))
 
-def newBlankFromName(name):
-    uuid = uuid3(BLANK_NODE_NS_UUID, name)
+def newBlankFromName(name, namespace=BLANK_NODE_NS_UUID):
+    uuid = uuid3(namespace, name)
     return Uri(BLANK_NODE_NS + unicode(uuid))
 
 class Namespace(Uri):
@@ -70,18 +70,30 @@ class SqlEmitter(rewrite.ExpressionProcessor):
     structure of the resulting SQL, and can be used for pretty
     printing."""
 
-    __slots__ = ('distinct',
+    __slots__ = ('typeCatalog',
+
+                 'distinct',
                  'sort',
                  'offsetLimit',)
 
-    def __init__(self):
+    def __init__(self, typeCatalog=None):
         super(SqlEmitter, self).__init__(prePrefix='pre')
 
+        # Literal types known to the catalog are emitted as integer
+        # constants.
+        self.typeCatalog = typeCatalog
+
         self.distinct = None
         self.sort = None
         self.offsetLimit = None
 
     def _lookupTypeId(self, uri, tag):
+        if (uri is not None or tag is not None) and \
+                self.typeCatalog is not None:
+            typeId = self.typeCatalog.lookupTypeId(uri, tag)
+            if typeId is not None:
+                return str(typeId)
+
         if uri is not None:
             return ('(', 'SELECT ', 'id', ' FROM ', 'types', ' WHERE ',
                     'type_uri', '=', quote(uri), ')')
@@ -463,8 +475,8 @@ def prettyPrint(seqOrStr, indent=0, width=78, breakMin=20):
     stream.close()
     return result
 
-def emit(expr):
-    emitter = SqlEmitter()
+def emit(expr, typeCatalog=None):
+    emitter = SqlEmitter(typeCatalog)
     #return prettyPrint(emitter.process(expr))
     return emittedText(emitter.process(expr))
 
@@ -0,0 +1,193 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""Cost based join ordering.
+
+A basic graph pattern is mapped to a `Select` over a `Product` of
+relations, with a single condition for the whole product. When
+emitted as is, all relations are joined in source order, and the
+database planner must figure out a good join order by itself, which
+it stops trying to do above a certain number of relations.
+
+The `JoinOrderer` in this module reorders such products greedily,
+starting with the relation producing the fewest rows and always
+continuing with the cheapest relation connected by a join condition
+to the ones already joined. Every conjunct in the condition is
+attached to the first join where all relations it refers to are
+available, producing a left-deep tree of `Select(Product(left,
+right), cond)` nodes, which is emitted as a chain of inner joins.
+
+Row counts are obtained from an estimator object, which must
+provide an ``estimate(rel, conds)`` method returning the estimated
+number of rows produced by relation expression `rel` when
+restricted by the list of conditions `conds`, all of which refer
+only to `rel`.
+"""
+
+from relrdf.expression import nodes, rewrite
+
+import sqlnodes
+
+
+# Minimum number of relations in a product for it to be reordered.
+MIN_RELATIONS = 3
+
+
+def providedIncarnations(expr, incarnations=None):
+    """Return the set of incarnations made available by relation
+    expression `expr` to its enclosing expression."""
+    if incarnations is None:
+        incarnations = set()
+
+    if isinstance(expr, (sqlnodes.SqlRelation, sqlnodes.SqlAs)):
+        incarnations.add(expr.incarnation)
+    elif isinstance(expr, (nodes.MapValue, nodes.ValueNode)):
+        # Subqueries and values don't make incarnations visible.
+        pass
+    else:
+        for subexpr in expr:
+            providedIncarnations(subexpr, incarnations)
+
+    return incarnations
+
+def referencedIncarnations(expr, incarnations=None):
+    """Return the set of incarnations referenced by field references
+    anywhere in `expr`."""
+    if incarnations is None:
+        incarnations = set()
+
+    if isinstance(expr, sqlnodes.SqlFieldRef):
+        incarnations.add(expr.incarnation)
+    for subexpr in expr:
+        referencedIncarnations(subexpr, incarnations)
+
+    return incarnations
+
+def conjuncts(cond, result=None):
+    """Return the list of conjuncts in condition `cond`."""
+    if result is None:
+        result = []
+
+    if isinstance(cond, sqlnodes.SqlAnd):
+        for subexpr in cond:
+            conjuncts(subexpr, result)
+    else:
+        result.append(cond)
+
+    return result
+
+
+class JoinOrderer(rewrite.ExpressionTransformer):
+    """Reorder the relations in products restricted by a condition,
+    based on the row counts returned by `estimator`."""
+
+    __slots__ = ('estimator',)
+
+    def __init__(self, estimator):
+        super(JoinOrderer, self).__init__()
+
+        self.estimator = estimator
+
+    def Select(self, expr, rel, cond):
+        expr[:] = (rel, cond)
+
+        if not isinstance(rel, nodes.Product) or len(rel) < MIN_RELATIONS:
+            return expr
+
+        return self.orderJoins(list(rel), conjuncts(cond))
+
+    def orderJoins(self, rels, conds):
+        """Return a join expression equivalent to the product of
+        `rels` restricted by the conjunction of `conds`."""
+        # Find the relations each condition depends on.
+        relByIncarnation = {}
+        for i, rel in enumerate(rels):
+            for incarnation in providedIncarnations(rel):
+                relByIncarnation[incarnation] = i
+
+        condDeps = []
+        for cond in conds:
+            deps = frozenset([relByIncarnation[incarnation]
+                              for incarnation in referencedIncarnations(cond)
+                              if incarnation in relByIncarnation])
+            condDeps.append((cond, deps))
+
+        # Estimate the size of each relation, restricted by the
+        # conditions referring only to it.
+        sizes = []
+        for i, rel in enumerate(rels):
+            localConds = [cond for cond, deps in condDeps
+                          if deps == frozenset((i,))]
+            sizes.append(self.estimator.estimate(rel, localConds))
+
+        # Choose the join order greedily.
+        order = []
+        joined = set()
+        remaining = set(xrange(len(rels)))
+        while remaining:
+            connected = set()
+            if joined:
+                for cond, deps in condDeps:
+                    if deps & joined:
+                        connected.update(deps & remaining)
+            if not connected:
+                connected = remaining
+
+            # Ties are broken by source order.
+            nextRel = min(connected, key=lambda i: (sizes[i], i))
+            order.append(nextRel)
+            joined.add(nextRel)
+            remaining.remove(nextRel)
+
+        # Build a left-deep join tree, attaching every condition to
+        # the first join where it can be evaluated.
+        available = set((order[0],))
+        result = rels[order[0]]
+        for i in order[1:]:
+            available.add(i)
+
+            ready = []
+            pending = []
+            for cond, deps in condDeps:
+                if deps <= available:
+                    ready.append(cond)
+                else:
+                    pending.append((cond, deps))
+            condDeps = pending
+
+            result = nodes.Product(result, rels[i])
+            if len(ready) == 1:
+                result = nodes.Select(result, ready[0])
+            elif len(ready) > 1:
+                result = nodes.Select(result, sqlnodes.SqlAnd(*ready))
+
+        assert condDeps == []
+
+        return result
+
+
+def orderJoins(expr, estimator):
+    """Reorder the joins in `expr` using `estimator` (see
+    `JoinOrderer`)."""
+    return JoinOrderer(estimator).process(expr)
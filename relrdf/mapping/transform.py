@@ -23,6 +23,7 @@
 
 
 import re
+import copy
 
 from relrdf.commonns import xsd, rdf, rdfs, relrdf
 from relrdf.expression import nodes
@@ -182,6 +183,98 @@ class Incarnator(object):
         return ret
 
 
+# Attribute kinds in incarnation templates.
+_SHARED = 0
+_COPIED = 1
+_INCARNATION = 2
+
+_immutableTypes = (type(None), bool, int, long, float, str, unicode,
+                   uri.Uri, literal.Literal)
+
+class IncarnationTemplate(object):
+    """A precompiled expression that can be instantiated repeatedly,
+    producing an independent copy with fresh incarnations every time.
+    Instantiating a template has the same result as calling
+    `Incarnator.reincarnate` on the original expression, but avoids
+    the generic deep copy and the separate pass over the expression.
+
+    The original expression must not be modified after creating the
+    template. With exclusive expression nodes (see
+    `relrdf.expression.nodes`), templates simply fall back to
+    `Incarnator.reincarnate`."""
+
+    __slots__ = ('_expr',
+                 '_root',
+                 '_incarnationCount')
+
+    def __init__(self, expr):
+        if issubclass(nodes.ExpressionNode, nodes.ExclusiveExpressionNode):
+            self._expr = expr
+            self._root = None
+            return
+
+        self._expr = None
+
+        # Original incarnations, mapped to their position in the list
+        # of fresh incarnations.
+        incarnations = {}
+        self._root = self._compile(expr, incarnations)
+        self._incarnationCount = len(incarnations)
+
+    def _compile(self, expr, incarnations):
+        cls = expr.__class__
+
+        attrs = []
+        names = list(nodes.slotNames(cls))
+        if hasattr(expr, '__dict__'):
+            names.extend(expr.__dict__.keys())
+        for name in names:
+            try:
+                value = getattr(expr, name)
+            except AttributeError:
+                continue
+
+            if name == 'incarnation':
+                value = incarnations.setdefault(value, len(incarnations))
+                attrs.append((name, _INCARNATION, value))
+            elif isinstance(value, _immutableTypes):
+                attrs.append((name, _SHARED, value))
+            else:
+                attrs.append((name, _COPIED, value))
+
+        subexprs = tuple([self._compile(subexpr, incarnations)
+                          for subexpr in expr])
+
+        return (cls, tuple(attrs), subexprs)
+
+    def _build(self, node, incarnations):
+        cls, attrs, subexprs = node
+
+        expr = cls.__new__(cls)
+        list.extend(expr, [self._build(subexpr, incarnations)
+                           for subexpr in subexprs])
+
+        for name, kind, value in attrs:
+            if kind == _INCARNATION:
+                value = incarnations[value]
+            elif kind == _COPIED:
+                value = copy.deepcopy(value)
+            setattr(expr, name, value)
+
+        return expr
+
+    def instantiate(self):
+        """Return a new copy of the template expression, with fresh
+        incarnations."""
+        if self._root is None:
+            (expr,) = Incarnator.reincarnate(self._expr)
+            return expr
+
+        incarnations = [Incarnator.makeIncarnation()
+                        for i in xrange(self._incarnationCount)]
+        return self._build(self._root, incarnations)
+
+
 class PureRelationalTransformer(rewrite.ExpressionTransformer):
     """An abstract expression transformer that transforms a decoupled
     expression containing patterns into a pure relational expression.
@@ -210,17 +303,21 @@ class PureRelationalTransformer(rewrite.ExpressionTransformer):
         all possible values the pattern could produce, i.e., if the
         pattern would be used with different variables as
         subexpressions, it would produce exactly the value produced by
-        replacementExpr.
+        replacementExpr. It can also be an `IncarnationTemplate`
+        producing such an expression.
 
         `columnNames`: An iterable containing the column names to be
         matched with the pattern's subexpressions."""
 
+        # Reincarnate the replacement expression.
+        if isinstance(replacementExpr, IncarnationTemplate):
+            replacementExpr = replacementExpr.instantiate()
+        else:
+            (replacementExpr,) = Incarnator.reincarnate(replacementExpr)
+
         # FIXME: Lift this restriction.
         assert isinstance(replacementExpr, nodes.MapResult)
 
-        # Reincarnate the replacement expression.
-        (replacementExpr,) = Incarnator.reincarnate(replacementExpr)
-
         coreExpr = replacementExpr[0]
 
         # Bind the variables and/or create the matching conditions.
@@ -279,10 +376,8 @@ class PureRelationalTransformer(rewrite.ExpressionTransformer):
         if repl is not None:
             return repl
         else:
-            if hasattr(expr, 'id'):
-                assert False, "Cannot determine type from [[%s]]" % expr.id
-            else:
-                assert False, "Cannot determine type"
+            assert False, "Cannot determine type from [[%s]]" % \
+                expr.getId()
 
 
 class MatchReifTransformer(PureRelationalTransformer):
@@ -24,6 +24,7 @@
 """Base classes for RelRDF's modelbase and model objects"""
 
 from relrdf import centralfactory
+from relrdf.expression import uri, literal
 
 
 class Modelbase(object):
@@ -62,6 +63,63 @@ class Modelbase(object):
         sinkConf = sinkConfCls.fromUnchecked(**sinkParams)
         return self.getSink(sinkConf)
 
+    def setBulkLoad(self, bulkLoad):
+        """Enable or disable bulk loading.
+
+        In bulk load mode, a modelbase may use faster, database
+        specific mechanisms to store the statements sent to its
+        sinks. Modelbases not supporting bulk loading ignore this
+        setting."""
+        pass
+
+    def setPipelined(self, pipelined):
+        """Enable or disable pipelined mode.
+
+        In pipelined mode, a modelbase may write the statements sent
+        to its sinks in the background, while the caller goes on
+        sending statements. Errors are reported by a later call,
+        at the latest by `commit`. Modelbases not supporting
+        pipelining ignore this setting."""
+        pass
+
+    def analyze(self):
+        """Compute the statistics kept by the modelbase (see
+        :meth:`getStatistics`) from scratch. Modelbases not keeping
+        statistics ignore this call."""
+        pass
+
+    def getStatistics(self):
+        """Return an object providing statement counts for the
+        modelbase (per predicate, per graph, etc.), or ``None`` if the
+        modelbase doesn't keep any statistics."""
+        return None
+
+    def getStagingSink(self, name):
+        """Return a sink storing statements in a new staging area
+        called `name` instead of in a model.
+
+        Staging areas allow for loading statements in parallel, from
+        several processes, each with its own modelbase object. Their
+        contents become visible to other modelbase objects when
+        committed, and are moved into a model by `mergeStaging`. Sinks
+        for staging areas accept encoded statements (see
+        `Sink.encodedTriple`) with graph URIs. Modelbases not
+        supporting staging raise `NotImplementedError`."""
+        raise NotImplementedError
+
+    def mergeStaging(self, names, sink):
+        """Move the statements in the staging areas called `names` to
+        the model `sink` sends statements to, and remove the staging
+        areas. Statements without a graph URI go to the sink's
+        graph."""
+        raise NotImplementedError
+
+    def dropStaging(self, names):
+        """Roll back any pending changes, remove the staging areas
+        called `names`, ignoring those that don't exist, and
+        commit. Used to clean up after a failed parallel load."""
+        pass
+
     def commit(self):
         pass
 
@@ -74,6 +132,21 @@ class Model(object):
 
     __slots__ = ()
 
+    def setStreaming(self, streaming, batchSize=None):
+        """Enable or disable streaming of query results.
+
+        When streaming, the results of subsequent queries are fetched
+        from the database in batches of `batchSize` rows while being
+        iterated, instead of being loaded into memory at once. The
+        length of streamed results may be expensive to compute. Models
+        not supporting streaming ignore this setting."""
+        pass
+
+    def getStreaming(self):
+        """Return the batch size used to stream query results, or
+        ``None`` if results are not streamed."""
+        return None
+
 
 class Sink(object):
     """Base class for the RelRDF statement sinks."""
@@ -83,5 +156,32 @@ class Sink(object):
     def triple(self, subject, pred, object):
         raise NotImplementedError
 
+    def encodedTriple(self, subject, pred, object, isResource,
+                      typeUri=None, lang=None, graphUri=None):
+        """Send a statement whose components are UTF-8 encoded
+        strings. `isResource` tells whether the object is a URI or a
+        literal, in which case it may have a type URI or language
+        tag. Parsers producing encoded text use this method to spare
+        sinks storing statements the conversion to and from
+        `relrdf.expression.uri.Uri` and
+        `relrdf.expression.literal.Literal` objects.
+
+        `graphUri`, if not ``None``, is the URI of the graph the
+        statement belongs to. Sinks that can't route statements to
+        graphs ignore it. The default implementation converts the
+        components and calls `triple`."""
+        if isResource:
+            object = uri.Uri(object.decode('utf-8'))
+        else:
+            if typeUri is not None:
+                typeUri = uri.Uri(typeUri.decode('utf-8'))
+            if lang is not None:
+                lang = lang.decode('utf-8')
+            object = literal.Literal(object.decode('utf-8'), lang, typeUri)
+
+        self.triple(uri.Uri(subject.decode('utf-8')),
+                    uri.Uri(pred.decode('utf-8')),
+                    object)
+
     def close(self):
         pass
@@ -0,0 +1,213 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2009 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""A line oriented parser for the N-Triples and N-Quads formats.
+
+Statements are sent to sinks through their ``encodedTriple`` method
+(see `relrdf.modelbase.Sink`), with all components as UTF-8 encoded
+strings taken directly from the input, so that sinks storing
+statements in a database don't have to convert them again. Escape
+sequences are only decoded where present.
+"""
+
+import re
+
+from relrdf.localization import _
+from relrdf.error import SyntaxError
+from relrdf.expression import uri, nodes
+
+
+# Size of the read buffer for input files.
+BUFFER_SIZE = 1 << 20
+
+_iriRe = r'<([^>]*)>'
+_blankRe = r'_:(\S+?)'
+_literalRe = r'"((?:[^"\\]|\\.)*)"' \
+    r'(?:@([a-zA-Z]+(?:-[a-zA-Z0-9]+)*)|\^\^<([^>]*)>)?'
+
+# A complete statement, with an optional graph label. Groups:
+# subject (IRI, blank node), predicate, object (IRI, blank node,
+# literal value, language tag, type IRI), graph (IRI, blank node).
+_statementRe = re.compile(
+    r'[ \t]*(?:%(iri)s|%(blank)s)'
+    r'[ \t]*%(iri)s'
+    r'[ \t]*(?:%(iri)s|%(blank)s|%(literal)s)'
+    r'(?:[ \t]*(?:%(iri)s|%(blank)s))?'
+    r'[ \t]*\.[ \t\r]*(?:#.*)?$' %
+    {'iri': _iriRe, 'blank': _blankRe, 'literal': _literalRe})
+
+# Empty and comment lines.
+_emptyRe = re.compile(r'[ \t\r]*(?:#.*)?$')
+
+_escapeRe = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))')
+
+_escapes = {
+    't': '\t',
+    'b': '\b',
+    'n': '\n',
+    'r': '\r',
+    'f': '\f',
+    '"': '"',
+    "'": "'",
+    '\\': '\\',
+    }
+
+
+def _unescapeChar(match):
+    short, long, char = match.groups()
+    if char is not None:
+        try:
+            return _escapes[char]
+        except KeyError:
+            raise ValueError(_("invalid escape sequence '\\%s'") % char)
+
+    # Going through the unicode_escape codec works for characters
+    # outside the BMP on narrow Python builds, too.
+    if short is not None:
+        escaped = '\\u' + short
+    else:
+        escaped = '\\U' + long
+    return escaped.decode('unicode_escape').encode('utf-8')
+
+def unescape(text):
+    """Decode the escape sequences in UTF-8 encoded string `text`."""
+    if '\\' not in text:
+        return text
+    return _escapeRe.sub(_unescapeChar, text)
+
+
+class NTriplesParser(object):
+    """Parser for N-Triples files or, if `quads` is true, N-Quads
+    files. Statements without a graph label are sent to the sink's
+    default graph.
+
+    Blank node labels are scoped to a single call to `parse`."""
+
+    __slots__ = ('quads',
+                 'bufferSize')
+
+    def __init__(self, quads=False, bufferSize=BUFFER_SIZE):
+        self.quads = quads
+        self.bufferSize = bufferSize
+
+    def parse(self, source, sink):
+        """Parse the file named `source` (or the file object
+        `source`) and send the statements to `sink`."""
+        if isinstance(source, basestring):
+            fileName = source
+            stream = open(source, 'rb', self.bufferSize)
+        else:
+            fileName = getattr(source, 'name', None)
+            stream = source
+
+        try:
+            self.parseLines(stream, sink, fileName)
+        finally:
+            if stream is not source:
+                stream.close()
+
+    def parseLines(self, lines, sink, fileName=None, firstLine=1,
+                   blankScope=None):
+        """Parse the UTF-8 encoded lines in iterable `lines` and send
+        the statements to `sink`. `fileName` and `firstLine` are used
+        to report errors.
+
+        If `blankScope` is not ``None``, it must be a UUID, from which
+        blank node URIs are derived together with their labels (see
+        `uri.newBlankFromName`). Parts of a file parsed separately
+        with the same scope share their blank nodes. Otherwise, blank
+        nodes are only shared within `lines`."""
+        blanks = {}
+
+        match = _statementRe.match
+        encodedTriple = sink.encodedTriple
+        quads = self.quads
+
+        def blank(label):
+            try:
+                return blanks[label]
+            except KeyError:
+                if blankScope is None:
+                    blankUri = uri.newBlank()
+                else:
+                    blankUri = uri.newBlankFromName(label, blankScope)
+                blankUri = blanks[label] = blankUri.encode('utf-8')
+                return blankUri
+
+        lineNum = firstLine - 1
+        for line in lines:
+            lineNum += 1
+
+            m = match(line)
+            if m is None:
+                if _emptyRe.match(line):
+                    continue
+                self._error(_("invalid statement"), fileName, lineNum)
+
+            (subjIri, subjBlank, pred, objIri, objBlank, objValue, lang,
+             typeUri, graphIri, graphBlank) = m.groups()
+
+            if graphIri is not None or graphBlank is not None:
+                if not quads:
+                    self._error(_("graph labels are not allowed in "
+                                  "N-Triples"), fileName, lineNum)
+
+            try:
+                if subjIri is not None:
+                    subject = unescape(subjIri)
+                else:
+                    subject = blank(subjBlank)
+                pred = unescape(pred)
+
+                if objIri is not None:
+                    isResource = True
+                    object = unescape(objIri)
+                elif objBlank is not None:
+                    isResource = True
+                    object = blank(objBlank)
+                else:
+                    isResource = False
+                    object = unescape(objValue)
+                    if typeUri is not None:
+                        typeUri = unescape(typeUri)
+                    elif lang is not None:
+                        lang = lang.lower()
+
+                if graphIri is not None:
+                    graph = unescape(graphIri)
+                elif graphBlank is not None:
+                    graph = blank(graphBlank)
+                else:
+                    graph = None
+            except ValueError, e:
+                self._error(str(e), fileName, lineNum)
+
+            encodedTriple(subject, pred, object, isResource, typeUri, lang,
+                          graph)
+
+    def _error(self, msg, fileName, lineNum):
+        extents = nodes.NodeExtents()
+        extents.fileName = fileName
+        extents.startLine = lineNum
+        raise SyntaxError(msg=msg, extents=extents)
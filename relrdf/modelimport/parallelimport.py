@@ -0,0 +1,205 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2009 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""Parallel import of N-Triples and N-Quads files.
+
+The input file is split at line boundaries into chunks, which are
+parsed by a pool of worker processes. Every worker loads its chunks
+into staging areas of its own, using its own modelbase object (and
+thus, its own database connection), see
+`relrdf.modelbase.Modelbase.getStagingSink`. Once all chunks are
+loaded, the staging areas are merged into the target model by the
+main process.
+
+Blank node labels are scoped to the whole file, so that a label
+appearing in several chunks denotes the same blank node.
+"""
+
+import os
+import sys
+import time
+import uuid
+import multiprocessing
+
+from relrdf.localization import _
+from relrdf import centralfactory
+
+import ntriplesparse
+
+
+# Number of chunks per worker process. Using several chunks per
+# worker balances the load when chunks take different times to load.
+CHUNKS_PER_JOB = 4
+
+
+def splitFile(fileName, count):
+    """Split file `fileName` into up to `count` chunks of similar size
+    at line boundaries, and return them as a list of ``(start,
+    end)`` byte offset pairs."""
+    size = os.path.getsize(fileName)
+
+    offsets = [0]
+    stream = open(fileName, 'rb')
+    try:
+        for i in xrange(1, count):
+            # Move to the start of the line following the one
+            # containing the tentative offset.
+            stream.seek(max(size * i / count - 1, offsets[-1]))
+            stream.readline()
+            offset = stream.tell()
+            if offsets[-1] < offset < size:
+                offsets.append(offset)
+    finally:
+        stream.close()
+    offsets.append(size)
+
+    return [(start, end) for start, end in zip(offsets[:-1], offsets[1:])
+            if start < end]
+
+def readLines(stream, start, end):
+    """Iterate over the lines of `stream` starting at byte offset
+    `start` and ending before byte offset `end`."""
+    stream.seek(start)
+    readline = stream.readline
+
+    pos = start
+    while pos < end:
+        line = readline()
+        if line == '':
+            break
+        pos += len(line)
+        yield line
+
+
+# Configuration of worker processes, set by _initWorker.
+_workerConf = None
+
+def _initWorker(mbConf, quads):
+    global _workerConf
+    _workerConf = (mbConf, quads)
+
+def _loadChunk((fileName, start, end, name, blankScope)):
+    """Load a chunk into staging area `name`. Runs in a worker
+    process, and returns the process ID, the number of statements
+    loaded and the time taken."""
+    mbConf, quads = _workerConf
+    begin = time.time()
+
+    # Errors are passed on as plain messages, since exceptions don't
+    # always survive being sent back to the main process.
+    try:
+        modelBase = centralfactory.getModelbase(mbConf)
+        try:
+            sink = modelBase.getStagingSink(name)
+
+            stream = open(fileName, 'rb', ntriplesparse.BUFFER_SIZE)
+            try:
+                parser = ntriplesparse.NTriplesParser(quads=quads)
+                parser.parseLines(readLines(stream, start, end), sink,
+                                  fileName="%s (offset %d)" %
+                                  (fileName, start),
+                                  blankScope=blankScope)
+            finally:
+                stream.close()
+
+            count = sink.count
+            sink.close()
+            modelBase.commit()
+        finally:
+            modelBase.close()
+    except NotImplementedError:
+        raise RuntimeError(_("The modelbase doesn't support parallel "
+                             "loading"))
+    except Exception, e:
+        raise RuntimeError(str(e))
+
+    return os.getpid(), count, time.time() - begin
+
+
+def importFile(fileName, mbConf, modelConf, jobs, quads=False,
+               out=sys.stdout):
+    """Import the N-Triples (or, if `quads` is true, N-Quads) file
+    `fileName` into the model configured by `modelConf` in the
+    modelbase configured by `mbConf`, using `jobs` worker
+    processes. Progress is reported to `out`, if not ``None``. The
+    changes are committed."""
+    begin = time.time()
+
+    # Workers must be started before this process opens any database
+    # connection, since they would share it otherwise.
+    workers = multiprocessing.Pool(jobs, _initWorker, (mbConf, quads))
+    try:
+        modelBase = centralfactory.getModelbase(mbConf)
+        try:
+            sink = modelBase.getSink(modelConf)
+
+            blankScope = uuid.uuid4()
+            tasks = []
+            for i, (start, end) in \
+                    enumerate(splitFile(fileName, jobs * CHUNKS_PER_JOB)):
+                name = 'relrdf_staging_%d_%d' % (os.getpid(), i)
+                tasks.append((fileName, start, end, name, blankScope))
+            names = [task[3] for task in tasks]
+
+            try:
+                totals = {}
+                for pid, count, elapsed in \
+                        workers.imap_unordered(_loadChunk, tasks):
+                    workerCount, workerTime = totals.get(pid, (0, 0.0))
+                    totals[pid] = (workerCount + count,
+                                   workerTime + elapsed)
+                    if out is not None:
+                        print >> out, _("Worker %d: %d statements in "
+                                        "%.1f s (%.0f statements/s)") % \
+                            (pid, count, elapsed, count / max(elapsed, 1e-6))
+
+                modelBase.mergeStaging(names, sink)
+                modelBase.commit()
+            except:
+                # Workers still loading would recreate or keep writing
+                # to the staging tables.
+                workers.terminate()
+                workers.join()
+                modelBase.dropStaging(names)
+                raise
+
+            sink.close()
+        finally:
+            modelBase.close()
+    finally:
+        workers.close()
+        workers.join()
+
+    total = sum([count for count, elapsed in totals.values()])
+    elapsed = time.time() - begin
+    if out is not None:
+        for pid, (count, workerTime) in sorted(totals.items()):
+            print >> out, _("Worker %d total: %d statements "
+                            "(%.0f statements/s)") % \
+                (pid, count, count / max(workerTime, 1e-6))
+        print >> out, _("%d statements imported in %.1f s "
+                        "(%.0f statements/s)") % \
+            (total, elapsed, total / max(elapsed, 1e-6))
+
+    return total
@@ -43,26 +43,35 @@ from xml.sax.saxutils import handler
 from xml.sax.handler import ErrorHandler
 
 from relrdf.expression import uri, literal
+from relrdf.expression.interning import TermTable
 
 from rdflib_mod.RDFXMLHandler import RDFXMLHandler
 
 
 class SinkToStore(object):
-    __slots__ = ('sink')
+    __slots__ = ('sink',
+                 'terms')
 
     def __init__(self, sink):
         self.sink = sink
 
+        # URIs are interned for the whole parse.
+        self.terms = TermTable()
+
     def bind(self, prefix, namespace, override=True):
         # Ignore.
         pass
 
     def add(self, (subject, pred, object)):
-        if not isinstance(object, uri.Uri) and \
-           not isinstance(object, literal.Literal):
+        terms = self.terms
+        if isinstance(object, uri.Uri):
+            object = terms.uri(object)
+        elif isinstance(object, literal.Literal):
+            object = terms.intern(object)
+        else:
             object = literal.Literal(object)
 
-        self.sink.triple(subject, pred, object)
+        self.sink.triple(terms.uri(subject), terms.uri(pred), object)
 
 
 class RdfXmlParser(object):
@@ -23,7 +23,8 @@
 
 import os
 
-from relrdf.expression import uri,  literal
+from relrdf.expression import uri
+from relrdf.expression.interning import TermTable, EncodedUri
 
 import RDF
 
@@ -36,21 +37,21 @@ class RedlandParser(object):
     def __init__(self, format="turtle"):
         self.format = format
 
-    def _transValue(self, node, blanks):
+    def _transValue(self, node, blanks, terms):
         if node.is_literal():
             datatype = node.literal_value['datatype']
             if not datatype is None:
                 datatype = str(datatype)
-            return literal.Literal(node.literal_value['string'],
-                                   node.literal_value['language'],
-                                   datatype)
+            return terms.literal(node.literal_value['string'],
+                                 node.literal_value['language'],
+                                 datatype)
         elif node.is_resource():
-            return uri.Uri(node.uri)
+            return terms.uri(unicode(node.uri))
         elif node.is_blank():
             try:
                 return blanks[node.blank_identifier]
             except KeyError:
-                blanks[node.blank_identifier] = uri.newBlank()
+                blanks[node.blank_identifier] = EncodedUri(uri.newBlank())
                 return blanks[node.blank_identifier]
         else:
             assert False, "Received unknown node type from Redland RDF parser"
@@ -66,10 +67,12 @@ class RedlandParser(object):
         parser = RDF.Parser(name=self.format)
         stream = parser.parse_as_stream(str(source))
 
-        # Insert values into sink
+        # Insert values into sink. URIs are interned for the whole
+        # parse.
         blanks = {}
+        terms = TermTable()
         for stmt in stream:
-            sink.triple(self._transValue(stmt.subject, blanks),
-                        self._transValue(stmt.predicate, blanks),
-                        self._transValue(stmt.object, blanks))
+            sink.triple(self._transValue(stmt.subject, blanks, terms),
+                        self._transValue(stmt.predicate, blanks, terms),
+                        self._transValue(stmt.object, blanks, terms))
 
@@ -30,6 +30,8 @@ from xml.parsers import expat
 
 from relrdf import commonns
 from relrdf.expression import literal, uri
+from relrdf.expression.interning import TermTable, EncodedUri
+from relrdf.util.memlimit import MemoryCeiling
 
 
 vModellNs = uri.Namespace('http://www.v-modell-xt.de/schema/1#')
@@ -49,13 +51,21 @@ class VModellElem(object):
 
 class VModellParser(object):
     """A parser for the XML representation of the V-Modell XT, that
-    generates an equivalent RDF representation."""
+    generates an equivalent RDF representation.
+
+    The input is parsed as a stream, keeping only the stack of open
+    elements. If `maxMemory` is given, parsing fails with a
+    `MemoryLimitError` as soon as the process uses more than
+    `maxMemory` bytes. URIs are interned in `terms`, a new
+    `relrdf.expression.interning.TermTable` by default."""
 
     __slots__ = ('namespace',
                  'sink',
                  'elems',
                  'currentElem',
-                 'acumText')
+                 'acumText',
+                 'ceiling',
+                 'terms')
 
 
     # Elements lacking an id attribute, which means their id must be
@@ -126,7 +136,7 @@ class VModellParser(object):
     def __init__(self, fileObj,
                  namespace=uri.Namespace('http://www.v-modell-xt.de/'
                                          'model/1#'),
-                 sink=None):
+                 sink=None, maxMemory=None, terms=None):
         self.namespace = namespace
 
         self.sink = sink
@@ -136,6 +146,12 @@ class VModellParser(object):
 
         self.acumText = None
 
+        self.ceiling = MemoryCeiling(maxMemory)
+
+        if terms is None:
+            terms = TermTable()
+        self.terms = terms
+
         p = expat.ParserCreate()
 
         p.StartElementHandler = self._startElementHandler
@@ -145,6 +161,8 @@ class VModellParser(object):
         p.ParseFile(fileObj)
 
     def _startElementHandler(self, name, attributes):
+        self.ceiling.check()
+
         if self.acumText is not None:
             self.warning('Mixed content')
 
@@ -152,7 +170,8 @@ class VModellParser(object):
 
         if 'link' in attributes:
             # We have a relation between objects.
-            value = self.namespace['id' + attributes['link']]
+            value = self.terms.uri(self.namespace['id' +
+                                                  attributes['link']])
 
             if len(self.elems) >= 2 and \
                    self.elems[-2].uri is not None:
@@ -179,8 +198,8 @@ class VModellParser(object):
 
         if elem.uri is not None:
             # Create a declaration for the object.
-            self.sink.triple(elem.uri, commonns.rdf.type,
-                             uri.Uri(vModellNs[elem.name]))
+            self.sink.triple(elem.uri, self.terms.uri(commonns.rdf.type),
+                             self.terms.uri(vModellNs[elem.name]))
 
             # If there is a containing object, create a 'contains'
             # relationship that reflects the structure.
@@ -193,7 +212,7 @@ class VModellParser(object):
 
             if parent is not None:
                 self.sink.triple(parent.uri,
-                                 uri.Uri(vModellNs[u'enthält']),
+                                 self.terms.uri(vModellNs[u'enthält']),
                                  elem.uri)
 
         if self.acumText is not None:
@@ -221,11 +240,12 @@ class VModellParser(object):
         if len(self.elems) == 1:
             # We associate a special URI to the whole model.
             id = 'root'
-            elem.uri = self.namespace[id]
+            elem.uri = EncodedUri(self.namespace[id])
         elif name not in self.excludedElements:
             if 'id' in attributes:
+                # Element URIs are unique, and need not be interned.
                 id = attributes['id']
-                elem.uri = self.namespace['id' + id]
+                elem.uri = EncodedUri(self.namespace['id' + id])
             elif name in self.nameIdElems:
                 # Give the element a dummy URI which will be replaced
                 # as soon as a we see its name property.
@@ -258,12 +278,13 @@ class VModellParser(object):
                              " is available" % \
                              (propertyName, self.currentElem.name))
                 return
-            self.currentElem.uri = self.namespace['id' +
-                                                  urllib.quote(unicode(value) \
-                                                               .encode('utf-8'))]
+            self.currentElem.uri = \
+                EncodedUri(self.namespace['id' +
+                                          urllib.quote(unicode(value) \
+                                                       .encode('utf-8'))])
 
-        self.sink.triple(self.currentElem.uri, vModellNs[propertyName],
-                         value)
+        self.sink.triple(self.currentElem.uri,
+                         self.terms.uri(vModellNs[propertyName]), value)
 
     def warning(self, msg):
         print >> sys.stderr, "Warning:", msg.encode('utf-8')
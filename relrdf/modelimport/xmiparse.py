@@ -26,24 +26,44 @@ import sys
 import re
 import urllib
 
-from xml.etree import ElementTree as et
+try:
+    from xml.etree import cElementTree as et
+except ImportError:
+    from xml.etree import ElementTree as et
 
 from relrdf.expression.uri import Uri, Namespace
 from relrdf.expression.literal import Literal
+from relrdf.expression.interning import TermTable, EncodedUri
+from relrdf.util.memlimit import MemoryCeiling
 from relrdf import commonns
 
 
 # Default namespace for generated RDF model instances.
 defaultInstNs = Namespace('http://example.com/model.xmi#')
 
+# Maximum number of tag and attribute names whose URIs are kept during
+# a parse.
+TAG_CACHE_SIZE = 10000
+
 class XmiParser(object):
     """Basic parser for XMI encoded models.
+
+    Input is processed as a stream: elements are discarded as soon as
+    they are completely parsed, so that memory usage doesn't depend on
+    the size of the document. If `maxMemory` is given, parsing fails
+    with a `MemoryLimitError` as soon as the process uses more than
+    `maxMemory` bytes.
+
+    URIs are interned in a `relrdf.expression.interning.TermTable`
+    for the whole parse, unless a table is passed to `parse`.
     """
 
-    __slots__ = ('instNs',)
+    __slots__ = ('instNs',
+                 'maxMemory')
 
-    def __init__(self, instNs=defaultInstNs):
+    def __init__(self, instNs=defaultInstNs, maxMemory=None):
         self.instNs = instNs
+        self.maxMemory = maxMemory
 
     nsMap = { u'org.omg.xmi.namespace.UML':
               Namespace('urn:org.omg.xmi.namespace.UML.') }
@@ -57,7 +77,7 @@ class XmiParser(object):
         ns = cls.nsMap.get(m.group(2), cls.defaultNs)
         return ns[m.group(3)]
 
-    def parse(self, source, sink):
+    def parse(self, source, sink, terms=None):
         # The current entity is the entity whose definition we are now
         # seeing. Since entity definitions are nested, we use a stack
         # to put entities on hold while their nested entities are
@@ -70,13 +90,43 @@ class XmiParser(object):
         curRel = None
         relStack = []
 
+        # Elements whose end hasn't been seen yet. Only the entity and
+        # relation stacks are needed to generate statements, but
+        # iterparse attaches every element to its parent, so finished
+        # elements must be removed explicitly.
+        elemStack = []
+
+        ceiling = MemoryCeiling(self.maxMemory)
+
+        # Tags and attribute names map to a small vocabulary, so their
+        # URIs are memoized.
+        if terms is None:
+            terms = TermTable()
+        tagUris = {}
+
+        def uriFromTag(tag):
+            try:
+                return tagUris[tag]
+            except KeyError:
+                if len(tagUris) >= TAG_CACHE_SIZE:
+                    tagUris.clear()
+                term = tagUris[tag] = terms.uri(self.uriFromTag(tag))
+                return term
+
+        rdfType = terms.uri(commonns.rdf.type)
+
         for event, elem in et.iterparse(source, events=('start', 'end')):
+            ceiling.check()
+
             if event == 'start':
+                elemStack.append(elem)
+
                 xmiId = elem.get('xmi.id')
                 if xmiId is not None:
-                    entityUri = self.instNs['id' +
-                                            urllib.quote(elem.get('xmi.id'),
-                                                         safe='')]
+                    # Entity URIs are unique, and need not be interned.
+                    entityUri = EncodedUri(self.instNs['id' +
+                                                       urllib.quote(xmiId,
+                                                                    safe='')])
 
                     if curRel is not None:
                         # Create a conection from the parent entity to
@@ -88,25 +138,31 @@ class XmiParser(object):
                     curEntity = entityUri
 
                     # Declare the entity type.
-                    sink.triple(entityUri, commonns.rdf.type,
-                                self.uriFromTag(elem.tag))
+                    sink.triple(entityUri, rdfType, uriFromTag(elem.tag))
 
                     # Create one statement for each entity attribute.
                     for name, value in elem.items():
                         if name == 'xmi.id':
                             continue
-                        sink.triple(entityUri, self.uriFromTag(name),
+                        sink.triple(entityUri, uriFromTag(name),
                                     Literal(value))
                 elif curEntity is not None:
                     # This element denotes the relation between the parent
                     # element and its subelements.
                     relStack.append(curRel)
-                    curRel = self.uriFromTag(elem.tag)
+                    curRel = uriFromTag(elem.tag)
             else:
                 if elem.get('xmi.id') is not None:
                     curEntity = entityStack.pop()
                 elif curEntity is not None:
                     curRel = relStack.pop()
 
+                # A finished element is always the last child of its
+                # parent.
+                elemStack.pop()
+                elem.clear()
+                if elemStack:
+                    del elemStack[-1][-1]
+
         assert curEntity is None
         assert curRel is None
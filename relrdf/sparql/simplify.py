@@ -25,7 +25,7 @@
 import operator
 
 from relrdf.expression.simplify import flattenAssoc, flattenSelect, \
-    reduceUnary
+    reduceUnary, Simplifier
 from relrdf.expression import nodes, rewrite
 
 
@@ -63,52 +63,23 @@ def simplifyLeftJoin(expr):
 
     return expr, False
 
-def simplifyNode(expr, subexprsModif):
-    """Simplify a SPARQL node."""
-    modif = True
-    while modif:
-        modif = False
-
-        if isinstance(expr, nodes.Or):
-            expr, m = flattenAssoc(nodes.Or, expr)
-            modif = modif or m
-            expr, m = reduceUnary(expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.And):
-            expr, m = flattenAssoc(nodes.And, expr)
-            modif = modif or m
-            expr, m = reduceUnary(expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.Select):
-            expr, m = flattenSelect(expr)
-            modif = modif or m
-            expr, m = reduceUnary(expr)
-            modif = modif or m
-            expr, m = simplifySelect(expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.Join):
-            expr, m = simplifyJoin(expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.LeftJoin):
-            expr, m = simplifyLeftJoin(expr)
-            modif = modif or m
-        elif isinstance(expr, nodes.Union):
-            expr, m = flattenAssoc(nodes.Union, expr)
-            modif = modif or m
-            expr, m = reduceUnary(expr)
-            modif = modif or m
-
-        subexprsModif = subexprsModif or modif
-
-    return expr, subexprsModif
+_simplifier = Simplifier()
+_simplifier.addRules(nodes.Or,
+                     rewrite.curry(flattenAssoc, nodes.Or),
+                     reduceUnary)
+_simplifier.addRules(nodes.And,
+                     rewrite.curry(flattenAssoc, nodes.And),
+                     reduceUnary)
+_simplifier.addRules(nodes.Select,
+                     flattenSelect,
+                     reduceUnary,
+                     simplifySelect)
+_simplifier.addRules(nodes.Join, simplifyJoin)
+_simplifier.addRules(nodes.LeftJoin, simplifyLeftJoin)
+_simplifier.addRules(nodes.Union,
+                     rewrite.curry(flattenAssoc, nodes.Union),
+                     reduceUnary)
 
 def simplify(expr):
     """Simplify a SPARQL expression."""
-
-    modif = True
-    while modif:
-        modif = False
-        expr, m = rewrite.exprApply(expr, postOp=simplifyNode)
-        modif = modif or m
-
-    return expr
+    return _simplifier.simplify(expr)
@@ -34,6 +34,7 @@ import SparqlLexer
 from relrdf.localization import _
 from relrdf import TemplateError
 from relrdf import Uri, Literal
+from relrdf.commonns import xsd
 
 from relrdf.parsequerybase import BaseTemplate
 
@@ -94,41 +95,107 @@ class Template(BaseTemplate, string.Template):
 
     def _prepareMapping(self, mapping):
         for ident, value in mapping.items():
-            if isinstance(value, Literal):
-                lang = value.lang
-                typeUri = value.typeUri
-                value = self._protectString(value)
-
-                self._checkToken(value, SparqlLexer.STRING_LITERAL2)
-                if lang is not None:
-                    langTag = '@' + lang
-                    self._checkToken(langTag, SparqlLexer.LANGTAG)
-                    value = value + langTag
-                elif typeUri is not None:
-                    typeUri = '<' + unicode(typeUri) + '>'
-                    self._checkToken(typeUri, SparqlLexer.Q_IRI_REF)
-                    value = value + '^^' + typeUri
-            elif isinstance(value, Uri):
-                value = '<%s>' % unicode(value)
-                self._checkToken(value, SparqlLexer.Q_IRI_REF)
-            elif isinstance(value, int) or isinstance(value, long):
-                value = str(value)
-                self._checkToken(value, SparqlLexer.INTEGER)
-            elif isinstance(value, float):
-                value = str(value)
-                self._checkToken(value, SparqlLexer.DECIMAL,
-                                 SparqlLexer.DOUBLE)
-            elif isinstance(value, basestring):
-                value = self._protectString(value)
+            term, text = self._convertValue(value)
+            mapping[ident] = ' %s ' % text
+
+        return mapping
+
+    def _convertValue(self, value):
+        """Convert `value` to SPARQL. Return a ``(term, text)`` pair
+        with the `Uri` or `Literal` it stands for, and its SPARQL
+        representation."""
+        if isinstance(value, Literal):
+            term = value
+            lang = value.lang
+            typeUri = value.typeUri
+            value = self._protectString(value)
+
+            self._checkToken(value, SparqlLexer.STRING_LITERAL2)
+            if lang is not None:
+                langTag = '@' + lang
+                self._checkToken(langTag, SparqlLexer.LANGTAG)
+                value = value + langTag
+            elif typeUri is not None:
+                typeUri = '<' + unicode(typeUri) + '>'
+                self._checkToken(typeUri, SparqlLexer.Q_IRI_REF)
+                value = value + '^^' + typeUri
+        elif isinstance(value, Uri):
+            term = value
+            value = '<%s>' % unicode(value)
+            self._checkToken(value, SparqlLexer.Q_IRI_REF)
+        elif isinstance(value, int) or isinstance(value, long):
+            value = str(value)
+            self._checkToken(value, SparqlLexer.INTEGER)
+            term = Literal(value, typeUri=xsd.integer)
+        elif isinstance(value, float):
+            # Depending on their form, floats are read as decimals or
+            # doubles.
+            value = str(value)
+            token = self._lexToken(value, SparqlLexer.DECIMAL,
+                                   SparqlLexer.DOUBLE)
+            if token.type == SparqlLexer.DECIMAL:
+                term = Literal(value, typeUri=xsd.decimal)
             else:
-                raise TemplateError(_("Value '%s' could not be "
-                                      "automatically converted to SPARQL") %
-                                    repr(value))
+                term = Literal(value, typeUri=xsd.double)
+        elif isinstance(value, basestring):
+            term = Literal(unicode(value))
+            value = self._protectString(value)
+        else:
+            raise TemplateError(_("Value '%s' could not be "
+                                  "automatically converted to SPARQL") %
+                                repr(value))
+
+        return term, value
+
+    def getTerms(self, mapping=None, **keywords):
+        """Convert the values in `mapping` and `keywords` to RDF terms.
 
-            mapping[ident] = ' %s ' % value
+        Return a dictionary associating each field name to the `Uri`
+        or `Literal` it stands for. The terms are the ones the query
+        produced by `substitute` would contain."""
+        if mapping is None:
+            mapping = dict(keywords)
+        else:
+            mapping = dict(mapping)
+            mapping.update(keywords)
+
+        for ident, value in mapping.items():
+            term, text = self._convertValue(value)
+            mapping[ident] = term
 
         return mapping
 
+    # Prefix for the values standing for template fields in
+    # parameterized queries.
+    _paramPrefix = 'urn:x-relrdf-param:'
+
+    @staticmethod
+    def getTermKind(term):
+        """Return a hashable value describing the kind of `term`, an
+        `Uri` or `Literal`. Terms of the same kind only differ in
+        their lexical value."""
+        if isinstance(term, Uri):
+            return (Uri,)
+        else:
+            return (Literal, term.typeUri, term.lang)
+
+    def getPlaceholders(self, terms):
+        """Return a dictionary with a placeholder term for each field
+        in `terms` (as returned by `getTerms`.) Placeholders are of
+        the same kind as the terms they replace, and have a unique
+        lexical value that can be located in the compiled form of the
+        query."""
+        placeholders = {}
+        for ident, term in terms.items():
+            value = self._paramPrefix + ident
+            if isinstance(term, Uri):
+                placeholders[ident] = Uri(value)
+            else:
+                placeholders[ident] = Literal(value, lang=term.lang,
+                                              typeUri=term.typeUri)
+
+        return placeholders
+
     _protectPattern = re.compile(r'[\t\b\n\r\f"\'\\]')
 
     # Keys and values look identical, but they aren't.
@@ -150,7 +217,9 @@ class Template(BaseTemplate, string.Template):
 
     _lexer = SparqlLexer.Lexer()
 
-    def _checkToken(self, value, *tokenTypes):
+    def _lexToken(self, value, *tokenTypes):
+        """Check that `value` consists of a single token of one of
+        the given types, and return the token."""
         stream = StringIO.StringIO(value)
         self._lexer.setInput(stream)
 
@@ -162,12 +231,13 @@ class Template(BaseTemplate, string.Template):
         if len(tokens) != 1 or tokens[0].type not in tokenTypes:
             raise TemplateError(_("Invalid value '%s'") % value)
 
-        return tokens[0].text
+        return tokens[0]
 
+    def _checkToken(self, value, *tokenTypes):
+        return self._lexToken(value, *tokenTypes).text
 
-if __name__ == '__main__':
-    from relrdf.commonns import xsd
 
+if __name__ == '__main__':
     t = Template('')
 
     str1 = """This is a long
@@ -0,0 +1,129 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""A size-bounded cache with least-recently-used eviction."""
+
+from relrdf.util.methodsync import SyncMethodsMixin, synchronized
+
+
+# Positions of the fields in the linked list entries.
+_PREV, _NEXT, _KEY, _VALUE = 0, 1, 2, 3
+
+
+class LruCache(SyncMethodsMixin):
+    """A dictionary-like cache holding at most `maxSize` entries.
+
+    When the cache is full, storing a new entry evicts the least
+    recently used one. The cache counts lookup hits and misses in its
+    `hits` and `misses` attributes. All operations are thread safe."""
+
+    __slots__ = ('maxSize',
+                 'hits',
+                 'misses',
+
+                 '_entries',
+                 '_root')
+
+    def __init__(self, maxSize=1000):
+        super(LruCache, self).__init__()
+
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = {}
+
+        # Circular doubly linked list of entries, in order of use. The
+        # root's next entry is the least recently used one.
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _unlink(self, entry):
+        entry[_PREV][_NEXT] = entry[_NEXT]
+        entry[_NEXT][_PREV] = entry[_PREV]
+
+    def _linkLast(self, entry):
+        root = self._root
+        last = root[_PREV]
+        entry[_PREV] = last
+        entry[_NEXT] = root
+        last[_NEXT] = root[_PREV] = entry
+
+    @synchronized
+    def get(self, key, default=None):
+        """Return the value stored for `key`, or `default` if there
+        is none. Counts as a use of the entry."""
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._unlink(entry)
+        self._linkLast(entry)
+        return entry[_VALUE]
+
+    @synchronized
+    def put(self, key, value):
+        """Store `value` for `key`, evicting the least recently used
+        entries if the cache is full."""
+        try:
+            entry = self._entries[key]
+            self._unlink(entry)
+            entry[_VALUE] = value
+        except KeyError:
+            entry = [None, None, key, value]
+            self._entries[key] = entry
+        self._linkLast(entry)
+
+        while len(self._entries) > self.maxSize:
+            oldest = self._root[_NEXT]
+            self._unlink(oldest)
+            del self._entries[oldest[_KEY]]
+
+    @synchronized
+    def remove(self, key):
+        """Remove the entry for `key`, if present."""
+        try:
+            entry = self._entries.pop(key)
+        except KeyError:
+            return
+        self._unlink(entry)
+
+    @synchronized
+    def clear(self):
+        """Remove all entries. The hit and miss counters are kept."""
+        self._entries.clear()
+        self._root[:] = [self._root, self._root, None, None]
+
+    def stats(self):
+        """Return a ``(hits, misses, size)`` tuple."""
+        return (self.hits, self.misses, len(self._entries))
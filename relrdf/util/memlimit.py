@@ -0,0 +1,102 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""Checks of the memory used by the current process."""
+
+import os
+
+from relrdf.localization import _
+from relrdf.error import MemoryLimitError
+
+
+# Number of calls to `MemoryCeiling.check` between actual checks.
+CHECK_INTERVAL = 10000
+
+try:
+    _pageSize = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _pageSize = 4096
+
+
+def currentRss():
+    """Return the resident set size of the current process in bytes,
+    or ``None`` if it can't be determined.
+
+    The current value is only available on systems with a ``/proc``
+    file system. Elsewhere, the peak value is returned, if
+    available."""
+    try:
+        statm = open('/proc/self/statm')
+        try:
+            return int(statm.read().split()[1]) * _pageSize
+        finally:
+            statm.close()
+    except (IOError, IndexError, ValueError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux, but in bytes on Mac OS X.
+    maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if os.uname()[0] == 'Darwin':
+        return maxRss
+    return maxRss * 1024
+
+
+class MemoryCeiling(object):
+    """Guard a long running operation against using more than `limit`
+    bytes of memory (resident set size). `check` must be called
+    regularly during the operation, and raises `MemoryLimitError`
+    once the limit is exceeded. To keep the overhead low, the memory
+    usage is only looked up every `interval` calls. A `limit` of
+    ``None`` disables the checks."""
+
+    __slots__ = ('limit',
+                 'interval',
+
+                 '_countdown')
+
+    def __init__(self, limit=None, interval=CHECK_INTERVAL):
+        self.limit = limit
+        self.interval = interval
+
+        self._countdown = interval
+
+    def check(self):
+        if self.limit is None:
+            return
+
+        self._countdown -= 1
+        if self._countdown > 0:
+            return
+        self._countdown = self.interval
+
+        rss = currentRss()
+        if rss is not None and rss > self.limit:
+            raise MemoryLimitError(_("Memory limit of %d MB exceeded "
+                                     "(%d MB in use)") %
+                                   (self.limit >> 20, rss >> 20))
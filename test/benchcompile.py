@@ -0,0 +1,191 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Query compilation benchmark.
+
+Parses all DAWG test queries (the ``*.rq`` files below ``data-r2``)
+and runs them through the backend independent compiler passes
+(simplification, type checking and pattern decoupling), followed by a
+copy of the resulting expression. Queries that fail to compile (e.g.,
+those of the negative syntax tests) are skipped and counted, use
+``-v`` to list them. The benchmark aborts if no query compiles, or if
+the parser itself cannot be loaded. With ``-g SIZE``, a
+few large generated queries, with about SIZE patterns or operands
+each, are compiled as well.
+
+The benchmark is run once with basic expression nodes and once with
+exclusive expression nodes (see `relrdf.expression.nodes`), each in
+its own process, and the times are compared:
+
+  PYTHONPATH=.. python benchcompile.py [-n ROUNDS] [-g SIZE]
+                                       [-m basic|exclusive] [-v]
+
+Use ``-m`` to run a single mode only.
+"""
+
+import os
+import sys
+import getopt
+import time
+import subprocess
+
+
+MODES = ('basic', 'exclusive')
+
+def findQueries(baseDir):
+    queries = []
+    for dirPath, dirNames, fileNames in os.walk(baseDir):
+        dirNames.sort()
+        for fileName in sorted(fileNames):
+            if fileName.endswith('.rq'):
+                queries.append(os.path.join(dirPath, fileName))
+    return queries
+
+def generateQueries(size):
+    """Return a list of large ``(name, query text)`` pairs."""
+    prefix = 'PREFIX ex: <http://example.com/bench/>\n'
+
+    # A long chain of triple patterns.
+    patterns = ['?s%d ex:p%d ?s%d .' % (i, i % 10, i + 1)
+                for i in xrange(size)]
+    chain = prefix + 'SELECT * WHERE {\n%s\n}' % '\n'.join(patterns)
+
+    # A long filter condition.
+    conds = ['?o = %d' % i for i in xrange(size)]
+    filter = prefix + 'SELECT ?s WHERE { ?s ex:p ?o FILTER (%s) }' % \
+        ' || '.join(conds)
+
+    # Many union branches.
+    branches = ['{ ?s ex:p%d ?o OPTIONAL { ?o ex:q ?x } }' % i
+                for i in xrange(size)]
+    union = prefix + 'SELECT ?s ?x WHERE { %s }' % ' UNION '.join(branches)
+
+    return [('<chain>', chain), ('<filter>', filter), ('<union>', union)]
+
+def runMode(mode, rounds, size, verbose=False):
+    """Run the benchmark in the current process and return the number
+    of compiled queries and the best time for a round."""
+    if mode == 'exclusive':
+        os.environ['RELRDF_EXCLUSIVE_NODES'] = '1'
+    else:
+        os.environ.pop('RELRDF_EXCLUSIVE_NODES', None)
+
+    from relrdf import parsequery
+    from relrdf.error import Error
+
+    baseDir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'data-r2')
+    candidates = [(fileName, open(fileName).read().decode('utf-8'))
+                  for fileName in findQueries(baseDir)]
+    if size > 0:
+        candidates.extend(generateQueries(size))
+
+    # Only RelRDF errors are expected. Anything else, in particular
+    # a missing generated parser, aborts the benchmark.
+    queries = []
+    failed = 0
+    for fileName, queryText in candidates:
+        try:
+            parsequery.parseQuery('sparql', queryText, fileName=fileName)
+        except Error, e:
+            failed += 1
+            if verbose:
+                print >> sys.stderr, "%s: %s" % (fileName, e.msg)
+            continue
+        queries.append((fileName, queryText))
+
+    print >> sys.stderr, "%s: %d of %d queries failed to compile" % \
+        (mode, failed, len(candidates))
+    if len(queries) == 0:
+        print >> sys.stderr, "No query could be compiled"
+        sys.exit(1)
+
+    best = None
+    for i in xrange(rounds):
+        start = time.time()
+        for fileName, queryText in queries:
+            query = parsequery.parseQuery('sparql', queryText,
+                                          fileName=fileName)
+            query.getExpression().copy()
+        elapsed = time.time() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return len(queries), best
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'n:g:m:v')
+    except getopt.GetoptError, e:
+        print >> sys.stderr, e
+        sys.exit(1)
+
+    rounds = 5
+    size = 0
+    mode = None
+    verbose = False
+    for opt, val in opts:
+        if opt == '-n':
+            rounds = int(val)
+        elif opt == '-g':
+            size = int(val)
+        elif opt == '-m':
+            if val not in MODES:
+                print >> sys.stderr, "Invalid mode '%s'" % val
+                sys.exit(1)
+            mode = val
+        elif opt == '-v':
+            verbose = True
+
+    if mode is not None:
+        count, best = runMode(mode, rounds, size, verbose)
+        print count, best
+        return
+
+    print "%10s %8s %12s %12s" % ('mode', 'queries', 'round (s)',
+                                  'query (ms)')
+
+    times = []
+    for mode in MODES:
+        cmd = [sys.executable, __file__, '-n', str(rounds), '-g', str(size),
+               '-m', mode]
+        if verbose:
+            cmd.append('-v')
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+        output = proc.communicate()[0]
+        if proc.returncode != 0:
+            print >> sys.stderr, "Mode '%s' failed" % mode
+            sys.exit(1)
+        count, best = output.split()
+        count, best = int(count), float(best)
+        times.append(best)
+
+        print "%10s %8d %12.3f %12.3f" % (mode, count, best,
+                                          1000 * best / max(count, 1))
+
+    print "exclusive/basic: %.2fx" % (times[1] / times[0])
+
+
+if __name__ == '__main__':
+    main()
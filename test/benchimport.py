@@ -0,0 +1,123 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Import benchmark for the Postgres basic schema.
+
+Loads synthetic models of increasing size into a modelbase, using
+both the INSERT based and the COPY based (bulk load) import paths,
+and reports the throughput in triples per second. Use a scratch
+database, since the loaded graphs are not removed afterwards:
+
+  python benchimport.py -d relrdf_bench -h localhost -U relrdf
+"""
+
+import sys
+import getopt
+import time
+
+from relrdf.expression import uri, literal
+from relrdf.db.postgres.modelbase import getModelbase
+
+
+ex = uri.Namespace('http://example.com/bench/')
+
+# Number of distinct predicates in the synthetic models.
+PREDICATES = 50
+
+def syntheticTriples(count):
+    """Generate `count` synthetic triples with a realistic mix of
+    resource objects, plain, typed and language tagged literals."""
+    preds = [ex['p%d' % i] for i in xrange(PREDICATES)]
+
+    for i in xrange(count):
+        subject = ex['s%d' % (i // 10)]
+        pred = preds[i % PREDICATES]
+        kind = i % 4
+        if kind == 0:
+            object = ex['s%d' % (i // 7)]
+        elif kind == 1:
+            object = literal.Literal('value %d with a\ttab' % i)
+        elif kind == 2:
+            object = literal.Literal(i)
+        else:
+            object = literal.Literal("it's %d" % i, lang='en')
+
+        yield subject, pred, object
+
+def load(modelbase, graphUri, count, bulkLoad):
+    modelbase.setBulkLoad(bulkLoad)
+    sink = modelbase.getSink('singlegraph', baseGraph=graphUri)
+
+    start = time.time()
+    for subject, pred, object in syntheticTriples(count):
+        sink.triple(subject, pred, object)
+    modelbase.commit()
+    elapsed = time.time() - start
+
+    sink.close()
+
+    return elapsed
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'd:h:U:P:s:')
+    except getopt.GetoptError, e:
+        print >> sys.stderr, e
+        sys.exit(1)
+
+    db = 'relrdf'
+    params = {}
+    sizes = [10**5, 10**6, 10**7]
+    for opt, val in opts:
+        if opt == '-d':
+            db = val
+        elif opt == '-h':
+            params['host'] = val
+        elif opt == '-U':
+            params['user'] = val
+        elif opt == '-P':
+            params['password'] = val
+        elif opt == '-s':
+            sizes = [int(s) for s in val.split(',')]
+
+    print "%10s %14s %14s %8s" % ('triples', 'insert (t/s)', 'copy (t/s)',
+                                  'speedup')
+
+    runId = int(time.time())
+    for count in sizes:
+        rates = []
+        for bulkLoad in (False, True):
+            graphUri = ex['graph-%d-%d-%d' % (runId, count, bulkLoad)]
+
+            modelbase = getModelbase(db, **params)
+            elapsed = load(modelbase, graphUri, count, bulkLoad)
+            modelbase.close()
+
+            rates.append(count / elapsed)
+
+        print "%10d %14.0f %14.0f %7.1fx" % (count, rates[0], rates[1],
+                                             rates[1] / rates[0])
+
+
+if __name__ == '__main__':
+    main()
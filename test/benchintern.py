@@ -0,0 +1,192 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+
+"""Term interning benchmark for the V-Modell importer.
+
+Parses a V-Modell XT file with `VModellParser` and encodes the
+statements into rows the way `BasicModelbase.queueTriple` does,
+keeping a batch of rows pending as the modelbase does before sending
+them to the database. The parse is run with a
+`relrdf.expression.interning.TermTable` and, for comparison, with a
+table creating a new URI for every occurrence, as the importers did
+before interning was introduced:
+
+  PYTHONPATH=.. python benchintern.py [-n ROUNDS] [-b ROWS] [FILE]
+
+If no file is given, a synthetic V-Modell document with ``-s SIZE``
+products (10000 by default) is generated. For every mode, the output
+shows the number of URI objects created, the memory taken by the
+strings held by a batch of pending rows, and the best throughput.
+"""
+
+import sys
+import getopt
+import time
+from StringIO import StringIO
+
+from relrdf.modelbase import Sink
+from relrdf.expression import uri, literal, interning
+from relrdf.modelimport.vmodellparse import VModellParser
+
+
+class PlainTerms(object):
+    """A term table creating a new URI for every occurrence."""
+
+    __slots__ = ('misses',)
+
+    def __init__(self):
+        self.misses = 0
+
+    def uri(self, text):
+        self.misses += 1
+        return uri.Uri(text)
+
+
+class RowSink(Sink):
+    """A sink encoding statements into rows, like
+    `BasicModelbase.queueTriple`. Rows are discarded when a batch is
+    complete, after measuring the memory used by the strings in
+    it."""
+
+    __slots__ = ('batchSize',
+                 'count',
+                 'batchBytes',
+
+                 '_rows')
+
+    def __init__(self, batchSize):
+        self.batchSize = batchSize
+        self.count = 0
+        self.batchBytes = []
+
+        self._rows = []
+
+    def triple(self, subject, pred, object):
+        lang = typeUri = None
+        isResource = 0
+        if isinstance(object, uri.Uri):
+            isResource = 1
+        elif object.typeUri is not None:
+            typeUri = interning.encode(object.typeUri)
+        elif object.lang is not None:
+            lang = unicode(object.lang.lower()).encode('utf-8')
+
+        self._rows.append((1, interning.encode(subject),
+                           interning.encode(pred),
+                           interning.encode(object),
+                           isResource, typeUri, lang))
+        self.count += 1
+
+        if len(self._rows) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        strings = {}
+        for row in self._rows:
+            for value in row[1:4]:
+                strings[id(value)] = value
+        self.batchBytes.append(sum([sys.getsizeof(value)
+                                    for value in strings.itervalues()]))
+        self._rows = []
+
+
+def syntheticModel(size):
+    """Return a V-Modell document with `size` products, each linked
+    to a role and a topic."""
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<V-Modell id="vm" version="1.3">\n<Rollen>\n']
+    for i in xrange(size // 10 + 1):
+        parts.append('<Rolle id="r%d"><Name>Rolle %d</Name>'
+                     '<Beschreibung>Beschreibung der Rolle %d'
+                     '</Beschreibung></Rolle>\n' % (i, i, i))
+    parts.append('</Rollen>\n<Produkte>\n')
+    for i in xrange(size):
+        parts.append('<Produkt id="p%d"><Name>Produkt %d</Name>'
+                     '<Initial>false</Initial><Extern>false</Extern>'
+                     '<Beschreibung>Beschreibung des Produkts %d'
+                     '</Beschreibung>'
+                     '<RolleRef link="r%d"/>'
+                     '<Themen><Thema id="t%d"><Name>Thema %d</Name>'
+                     '<ProduktRef link="p%d"/></Thema></Themen>'
+                     '</Produkt>\n' % (i, i, i, i // 10, i, i, i))
+    parts.append('</Produkte>\n</V-Modell>\n')
+    return ''.join(parts)
+
+def run(text, makeTerms, rounds, batchSize):
+    """Parse `text` `rounds` times and return the number of URIs
+    created and statements produced by a single parse, the average
+    memory taken by a batch of rows, and the best time."""
+    best = None
+    for i in xrange(rounds):
+        terms = makeTerms()
+        sink = RowSink(batchSize)
+
+        start = time.time()
+        VModellParser(StringIO(text), sink=sink, terms=terms)
+        elapsed = time.time() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    batchBytes = sink.batchBytes or [0]
+    return terms.misses, sink.count, \
+        sum(batchBytes) / len(batchBytes), best
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'n:b:s:')
+    except getopt.GetoptError, e:
+        print >> sys.stderr, e
+        sys.exit(1)
+
+    rounds = 3
+    batchSize = 10000
+    size = 10000
+    for opt, val in opts:
+        if opt == '-n':
+            rounds = int(val)
+        elif opt == '-b':
+            batchSize = int(val)
+        elif opt == '-s':
+            size = int(val)
+
+    if args:
+        text = open(args[0]).read()
+    else:
+        text = syntheticModel(size)
+
+    print "%10s %10s %12s %12s %12s" % ('mode', 'uris', 'batch (KB)',
+                                        'time (s)', 'triples/s')
+
+    for mode, makeTerms in (('plain', PlainTerms),
+                            ('interned', interning.TermTable)):
+        uris, count, batchBytes, best = run(text, makeTerms, rounds,
+                                            batchSize)
+        print "%10s %10d %12d %12.3f %12.0f" % (mode, uris,
+                                                batchBytes // 1024, best,
+                                                count / best)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Join ordering benchmark for the Postgres basic schema.
+
+Compiles a set of SPARQL queries against a single graph model, once
+with cost based join ordering (see `relrdf.mapping.joinorder`) and
+once with relations joined in source order, and compares the total
+cost estimated by the Postgres planner for both SQL versions. With
+``-a``, the queries are also run (using ``EXPLAIN ANALYZE``) and the
+actual execution times are compared:
+
+  PYTHONPATH=.. python benchjoins.py -d relrdf -h localhost -U relrdf
+                                     -g GRAPH_URI [-a] [QUERY_FILE...]
+
+If no query files are given, all DAWG test queries (the ``*.rq``
+files below ``data-r2``) are used. Queries that fail to compile are
+skipped.
+"""
+
+import os
+import re
+import sys
+import getopt
+
+from relrdf.db.postgres import pool
+from relrdf.db.postgres.modelbase import getModelbase
+
+
+_costPattern = re.compile(r'cost=[0-9.]+\.\.([0-9.]+)')
+_timePattern = re.compile(r'Total runtime: ([0-9.]+) ms')
+
+def findQueries(baseDir):
+    queries = []
+    for dirPath, dirNames, fileNames in os.walk(baseDir):
+        dirNames.sort()
+        for fileName in sorted(fileNames):
+            if fileName.endswith('.rq'):
+                queries.append(os.path.join(dirPath, fileName))
+    return queries
+
+def explain(cursor, sqlText, analyze):
+    """Return the planner's total cost estimate for `sqlText` and,
+    if `analyze` is true, its execution time in milliseconds."""
+    if analyze:
+        cursor.execute('EXPLAIN ANALYZE ' + sqlText)
+    else:
+        cursor.execute('EXPLAIN ' + sqlText)
+    lines = [row[0] for row in cursor.fetchall()]
+
+    cost = float(_costPattern.search(lines[0]).group(1))
+    runtime = None
+    if analyze:
+        for line in lines:
+            match = _timePattern.search(line)
+            if match is not None:
+                runtime = float(match.group(1))
+
+    return cost, runtime
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'd:h:U:P:g:a')
+    except getopt.GetoptError, e:
+        print >> sys.stderr, e
+        sys.exit(1)
+
+    db = 'relrdf'
+    params = {}
+    graphUri = None
+    analyze = False
+    for opt, val in opts:
+        if opt == '-d':
+            db = val
+        elif opt == '-h':
+            params['host'] = val
+        elif opt == '-U':
+            params['user'] = val
+        elif opt == '-P':
+            params['password'] = val
+        elif opt == '-g':
+            graphUri = val
+        elif opt == '-a':
+            analyze = True
+
+    if graphUri is None:
+        print >> sys.stderr, "A graph URI must be given with -g"
+        sys.exit(1)
+
+    if len(args) == 0:
+        baseDir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'data-r2')
+        args = findQueries(baseDir)
+
+    modelbase = getModelbase(db, **params)
+    model = modelbase.getModel('plain', baseGraph=graphUri)
+
+    connPool = pool.getPool(db, **params)
+    conn = connPool.getConnection()
+    cursor = conn.cursor()
+
+    print "%-40s %12s %12s %8s" % ('query', 'source', 'ordered', 'ratio')
+
+    totals = [0.0, 0.0]
+    count = 0
+    for fileName in args:
+        queryText = open(fileName).read().decode('utf-8')
+
+        results = []
+        try:
+            for joinOrdering in (False, True):
+                model.setJoinOrdering(joinOrdering)
+                sqlText = model.querySQL('sparql', queryText,
+                                         fileName=fileName)
+                cost, runtime = explain(cursor, sqlText, analyze)
+                if analyze:
+                    results.append(runtime)
+                else:
+                    results.append(cost)
+        except Exception:
+            conn.rollback()
+            continue
+
+        count += 1
+        totals[0] += results[0]
+        totals[1] += results[1]
+        print "%-40s %12.1f %12.1f %7.2fx" % \
+            (os.path.basename(fileName)[-40:], results[0], results[1],
+             results[0] / max(results[1], 0.001))
+
+    cursor.close()
+    conn.rollback()
+    connPool.releaseConnection(conn)
+    model.close()
+    modelbase.close()
+
+    if analyze:
+        unit = 'ms'
+    else:
+        unit = 'cost'
+    print "%d queries, total %s: %.1f (source order), %.1f (ordered)" % \
+        (count, unit, totals[0], totals[1])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""N-Triples import benchmark.
+
+Generates an N-Triples file with about SIZE statements (a mix of
+resources, plain, tagged and typed literals, blank nodes and escape
+sequences), and parses it with the built-in parser
+(`relrdf.modelimport.ntriplesparse`) and, if available, with the
+Redland based parser. Statements are converted to the row format
+used by the Postgres modelbase for loading, but not sent to any
+database:
+
+  PYTHONPATH=.. python benchntriples.py [-s SIZE] [-n ROUNDS]
+                                        [-f FILE]
+
+With ``-f``, FILE is parsed instead of a generated file.
+"""
+
+import os
+import sys
+import getopt
+import time
+import tempfile
+
+from relrdf.expression import uri, literal
+from relrdf.modelimport import ntriplesparse
+
+
+class EncodedRowSink(object):
+    """Collect rows as the Postgres modelbase does for parsers
+    producing encoded statements. Only the row count is kept."""
+
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+    def encodedTriple(self, subject, pred, object, isResource,
+                      typeUri=None, lang=None, graphUri=None):
+        row = (1, subject, pred, object, isResource, typeUri, lang)
+        self.count += 1
+
+class TermRowSink(object):
+    """Convert terms to rows as the Postgres modelbase does in
+    `queueTriple`. Only the row count is kept."""
+
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+    def triple(self, subject, pred, object):
+        lang = typeUri = None
+        isResource = isinstance(object, uri.Uri)
+        if not isResource:
+            if object.typeUri is not None:
+                typeUri = unicode(object.typeUri).encode('utf-8')
+            elif object.lang is not None:
+                lang = unicode(object.lang.lower()).encode('utf-8')
+
+        row = (1, unicode(subject).encode('utf-8'),
+               unicode(pred).encode('utf-8'),
+               unicode(object).encode('utf-8'), isResource, typeUri, lang)
+        self.count += 1
+
+def generate(stream, size):
+    """Write about `size` statements to `stream`."""
+    for i in xrange(size / 5):
+        subj = '<http://example.com/bench/item%d>' % i
+        stream.write('%s <http://example.com/bench/p%d> '
+                     '<http://example.com/bench/item%d> .\n' %
+                     (subj, i % 20, (i * 7) % size))
+        stream.write('%s <http://example.com/bench/name> '
+                     '"Item number %d" .\n' % (subj, i))
+        stream.write('%s <http://example.com/bench/label> '
+                     '"Eintrag \\u00FCber %d\\n"@de .\n' % (subj, i))
+        stream.write('%s <http://example.com/bench/size> '
+                     '"%d"^^<http://www.w3.org/2001/XMLSchema#integer> .\n' %
+                     (subj, i))
+        stream.write('%s <http://example.com/bench/part> _:b%d .\n' %
+                     (subj, i % 1000))
+
+def parseNative(fileName):
+    sink = EncodedRowSink()
+    ntriplesparse.NTriplesParser().parse(fileName, sink)
+    return sink.count
+
+def parseRedland(fileName):
+    from relrdf.modelimport import redlandparse
+
+    sink = TermRowSink()
+    redlandparse.RedlandParser(format='ntriples').parse(fileName, sink)
+    return sink.count
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 's:n:f:')
+    except getopt.GetoptError, e:
+        print >> sys.stderr, e
+        sys.exit(1)
+
+    size = 100000
+    rounds = 3
+    fileName = None
+    for opt, val in opts:
+        if opt == '-s':
+            size = int(val)
+        elif opt == '-n':
+            rounds = int(val)
+        elif opt == '-f':
+            fileName = val
+
+    tempName = None
+    if fileName is None:
+        fd, tempName = tempfile.mkstemp(suffix='.nt')
+        stream = os.fdopen(fd, 'w')
+        generate(stream, size)
+        stream.close()
+        fileName = tempName
+
+    parsers = [('native', parseNative)]
+    try:
+        import RDF
+        parsers.append(('redland', parseRedland))
+    except ImportError:
+        print >> sys.stderr, "Redland not available, skipping"
+
+    print "%10s %10s %12s %14s" % ('parser', 'triples', 'time (s)',
+                                   'triples/s')
+
+    try:
+        for name, parse in parsers:
+            best = None
+            for i in xrange(rounds):
+                start = time.time()
+                count = parse(fileName)
+                elapsed = time.time() - start
+
+                if best is None or elapsed < best:
+                    best = elapsed
+
+            print "%10s %10d %12.3f %14.0f" % (name, count, best,
+                                              count / max(best, 1e-6))
+    finally:
+        if tempName is not None:
+            os.unlink(tempName)
+
+
+if __name__ == '__main__':
+    main()
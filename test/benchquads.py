@@ -0,0 +1,167 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Quads table benchmark for the Postgres basic schema.
+
+Runs a set of SPARQL queries against a graph, once through a
+'plain' model (statement patterns joining the graph_statement and
+statements tables) and once through a 'quads' model (statement
+patterns reading the denormalized quads table), and compares the
+best execution times, results included. The quads table is created
+first if necessary. With ``-t termids``, the dictionary encoded term
+tables (see the 'termids' model type) are used instead of the quads
+table:
+
+  PYTHONPATH=.. python benchquads.py -d relrdf -h localhost -U relrdf
+                                     -g GRAPH_URI [-n ROUNDS]
+                                     [-t quads|termids] [QUERY_FILE...]
+
+If no query files are given, all DAWG test queries (the ``*.rq``
+files below ``data-r2``) are used. Queries that fail in either model
+are skipped.
+"""
+
+import os
+import sys
+import getopt
+import time
+
+from relrdf.db.postgres.modelbase import getModelbase
+
+
+# Functions checking for and creating the tables used by every
+# alternative model type.
+ALTERNATIVES = {
+    'quads': ('hasQuadTable', 'setQuadTable'),
+    'termids': ('hasTermIdTables', 'setTermIdTables'),
+    }
+
+def findQueries(baseDir):
+    queries = []
+    for dirPath, dirNames, fileNames in os.walk(baseDir):
+        dirNames.sort()
+        for fileName in sorted(fileNames):
+            if fileName.endswith('.rq'):
+                queries.append(os.path.join(dirPath, fileName))
+    return queries
+
+def runQuery(model, queryText, fileName, rounds):
+    """Return the best time for running the query and retrieving all
+    of its results."""
+    best = None
+    for i in xrange(rounds):
+        start = time.time()
+        results = model.query('sparql', queryText, fileName=fileName)
+        for row in results:
+            pass
+        results.close()
+        elapsed = time.time() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'd:h:U:P:g:n:t:')
+    except getopt.GetoptError, e:
+        print >> sys.stderr, e
+        sys.exit(1)
+
+    db = 'relrdf'
+    params = {}
+    graphUri = None
+    rounds = 3
+    altType = 'quads'
+    for opt, val in opts:
+        if opt == '-d':
+            db = val
+        elif opt == '-h':
+            params['host'] = val
+        elif opt == '-U':
+            params['user'] = val
+        elif opt == '-P':
+            params['password'] = val
+        elif opt == '-g':
+            graphUri = val
+        elif opt == '-n':
+            rounds = int(val)
+        elif opt == '-t':
+            if val not in ALTERNATIVES:
+                print >> sys.stderr, "Invalid model type '%s'" % val
+                sys.exit(1)
+            altType = val
+
+    if graphUri is None:
+        print >> sys.stderr, "A graph URI must be given with -g"
+        sys.exit(1)
+
+    if len(args) == 0:
+        baseDir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'data-r2')
+        args = findQueries(baseDir)
+
+    modelbase = getModelbase(db, **params)
+    hasTables, setTables = [getattr(modelbase, name)
+                            for name in ALTERNATIVES[altType]]
+    if not hasTables():
+        print "Creating the tables for '%s'..." % altType
+        setTables(True)
+        modelbase.commit()
+
+    models = [modelbase.getModel(modelType, baseGraph=graphUri)
+              for modelType in ('plain', altType)]
+
+    print "%-40s %12s %12s %8s" % ('query', 'plain (ms)',
+                                   '%s (ms)' % altType, 'speedup')
+
+    totals = [0.0, 0.0]
+    count = 0
+    for fileName in args:
+        queryText = open(fileName).read().decode('utf-8')
+
+        try:
+            times = [runQuery(model, queryText, fileName, rounds)
+                     for model in models]
+        except Exception:
+            modelbase.rollback()
+            continue
+
+        count += 1
+        totals[0] += times[0]
+        totals[1] += times[1]
+        print "%-40s %12.1f %12.1f %7.2fx" % \
+            (os.path.basename(fileName)[-40:], 1000 * times[0],
+             1000 * times[1], times[0] / max(times[1], 0.000001))
+
+    for model in models:
+        model.close()
+    modelbase.close()
+
+    print "%d queries, total %.1f ms (plain), %.1f ms (%s)" % \
+        (count, 1000 * totals[0], 1000 * totals[1], altType)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+-- -*- SQL -*-
+--
+-- This file is part of RelRDF, a library for storage and
+-- comparison of RDF models.
+--
+-- Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+--                         Software Engineering (IESE).
+--
+-- RelRDF is free software; you can redistribute it and/or
+-- modify it under the terms of the GNU Lesser General Public
+-- License as published by the Free Software Foundation; either
+-- version 2 of the License, or (at your option) any later version.
+--
+-- This library is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+-- Lesser General Public License for more details.
+--
+-- You should have received a copy of the GNU Lesser General Public
+-- License along with this library; if not, write to the
+-- Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+-- Boston, MA 02111-1307, USA. 
+
+-- Term comparison benchmark (pgbench custom script).
+--
+-- Every transaction runs a few join heavy queries over a random
+-- slice of the statements table, joining on rdf_term equality
+-- through hash joins, merge joins and index lookups. Run it once with
+-- the rdf_term.so being tested and once with a reference build, on
+-- the same database, and compare the TPS figures:
+--
+--   pgbench -n -c 1 -T 60 -f benchterms.sql DATABASE
+--
+-- The database should hold a reasonably large data set. Set nstatements
+-- below to (about) the number of rows in the statements table, and
+-- slice to the number of statements each query starts from. Run
+-- 'ANALYZE statements' before benchmarking.
+
+\set nstatements 1000000
+\set slice 2000
+\setrandom first 1 :nstatements
+
+-- Subject/object chains, using a hash join.
+SET enable_mergejoin = off; SET enable_nestloop = off; SELECT count(*) FROM statements s1 JOIN statements s2 ON s2.subject = s1.object WHERE s1.id BETWEEN :first AND :first + :slice;
+
+-- The same chains, using a merge join.
+SET enable_hashjoin = off; SET enable_mergejoin = on; SELECT count(*) FROM statements s1 JOIN statements s2 ON s2.subject = s1.object WHERE s1.id BETWEEN :first AND :first + :slice;
+
+-- Star patterns around a subject, using the subject index.
+SET enable_hashjoin = on; SET enable_nestloop = on; SELECT count(*) FROM statements s1 JOIN statements s2 ON s2.subject = s1.subject AND s2.predicate = s1.predicate WHERE s1.id BETWEEN :first AND :first + :slice;
+
+-- Plain equality filter on objects.
+SELECT count(*) FROM statements s1 JOIN statements s2 ON s2.object = s1.object WHERE s1.id BETWEEN :first AND :first + :slice / 10;
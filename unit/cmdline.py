@@ -580,8 +580,25 @@ class ImportTestCase(BasicTestCase):
         self.checkPrint(['--type=rdfxml', 'data/model1.rdf'],
                         '925d9f176ad033d4e00c68a36b47bbb4')
 
+    def testNTriples1(self):
+        self.checkPrint(['--type=ntriples', 'data/model1.nt'],
+                        '58f21bbb5f7d67d64c4b13ca9ee5ede2')
+
     # FIXME: Test other parsers.
 
+    def testParallelUnsupported(self):
+        # The debug modelbase has no staging support.
+        st, out, err = self.checkCommandError(['import', '--jobs=2',
+                                               '--type=ntriples',
+                                               'data/model1.nt'])
+        self.assertTrue('parallel' in err)
+
+    def testParallelFileType(self):
+        st, out, err = self.checkCommandError(['import', '--jobs=2',
+                                               '--type=rdfxml',
+                                               'data/model1.rdf'])
+        self.assertTrue('rdfxml' in err)
+
     def testNoOptions(self):
         self.checkCommandError(['import'])
 
@@ -618,3 +635,24 @@ class ImportTestCase(BasicTestCase):
                                                'xxyyzz/mmnn'])
         self.assertTrue('xxyyzz/mmnn' in err)
 
+    def testFileNotFound6(self):
+        st, out, err = self.checkCommandError(['import', '--type=nquads',
+                                               'xxyyzz/mmnn'])
+        self.assertTrue('xxyyzz/mmnn' in err)
+
+
+
+class StatsTestCase(BasicTestCase):
+    """Test the stats operation."""
+
+    def setUp(self):
+        super(StatsTestCase, self).setUp()
+
+        self.selOptions = ['--mbtype=debug']
+
+    def testHelp(self):
+        self.checkCommand(['stats', '-h'])
+
+    def testNoStatistics(self):
+        st, out, err = self.checkCommandError(['stats'])
+        self.assertTrue('statistics' in err)
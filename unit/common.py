@@ -21,6 +21,8 @@
 # Free Software Foundation, Inc., 59 Temple Place - Suite 330,
 # Boston, MA 02111-1307, USA.
 
+import threading
+
 
 def raises(exc):
     """Decorator for test methods that are expected to raise
@@ -38,3 +40,89 @@ def raises(exc):
         return wrap
 
     return decorate
+
+
+class FakeError(Exception):
+    pass
+
+
+class FakeCursor(object):
+    """A cursor logging the SQL executed through it and recording the
+    batches of rows inserted. Inserts wait for `release` to be set,
+    and the insert with index `failAt` fails. No graphs exist."""
+
+    def __init__(self, log):
+        self.log = log
+        self.lastSql = None
+        self.rowcount = 0
+
+        self.batches = []
+        self.threads = set()
+        self.release = threading.Event()
+        self.release.set()
+        self.failAt = None
+
+    def execute(self, sqlText, params=None):
+        self.log.append(' '.join(sqlText.split()))
+        self.lastSql = self.log[-1]
+
+    def executemany(self, sqlText, rows):
+        self.release.wait()
+        self.threads.add(threading.currentThread())
+        if len(self.batches) == self.failAt:
+            self.batches.append(None)
+            raise FakeError("Insert failed")
+        self.batches.append(list(rows))
+        self.log.append('batch')
+
+    def fetchone(self):
+        if self.lastSql.startswith('SELECT graph_id'):
+            return None
+        return (0,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection(object):
+    """A connection handing out a single cursor."""
+
+    def __init__(self):
+        self.log = []
+        self._cursor = FakeCursor(self.log)
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.log.append('commit')
+
+    def rollback(self):
+        self.log.append('rollback')
+
+
+class FakeCache(object):
+
+    def clear(self):
+        pass
+
+
+class FakePool(object):
+    """A pool handing out `count` connections in order. Released
+    connections go to the end of the queue."""
+
+    params = {'database': 'test'}
+
+    def __init__(self, count=1):
+        self.connections = [FakeConnection() for i in xrange(count)]
+        self.statistics = FakeCache()
+        self.queryCache = FakeCache()
+
+    def getConnection(self):
+        return self.connections.pop(0)
+
+    def releaseConnection(self, conn):
+        self.connections.append(conn)
+
+    def getPrefixes(self):
+        return {}
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test how the basic schema modelbase keeps comparison graphs up to
+date, using fake database connections.
+"""
+
+import unittest
+
+try:
+    from relrdf.db.postgres.modelbase import BasicModelbase
+except ImportError:
+    # The Postgres backend is not available.
+    BasicModelbase = None
+
+from common import FakePool
+
+
+def compareCalls(log):
+    return [sqlText for sqlText in log
+            if sqlText.startswith('SELECT relrdf_compare_graphs')]
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the comparison graphs."""
+
+    def setUp(self):
+        if BasicModelbase is None:
+            self.skipTest("Postgres backend not available")
+
+        self.pool = FakePool(2)
+        self.own, self.separate = self.pool.connections
+        self.modelbase = BasicModelbase(self.pool)
+
+    def tearDown(self):
+        if BasicModelbase is not None:
+            self.modelbase.close()
+
+    def queue(self, delete, count=1):
+        for i in xrange(count):
+            self.modelbase.queueEncoded(1, delete, 's%d' % i, 'p', 'o', 1,
+                                        None, None)
+
+    def assertCompared(self, conn, other):
+        self.assertEqual(len(compareCalls(conn.log)), 1)
+        self.assertEqual(compareCalls(other.log), [])
+
+    def testSeparateConnection(self):
+        self.modelbase.prepareTwoWay(1, 2)
+
+        self.assertCompared(self.separate, self.own)
+        self.assertEqual(self.separate.log[-1], 'commit')
+
+    def testInserted(self):
+        self.queue(False)
+        self.modelbase.prepareTwoWay(1, 2)
+
+        self.assertCompared(self.own, self.separate)
+        self.assert_('SELECT insert_statements();' in self.own.log)
+        self.assert_('commit' not in self.own.log)
+
+    def testAnalyzed(self):
+        # Holds locks on the statistics.
+        self.modelbase.analyze()
+        self.modelbase.prepareTwoWay(1, 2)
+
+        self.assertCompared(self.own, self.separate)
+
+    def testOptionalTables(self):
+        self.modelbase.setQuadTable(True)
+        self.modelbase.prepareTwoWay(1, 2)
+
+        self.assertCompared(self.own, self.separate)
+
+    def testGraphCreated(self):
+        self.modelbase.lookupGraphId('http://example.com/new', create=True)
+        self.modelbase.prepareTwoWay(1, 2)
+
+        self.assertCompared(self.own, self.separate)
+
+    def testCommitted(self):
+        self.modelbase.analyze()
+        self.modelbase.commit()
+        self.modelbase.prepareTwoWay(1, 2)
+
+        self.assertCompared(self.separate, self.own)
+
+    def testRolledBack(self):
+        self.queue(False)
+        self.modelbase.rollback()
+        self.modelbase.prepareTwoWay(1, 2)
+
+        self.assertCompared(self.separate, self.own)
+
+    def testIncrementalDelete(self):
+        # Deleted statements are removed from the comparison graphs,
+        # with the graphs locked before graph_statement.
+        self.queue(True)
+        self.modelbase.flush()
+
+        log = self.own.log
+        lock = log.index('SELECT relrdf_compare_lock()')
+        delete = [i for i, sqlText in enumerate(log)
+                  if sqlText.startswith('DELETE FROM graph_statement')]
+        self.assertEqual(len(delete), 1)
+        self.assert_(lock < delete[0] <
+                     log.index('SELECT relrdf_compare_apply()'))
+
+    def testFullBatch(self):
+        # Rows already written by a full batch must still be applied.
+        self.queue(False, BasicModelbase.ROWS_PER_QUERY)
+        self.modelbase.flush()
+
+        self.assertEqual(self.own.log[-3:],
+                         ['batch', 'SELECT insert_statements();',
+                          'TRUNCATE TABLE statements_temp1'])
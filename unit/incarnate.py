@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the incarnation templates.
+"""
+
+import unittest
+
+from relrdf.expression import nodes
+from relrdf.mapping import sqlnodes, transform
+
+
+def replacement():
+    return nodes.MapResult(['subject', 'object'],
+                           nodes.Product(sqlnodes.SqlRelation(1, 'a'),
+                                         sqlnodes.SqlRelation(2, 'b')),
+                           sqlnodes.SqlFieldRef(1, 'subject'),
+                           sqlnodes.SqlFieldRef(2, 'object'))
+
+
+class TestCase(unittest.TestCase):
+    """Test case for incarnation templates."""
+
+    def setUp(self):
+        self.expr = replacement()
+        self.template = transform.IncarnationTemplate(self.expr)
+
+    def testInstantiate(self):
+        expr = self.template.instantiate()
+        self.assertEqual(expr.columnNames, ['subject', 'object'])
+
+        rel1, rel2 = expr[0]
+        self.assertEqual(rel1.sqlCode, 'a')
+        self.assertNotEqual(rel1.incarnation, rel2.incarnation)
+        self.assertEqual(expr[1].incarnation, rel1.incarnation)
+        self.assertEqual(expr[2].incarnation, rel2.incarnation)
+        self.assertEqual(expr[2].fieldId, 'object')
+
+    def testFresh(self):
+        expr1 = self.template.instantiate()
+        expr2 = self.template.instantiate()
+        self.assertFalse(expr1[0] is expr2[0])
+        self.assertNotEqual(expr1[0][0].incarnation,
+                            expr2[0][0].incarnation)
+
+        # The original stays untouched.
+        self.assertEqual(self.expr[0][0].incarnation, 1)
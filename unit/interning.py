@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the term interning table.
+"""
+
+import unittest
+
+from relrdf.expression import uri, literal
+from relrdf.expression.interning import TermTable, EncodedUri, encode
+from relrdf.modelimport.xmiparse import XmiParser
+
+from xmi import ListSink, xmiFile
+
+
+class TestCase(unittest.TestCase):
+    """Test case for `TermTable`."""
+
+    def testSameObject(self):
+        terms = TermTable()
+        u1 = terms.uri(u'http://example.com/a')
+        u2 = terms.uri(uri.Uri(u'http://example.com/a'))
+        self.assert_(u1 is u2)
+        self.assertEqual(u1, u'http://example.com/a')
+        self.assert_(isinstance(u1, uri.Uri))
+        self.assertEqual(terms.misses, 1)
+
+    def testEncoding(self):
+        term = TermTable().uri(u'http://example.com/\xe9')
+        self.assertEqual(term.utf8, 'http://example.com/\xc3\xa9')
+        self.assert_(encode(term) is term.utf8)
+        self.assertEqual(encode(uri.Uri(u'http://example.com/\xe9')),
+                         'http://example.com/\xc3\xa9')
+        self.assertEqual(encode(literal.Literal(u'\xe9')), '\xc3\xa9')
+
+    def testEncodedUri(self):
+        term = EncodedUri(u'http://example.com/a')
+        self.assert_(TermTable().uri(term) is term)
+
+    def testBounded(self):
+        terms = TermTable(maxSize=100)
+        for i in xrange(1000):
+            terms.uri(u'http://example.com/%d' % i)
+            self.assert_(len(terms) <= 100)
+        self.assertEqual(terms.misses, 1000)
+
+    def testRecentKept(self):
+        terms = TermTable(maxSize=100)
+        frequent = terms.uri(u'http://example.com/frequent')
+        for i in xrange(1000):
+            terms.uri(u'http://example.com/%d' % i)
+            self.assert_(terms.uri(u'http://example.com/frequent')
+                         is frequent)
+        self.assertEqual(terms.misses, 1001)
+
+    def testLiteral(self):
+        terms = TermTable()
+        l1 = terms.literal(u'1', typeUri=u'http://example.com/t')
+        l2 = terms.literal(u'2', typeUri=uri.Uri(u'http://example.com/t'))
+        self.assertEqual(l1, u'1')
+        self.assert_(l1.typeUri is l2.typeUri)
+        self.assertEqual(terms.literal(u'a', lang=u'en').lang, u'en')
+
+    def testIntern(self):
+        terms = TermTable()
+        typeUri = terms.uri(u'http://example.com/t')
+        lit = terms.intern(literal.Literal(u'1',
+                                           typeUri=u'http://example.com/t'))
+        self.assert_(lit.typeUri is typeUri)
+        self.assert_(terms.intern(uri.Uri(u'http://example.com/t'))
+                     is typeUri)
+        self.assertEqual(terms.intern(literal.Literal(u'x')), u'x')
+
+    def testXmiParser(self):
+        terms = TermTable()
+        sink = ListSink()
+        XmiParser().parse(xmiFile(1000), sink, terms)
+
+        preds = {}
+        for subject, pred, object in sink:
+            self.assert_(preds.setdefault(pred, pred) is pred)
+        self.assertEqual(terms.misses, len(terms))
+        self.assert_(terms.misses < len(sink))
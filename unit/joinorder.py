@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the join ordering pass.
+"""
+
+import unittest
+
+from relrdf.expression import nodes
+from relrdf.mapping import sqlnodes, joinorder
+
+
+class SizeEstimator(object):
+    """An estimator using a fixed size per relation, divided by 10
+    for every local condition."""
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+
+    def estimate(self, rel, conds):
+        return self.sizes[rel.sqlCode] / 10.0 ** len(conds)
+
+
+def field(incarnation, fieldId='id'):
+    return sqlnodes.SqlFieldRef(incarnation, fieldId)
+
+def join(inc1, inc2):
+    return sqlnodes.SqlEqual(field(inc1), field(inc2))
+
+def relations(expr):
+    """Return the SQL code of the relations in `expr`, in the order
+    they are joined."""
+    if isinstance(expr, sqlnodes.SqlRelation):
+        return [expr.sqlCode]
+    elif isinstance(expr, nodes.Select):
+        return relations(expr[0])
+    else:
+        result = []
+        for subexpr in expr:
+            result.extend(relations(subexpr))
+        return result
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the join ordering pass."""
+
+    def select(self, cond):
+        return nodes.Select(nodes.Product(sqlnodes.SqlRelation(1, 'a'),
+                                          sqlnodes.SqlRelation(2, 'b'),
+                                          sqlnodes.SqlRelation(3, 'c')),
+                            cond)
+
+    def testSmallestFirst(self):
+        expr = self.select(sqlnodes.SqlAnd(join(1, 2), join(2, 3)))
+        estimator = SizeEstimator({'a': 100, 'b': 1000, 'c': 10})
+        expr = joinorder.orderJoins(expr, estimator)
+        self.assertEqual(relations(expr), ['c', 'b', 'a'])
+
+    def testConnected(self):
+        # 'a' is smaller than 'b', but not connected to 'c'.
+        expr = self.select(sqlnodes.SqlAnd(join(1, 2), join(2, 3)))
+        estimator = SizeEstimator({'a': 100, 'b': 1000, 'c': 1})
+        expr = joinorder.orderJoins(expr, estimator)
+        self.assertEqual(relations(expr), ['c', 'b', 'a'])
+
+    def testLocalConditions(self):
+        local = sqlnodes.SqlEqual(field(2, 'predicate'), sqlnodes.SqlInt(1))
+        expr = self.select(sqlnodes.SqlAnd(join(1, 2), join(2, 3), local))
+        estimator = SizeEstimator({'a': 100, 'b': 1000, 'c': 1000})
+        expr = joinorder.orderJoins(expr, estimator)
+        self.assertEqual(relations(expr), ['a', 'b', 'c'])
+
+        # The local condition is attached to the first join.
+        self.assertTrue(isinstance(expr, nodes.Select))
+        inner = expr[0][0]
+        self.assertTrue(isinstance(inner, nodes.Select))
+        self.assertEqual(len(inner[1]), 2)
+
+    def testTies(self):
+        expr = self.select(sqlnodes.SqlAnd(join(1, 2), join(2, 3)))
+        estimator = SizeEstimator({'a': 10, 'b': 10, 'c': 10})
+        expr = joinorder.orderJoins(expr, estimator)
+        self.assertEqual(relations(expr), ['a', 'b', 'c'])
+
+    def testSmallProduct(self):
+        expr = nodes.Select(nodes.Product(sqlnodes.SqlRelation(1, 'a'),
+                                          sqlnodes.SqlRelation(2, 'b')),
+                            join(1, 2))
+        estimator = SizeEstimator({'a': 1000, 'b': 10})
+        expr = joinorder.orderJoins(expr, estimator)
+        self.assertTrue(isinstance(expr[0], nodes.Product))
+        self.assertEqual(relations(expr), ['a', 'b'])
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the LRU cache utility class.
+"""
+
+import unittest
+
+from relrdf.util.lrucache import LruCache
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the LRU cache."""
+
+    def setUp(self):
+        self.cache = LruCache(maxSize=3)
+
+    def testGetPut(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('b'), 2)
+        self.assertEqual(self.cache.get('c'), None)
+        self.assertEqual(self.cache.get('c', 42), 42)
+        self.assertEqual(self.cache.stats(), (2, 2, 2))
+
+    def testReplace(self):
+        self.cache.put('a', 1)
+        self.cache.put('a', 2)
+        self.assertEqual(self.cache.get('a'), 2)
+        self.assertEqual(len(self.cache), 1)
+
+    def testEviction(self):
+        for i, key in enumerate('abcd'):
+            self.cache.put(key, i)
+        self.assertEqual(len(self.cache), 3)
+        self.assertFalse('a' in self.cache)
+        self.assertTrue('d' in self.cache)
+
+    def testEvictionOrder(self):
+        for i, key in enumerate('abc'):
+            self.cache.put(key, i)
+
+        # Using 'a' makes 'b' the least recently used entry.
+        self.cache.get('a')
+        self.cache.put('d', 3)
+        self.assertTrue('a' in self.cache)
+        self.assertFalse('b' in self.cache)
+
+    def testRemoveClear(self):
+        for i, key in enumerate('abc'):
+            self.cache.put(key, i)
+        self.cache.remove('b')
+        self.cache.remove('x')
+        self.assertEqual(len(self.cache), 2)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.cache.put('e', 4)
+        self.assertEqual(self.cache.get('e'), 4)
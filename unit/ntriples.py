@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the N-Triples and N-Quads parser.
+"""
+
+import os
+import uuid
+import tempfile
+import unittest
+from StringIO import StringIO
+
+import relrdf
+from relrdf import Uri, Literal
+from relrdf.error import SyntaxError
+from relrdf.modelbase import Sink
+from relrdf.modelimport.ntriplesparse import NTriplesParser, unescape
+from relrdf.modelimport.parallelimport import splitFile, readLines
+
+from common import raises
+
+
+class EncodedSink(Sink, list):
+    """A sink keeping the arguments to `encodedTriple`."""
+
+    def encodedTriple(self, *args):
+        self.append(args)
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the N-Triples parser."""
+
+    def parse(self, text, quads=False):
+        sink = EncodedSink()
+        NTriplesParser(quads=quads).parse(StringIO(text), sink)
+        return sink
+
+    def testResources(self):
+        sink = self.parse('<http://example.com/s> <http://example.com/p> '
+                          '<http://example.com/o> .\n')
+        self.assertEqual(sink, [('http://example.com/s',
+                                 'http://example.com/p',
+                                 'http://example.com/o',
+                                 True, None, None, None)])
+
+    def testLiterals(self):
+        sink = self.parse('<s> <p> "plain" .\n'
+                          '<s> <p> "tagged"@EN-us .\n'
+                          '<s> <p> "1"^^<http://example.com/t> .\n'
+                          '<s> <p> "\\"q\\" \\t\\u00E9\\U0001D11E\\\\" .\n')
+        self.assertEqual([row[2:6] for row in sink],
+                         [('plain', False, None, None),
+                          ('tagged', False, None, 'en-us'),
+                          ('1', False, 'http://example.com/t', None),
+                          ('"q" \t\xc3\xa9\xf0\x9d\x84\x9e\\', False,
+                           None, None)])
+
+    def testBlanks(self):
+        sink = self.parse('_:a <p> _:b .\n'
+                          '_:b <p> _:a.\n')
+        self.assertEqual(sink[0][0], sink[1][2])
+        self.assertEqual(sink[0][2], sink[1][0])
+        self.assertNotEqual(sink[0][0], sink[0][2])
+        self.assertTrue(Uri(sink[0][0]).isBlank())
+
+    def testCommentsAndSpacing(self):
+        sink = self.parse('# A comment\n'
+                          '\n'
+                          '  \t\n'
+                          '<s>\t<p>   <o>  .  # Trailing comment\r\n'
+                          '<s><p>"x".')
+        self.assertEqual(len(sink), 2)
+
+    def testQuads(self):
+        sink = self.parse('<s> <p> <o> <http://example.com/g> .\n'
+                          '<s> <p> "x" .\n', quads=True)
+        self.assertEqual([row[6] for row in sink],
+                         ['http://example.com/g', None])
+
+    @raises(SyntaxError)
+    def testGraphInTriples(self):
+        self.parse('<s> <p> <o> <g> .\n')
+
+    @raises(SyntaxError)
+    def testMissingDot(self):
+        self.parse('<s> <p> <o>\n')
+
+    @raises(SyntaxError)
+    def testLiteralSubject(self):
+        self.parse('"s" <p> <o> .\n')
+
+    @raises(SyntaxError)
+    def testInvalidEscape(self):
+        self.parse('<s> <p> "\\q" .\n')
+
+    def testErrorPosition(self):
+        try:
+            self.parse('<s> <p> <o> .\n\n<s> <p>\n')
+        except SyntaxError, e:
+            self.assertEqual(e.extents.startLine, 3)
+        else:
+            self.fail()
+
+    def testUnescape(self):
+        self.assertEqual(unescape('abc'), 'abc')
+        self.assertEqual(unescape('a\\nb\\u0041'), 'a\nbA')
+
+    def testConvertingSink(self):
+        # Sinks not handling encoded statements receive regular
+        # terms.
+        mb = relrdf.getModelbaseFromParams('debug')
+        sink = mb.getSinkFromParams('list')
+        NTriplesParser().parse(StringIO('<s> <p> <o> .\n'
+                                        '<s> <p> "x"@en .\n'), sink)
+        self.assertEqual(sink, [(Uri('s'), Uri('p'), Uri('o')),
+                                (Uri('s'), Uri('p'), Literal('x', 'en'))])
+        self.assertEqual(sink[1][2].lang, 'en')
+
+
+class ChunkTestCase(unittest.TestCase):
+    """Test case for parsing N-Triples files in chunks."""
+
+    def setUp(self):
+        fd, self.fileName = tempfile.mkstemp(suffix='.nt')
+        stream = os.fdopen(fd, 'w')
+        for i in xrange(100):
+            stream.write('<s%d> <p> _:b%d .\n' % (i, i % 7))
+        stream.close()
+
+    def tearDown(self):
+        os.unlink(self.fileName)
+
+    def testSplit(self):
+        lines = open(self.fileName).readlines()
+        for count in (1, 3, 7, 1000):
+            chunks = splitFile(self.fileName, count)
+            self.assertTrue(len(chunks) <= count)
+
+            chunkLines = []
+            for start, end in chunks:
+                stream = open(self.fileName, 'rb')
+                chunkLines.extend(readLines(stream, start, end))
+                stream.close()
+            self.assertEqual(chunkLines, lines)
+
+    def testBlankScope(self):
+        # Chunks parsed with the same scope share their blank nodes.
+        scope = uuid.uuid4()
+        sinks = []
+        for start, end in splitFile(self.fileName, 2):
+            sink = EncodedSink()
+            stream = open(self.fileName, 'rb')
+            NTriplesParser().parseLines(readLines(stream, start, end),
+                                        sink, blankScope=scope)
+            stream.close()
+            sinks.append(sink)
+
+        self.assertEqual(len(sinks), 2)
+        self.assertEqual(set([row[2] for row in sinks[0]]),
+                         set([row[2] for row in sinks[1]]))
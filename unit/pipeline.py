@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the pipelined mode of the basic schema modelbase, using a
+fake database connection.
+"""
+
+import time
+import threading
+import unittest
+
+try:
+    from relrdf.db.postgres.modelbase import BasicModelbase
+except ImportError:
+    # The Postgres backend is not available.
+    BasicModelbase = None
+
+from common import FakeError, FakePool
+
+
+if BasicModelbase is not None:
+    class SmallBatchModelbase(BasicModelbase):
+        __slots__ = ()
+
+        ROWS_PER_QUERY = 10
+
+
+class TestCase(unittest.TestCase):
+    """Test case for pipelined mode."""
+
+    def setUp(self):
+        if BasicModelbase is None:
+            self.skipTest("Postgres backend not available")
+
+        self.pool = FakePool()
+        self.conn, = self.pool.connections
+        self.cursor = self.conn.cursor()
+        self.modelbase = SmallBatchModelbase(self.pool, pipelined=True)
+
+    def tearDown(self):
+        if BasicModelbase is not None:
+            self.cursor.release.set()
+            self.modelbase.close()
+
+    def queue(self, count, start=0):
+        for i in xrange(start, start + count):
+            self.modelbase.queueEncoded(1, False, 's%d' % i, 'p', 'o', 1,
+                                        None, None)
+
+    def rows(self):
+        return [row[1] for batch in self.cursor.batches
+                if batch is not None for row in batch]
+
+    def testCommit(self):
+        self.queue(35)
+        self.modelbase.commit()
+
+        self.assertEqual(self.rows(), ['s%d' % i for i in xrange(35)])
+        self.assertEqual([len(batch) for batch in self.cursor.batches],
+                         [10, 10, 10, 5])
+        self.assertEqual(self.conn.log[-7:],
+                         ['batch', 'batch', 'batch', 'batch',
+                          'SELECT insert_statements();',
+                          'TRUNCATE TABLE statements_temp1',
+                          'commit'])
+
+    def testBackground(self):
+        # Full batches are written by the writer thread, the rest by
+        # the committing thread.
+        self.queue(25)
+        self.modelbase.commit()
+
+        self.assert_(threading.currentThread() in self.cursor.threads)
+        self.assertEqual(len(self.cursor.threads), 2)
+
+    def testNotPipelined(self):
+        self.modelbase.setPipelined(False)
+        self.queue(20)
+        self.modelbase.commit()
+
+        self.assertEqual(self.cursor.threads,
+                         set([threading.currentThread()]))
+
+    def testBackpressure(self):
+        self.cursor.release.clear()
+
+        producer = threading.Thread(target=self.queue, args=(100,))
+        producer.setDaemon(True)
+        producer.start()
+        time.sleep(0.2)
+
+        # One batch is being written and PIPELINE_DEPTH are waiting.
+        self.assert_(producer.isAlive())
+        self.assertEqual(self.cursor.batches, [])
+
+        self.cursor.release.set()
+        producer.join(10)
+        self.assert_(not producer.isAlive())
+
+        self.modelbase.commit()
+        self.assertEqual(len(self.rows()), 100)
+
+    def testError(self):
+        self.cursor.failAt = 1
+        try:
+            self.queue(35)
+        except FakeError:
+            pass
+
+        self.assertRaises(FakeError, self.modelbase.commit)
+        self.assertRaises(FakeError, self.modelbase.flush)
+        self.assert_('commit' not in self.conn.log)
+
+        self.modelbase.rollback()
+        self.assert_('rollback' in self.conn.log)
+
+        self.cursor.failAt = None
+        self.queue(5, 100)
+        self.modelbase.commit()
+        self.assertEqual(self.conn.log[-1], 'commit')
+        self.assertEqual(self.cursor.batches[-1][0][1], 's100')
+
+    def testRollback(self):
+        # The first batch is being written, the second one waits.
+        self.cursor.release.clear()
+        self.queue(20)
+
+        # Let the writer go on while the rollback discards the
+        # batches still waiting.
+        threading.Timer(0.1, self.cursor.release.set).start()
+        self.modelbase.rollback()
+
+        self.assertEqual(len(self.cursor.batches), 1)
+        self.assertEqual(self.conn.log[-1].split()[:4],
+                         ['CREATE', 'TEMPORARY', 'TABLE', 'statements_raw'])
+        self.assert_('rollback' in self.conn.log)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+"""Test the RDF/XML serializer.
+"""
+
+import os, tempfile, shutil
+import unittest
+
+from relrdf import Uri, Literal, SerializationError
+from relrdf.modelbase import Model
+from relrdf.modelexport.rdfxmlsrl import RdfXmlSerializer
+
+
+class FakeModel(Model):
+    """A model returning `stmts` for every query, and recording the
+    streaming setting used for the query."""
+
+    __slots__ = ('stmts',
+                 'batchSize',
+                 'queryBatchSize')
+
+    def __init__(self, stmts):
+        self.stmts = stmts
+        self.batchSize = None
+        self.queryBatchSize = None
+
+    def setStreaming(self, streaming, batchSize=None):
+        if streaming:
+            self.batchSize = batchSize or 100
+        else:
+            self.batchSize = None
+
+    def getStreaming(self):
+        return self.batchSize
+
+    def getPrefixes(self):
+        return {'ex': Uri('http://example.com/')}
+
+    def query(self, queryLanguage, queryText):
+        self.queryBatchSize = self.batchSize
+        return self.stmts
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the RDF/XML serializer."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.fileName = os.path.join(self.dir, 'model.rdf')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def testWrite(self):
+        model = FakeModel([(Uri('http://example.com/s'),
+                            Uri('http://example.com/p'),
+                            Literal('o'))])
+        RdfXmlSerializer(self.fileName, model)
+
+        text = file(self.fileName).read()
+        self.assert_('<rdf:Description rdf:about="http://example.com/s">'
+                     in text)
+        self.assert_('<ex:p>o</ex:p>' in text)
+
+    def testStreamingRestored(self):
+        model = FakeModel([])
+        RdfXmlSerializer(self.fileName, model)
+
+        self.assertEqual(model.queryBatchSize, 100)
+        self.assertEqual(model.getStreaming(), None)
+
+    def testStreamingKept(self):
+        model = FakeModel([])
+        model.setStreaming(True, 10)
+        RdfXmlSerializer(self.fileName, model)
+
+        self.assertEqual(model.queryBatchSize, 10)
+        self.assertEqual(model.getStreaming(), 10)
+
+    def testStreamingRestoredOnError(self):
+        model = FakeModel([(Uri('http://example.com/s'),
+                            Uri('urn:p'), Literal('o'))])
+        model.setStreaming(True, 10)
+
+        self.assertRaises(SerializationError, RdfXmlSerializer, self.fileName,
+                          model)
+        self.assertEqual(model.getStreaming(), 10)
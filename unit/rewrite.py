@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the generic expression processor.
+"""
+
+import unittest
+
+from relrdf.expression import nodes, rewrite
+
+
+class Counter(rewrite.ExpressionProcessor):
+    """Count the nodes in an expression, not looking into
+    `nodes.Not` subexpressions."""
+
+    __slots__ = ()
+
+    def __init__(self):
+        super(Counter, self).__init__(prePrefix='pre')
+
+    def preNot(self, expr):
+        return ()
+
+    def Not(self, expr):
+        return 1
+
+    def Var(self, expr):
+        return 1
+
+    def Default(self, expr, *counts):
+        return 1 + sum(counts)
+
+
+class Renamer(rewrite.ExpressionTransformer):
+    """Append a suffix to all variable names."""
+
+    __slots__ = ()
+
+    def Var(self, expr):
+        return nodes.Var(expr.name + '_r')
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the expression processor."""
+
+    def setUp(self):
+        self.expr = nodes.Or(nodes.Var('a'),
+                             nodes.Not(nodes.And(nodes.Var('b'),
+                                                 nodes.Var('c'))),
+                             nodes.And())
+
+    def testDispatch(self):
+        self.assertEqual(Counter().process(self.expr), 4)
+
+    def testTransformer(self):
+        expr = Renamer().process(self.expr.copy())
+        self.assertEqual(expr[0].name, 'a_r')
+        self.assertEqual(expr[1][0][1].name, 'c_r')
+        self.assertEqual(len(expr[2]), 0)
+
+    def testSharedTable(self):
+        self.assertTrue(Counter()._dispatch is Counter()._dispatch)
+
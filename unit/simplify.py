@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the rule based expression simplifier.
+"""
+
+import unittest
+
+from relrdf.expression import nodes, simplify
+
+
+def var(i):
+    return nodes.Var('x%d' % i)
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the expression simplifier."""
+
+    def testFlatten(self):
+        expr = var(0)
+        for i in xrange(1, 500):
+            expr = nodes.Or(expr, var(i))
+        expr = simplify.simplify(expr)
+        self.assertTrue(isinstance(expr, nodes.Or))
+        self.assertEqual([subexpr.name for subexpr in expr],
+                         ['x%d' % i for i in xrange(500)])
+
+    def testPromoteSelect(self):
+        expr = nodes.Product(nodes.Select(var(0), var(1)),
+                             nodes.Product(var(2),
+                                           nodes.Select(var(3), var(4))))
+        expr = simplify.simplify(expr)
+        self.assertTrue(isinstance(expr, nodes.Select))
+        self.assertTrue(isinstance(expr[0], nodes.Product))
+        self.assertEqual([subexpr.name for subexpr in expr[0]],
+                         ['x0', 'x2', 'x3'])
+        self.assertTrue(isinstance(expr[1], nodes.And))
+        self.assertEqual([subexpr.name for subexpr in expr[1]],
+                         ['x1', 'x4'])
+
+    def testRuleOrder(self):
+        simp = simplify.Simplifier()
+        simp.addRules(nodes.Or, lambda expr: (var(42), True))
+        simp.addRules(nodes.BooleanOperation,
+                      lambda expr: (var(43), True))
+        self.assertEqual(simp.simplify(nodes.Or(var(0))).name, 'x42')
+        self.assertEqual(simp.simplify(nodes.And(var(0))).name, 'x43')
+        self.assertEqual(simp.simplify(nodes.Plus(var(0)))[0].name, 'x0')
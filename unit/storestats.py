@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the store statistics and the cardinality estimator of the
+basic schema.
+"""
+
+import unittest
+
+from relrdf.expression import nodes
+from relrdf.mapping import sqlnodes
+
+try:
+    from relrdf.db.postgres import stats
+except ImportError:
+    # The Postgres backend is not available.
+    stats = None
+
+
+ROWS = [('total', '', 1000, 200, 500),
+        ('predicate', 'http://example.com/p', 100, 50, 10),
+        ('predicate', 'http://example.com/q', 900, 200, 490),
+        ('graph', '1', 600, None, None),
+        ('graph', '2', 400, None, None),
+        ('type', '0', 700, None, None),
+        ('type', '1', 300, None, None)]
+
+def query(sqlText):
+    return ROWS
+
+def equal(incarnation, fieldId, value):
+    return sqlnodes.SqlEqual(sqlnodes.SqlFieldRef(incarnation, fieldId),
+                             value)
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the store statistics."""
+
+    def setUp(self):
+        if stats is None:
+            self.skipTest("Postgres backend not available")
+
+        self.stats = stats.StoreStatistics(query)
+        self.estimator = stats.BasicEstimator(self.stats)
+
+    def testCounts(self):
+        self.assertEqual(self.stats.getRows('statements'), 1000)
+        self.assertEqual(self.stats.getRows('graph_statement'), 1000)
+        self.assertEqual(self.stats.getDistinct('statements', 'subject'),
+                         200)
+        self.assertEqual(self.stats.getPredicateStats(
+                u'http://example.com/p'), (100, 50, 10))
+        self.assertEqual(self.stats.getPredicateCount(
+                u'http://example.com/r'), 0)
+        self.assertEqual(self.stats.getGraphSize(2), 400)
+        self.assertEqual(self.stats.getTypeCounts(), {0: 700, 1: 300})
+
+    def testPredicate(self):
+        rel = sqlnodes.SqlRelation(1, 'statements')
+        pred = equal(1, 'predicate', nodes.Uri('http://example.com/p'))
+        self.assertEqual(self.estimator.estimate(rel, [pred]), 100)
+
+        # Subjects are estimated per predicate.
+        subj = equal(1, 'subject', nodes.Uri('http://example.com/s'))
+        self.assertEqual(self.estimator.estimate(rel, [subj, pred]), 2)
+
+    def testGraph(self):
+        rel = sqlnodes.SqlRelation(1, 'graph_statement')
+        cond = equal(1, 'graph_id', sqlnodes.SqlInt(2))
+        self.assertEqual(self.estimator.estimate(rel, [cond]), 400)
+
+    def testUnrestricted(self):
+        rel = sqlnodes.SqlRelation(1, 'statements')
+        self.assertEqual(self.estimator.estimate(rel, []), 1000)
+
+    def testQuads(self):
+        rel = sqlnodes.SqlRelation(1, 'quads')
+        graph = equal(1, 'graph_id', sqlnodes.SqlInt(1))
+        pred = equal(1, 'predicate', nodes.Uri('http://example.com/q'))
+        self.assertEqual(self.estimator.estimate(rel, []), 1000)
+        self.assertEqual(self.estimator.estimate(rel, [graph, pred]), 540)
+
+    def testTermIds(self):
+        rel = sqlnodes.SqlRelation(1, 'term_quads')
+        lookup = sqlnodes.SqlFunctionCall('relrdf_term_lookup',
+                                          nodes.Uri('http://example.com/p'))
+        pred = sqlnodes.SqlEqual(sqlnodes.SqlFieldRef(1, 'predicate'),
+                                 lookup)
+        self.assertEqual(self.estimator.estimate(rel, [pred]), 100)
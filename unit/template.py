@@ -0,0 +1,72 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2009 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the conversion of values substituted into SPARQL templates.
+"""
+
+import unittest
+
+from relrdf import Uri, Literal
+from relrdf.commonns import xsd
+
+try:
+    from relrdf.sparql.template import Template
+except ImportError:
+    # The SPARQL parser hasn't been generated.
+    Template = None
+
+
+class TestCase(unittest.TestCase):
+    """Test case for template value conversion."""
+
+    def setUp(self):
+        if Template is None:
+            self.skipTest("SPARQL parser not available")
+
+        self.template = Template('SELECT ?x WHERE { ?x ?p $value }')
+
+    def checkTerm(self, value, text, typeUri):
+        self.assertEqual(self.template.substitute(value=value),
+                         'SELECT ?x WHERE { ?x ?p  %s  }' % text)
+
+        term = self.template.getTerms(value=value)['value']
+        self.assert_(isinstance(term, Literal))
+        self.assertEqual(term, text.strip('"'))
+        self.assertEqual(term.typeUri, typeUri)
+
+    def testInteger(self):
+        self.checkTerm(12, '12', xsd.integer)
+
+    def testDecimal(self):
+        # Bare floats are read as decimals by SPARQL.
+        self.checkTerm(1.5, '1.5', xsd.decimal)
+
+    def testDouble(self):
+        self.checkTerm(1e100, '1e+100', xsd.double)
+
+    def testString(self):
+        self.checkTerm('abc', '"abc"', None)
+
+    def testUri(self):
+        value = Uri('http://example.com/a')
+        self.assertEqual(self.template.getTerms(value=value)['value'], value)
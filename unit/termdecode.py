@@ -0,0 +1,166 @@
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the decoding of Postgres `rdf_term` results.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+from relrdf.expression import uri, literal
+from relrdf.commonns import xsd
+
+try:
+    from relrdf.db.postgres import termdecode
+except ImportError:
+    # The Postgres backend is not available.
+    termdecode = None
+
+
+TYPES = {
+    0x1001: (xsd.integer, None),
+    0x0003: (None, 'en'),
+    }
+
+def lookupType(typeId):
+    return TYPES.get(typeId)
+
+def convertPerCell(row):
+    """Decode a row one cell at a time, the way query results were
+    processed before batch decoding was introduced. Used as a
+    reference for correctness and speed."""
+    result = []
+    blankMap = {}
+    for pair in row:
+        if pair is None:
+            result.append(None)
+            continue
+
+        (val, _, typeId) = pair.rpartition('^^')
+        rawValue = val[1:-1].decode('utf8')
+        typeId = int(typeId, 16)
+
+        if typeId == 0:
+            value = uri.Uri(rawValue)
+            if value.isBlank() and value.endswith('#reinst'):
+                try:
+                    value = blankMap[rawValue]
+                except KeyError:
+                    value = blankMap[rawValue] = uri.newBlank()
+        elif typeId == 1:
+            value = literal.Literal(rawValue)
+        else:
+            (typeUri, langTag) = TYPES[typeId]
+            value = literal.Literal(rawValue, lang=langTag, typeUri=typeUri)
+        result.append(value)
+
+    return tuple(result)
+
+def syntheticRows(count):
+    """Generate `count` rows shaped like the results of a
+    ``select ?s ?p ?o`` query."""
+    rows = []
+    for i in xrange(count):
+        subject = "'http://example.com/s%d'^^0" % (i // 20)
+        pred = "'http://example.com/p%d'^^0" % (i % 30)
+        kind = i % 4
+        if kind == 0:
+            object = "'http://example.com/s%d'^^0" % (i % 500)
+        elif kind == 1:
+            object = "'value %d'^^1" % (i % 1000)
+        elif kind == 2:
+            object = "'%d'^^1001" % (i % 100)
+        else:
+            object = "'text %d'^^3" % (i % 200)
+        rows.append([subject, pred, object])
+
+    return rows
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the result decoder."""
+
+    def setUp(self):
+        if termdecode is None:
+            self.skipTest("Postgres backend not available")
+
+        self.decoder = termdecode.TermDecoder(lookupType)
+
+    def testDecodeTerms(self):
+        rows = self.decoder.decodeRows([
+                ["'http://example.com/a'^^0", "'abc'^^1",
+                 "'12'^^1001", "'hello'^^3", None]])
+
+        self.assertEqual(len(rows), 1)
+        a, abc, twelve, hello, none = rows[0]
+
+        self.assert_(isinstance(a, uri.Uri))
+        self.assertEqual(a, 'http://example.com/a')
+        self.assert_(isinstance(abc, literal.Literal))
+        self.assertEqual(abc.typeUri, None)
+        self.assertEqual(abc.lang, None)
+        self.assertEqual(twelve.typeUri, xsd.integer)
+        self.assertEqual(twelve.value, 12)
+        self.assertEqual(hello.lang, 'en')
+        self.assertEqual(none, None)
+
+    def testUtf8(self):
+        value, = self.decoder.decodeRows([["'\xc3\xa4'^^1"]])[0]
+        self.assertEqual(value, u'\xe4')
+
+    def testReinstBlanks(self):
+        blank = "'bnode:x#reinst'^^0"
+        rows = self.decoder.decodeRows([[blank, blank], [blank, blank]])
+
+        self.assert_(uri.isBlank(rows[0][0]))
+        self.assertEqual(rows[0][0], rows[0][1])
+        self.assertEqual(rows[1][0], rows[1][1])
+        self.assertNotEqual(rows[0][0], rows[1][0])
+
+    def testSameAsPerCell(self):
+        rows = syntheticRows(2000)
+        self.assertEqual(self.decoder.decodeRows(rows),
+                         [convertPerCell(row) for row in rows])
+
+    def testBenchmark(self):
+        # Slow and prints its results, only run when asked for.
+        if not os.environ.get('RELRDF_BENCHMARK'):
+            self.skipTest("set RELRDF_BENCHMARK to run")
+
+        rows = syntheticRows(100000)
+
+        start = time.time()
+        for row in rows:
+            convertPerCell(row)
+        perCell = len(rows) / (time.time() - start)
+
+        start = time.time()
+        for i in xrange(0, len(rows), 5000):
+            self.decoder.decodeRows(rows[i:i + 5000])
+        batched = len(rows) / (time.time() - start)
+
+        print >> sys.stderr, \
+            "per cell: %.0f rows/s, batched: %.0f rows/s (%.1fx) ..." % \
+            (perCell, batched, batched / perCell),
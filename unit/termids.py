@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the SQL generated for the term ID tables.
+"""
+
+import os
+import re
+import unittest
+
+from relrdf.expression import uri, nodes
+
+try:
+    from relrdf.db.postgres import basicquery
+    from relrdf.db.postgres import graphcache
+    from relrdf.db.postgres import stats
+    from relrdf.db.postgres import typecatalog
+except ImportError:
+    # The Postgres backend is not available.
+    basicquery = None
+
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))), 'relrdf', 'db', 'postgres', 'schema')
+
+GRAPH_URI = uri.Uri('http://example.com/graph')
+
+def queryTypes(sqlText):
+    if 'last_value' in sqlText:
+        return [(0, False, 0, False)]
+    else:
+        return []
+
+
+class FakeModelbase(object):
+    """Just enough of a modelbase to compile queries."""
+
+    def __init__(self):
+        self.graphCache = graphcache.GraphCache(lambda graphUri: 1,
+                                                lambda graphId: GRAPH_URI)
+        self.statistics = stats.StoreStatistics(lambda sqlText: [])
+        self.typeCatalog = typecatalog.TypeCatalog(queryTypes)
+
+    def hasTermIdTables(self):
+        return True
+
+    def lookupGraphId(self, graphUri):
+        return 1
+
+    def getGraphCache(self):
+        return self.graphCache
+
+    def getStatistics(self):
+        return self.statistics
+
+    def getTypeCatalog(self):
+        return self.typeCatalog
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the term ID mapping."""
+
+    def setUp(self):
+        if basicquery is None:
+            self.skipTest("Postgres backend not available")
+
+        modelbase = FakeModelbase()
+        mapper = basicquery.TermIdGraphMapper(modelbase, GRAPH_URI)
+        self.model = basicquery.BasicModel(modelbase, None, mapper)
+
+    def testDifferentMissingTerm(self):
+        # SELECT ?s
+        # WHERE { ?s ?p ?o FILTER (?o != <http://example.com/missing>) }
+        expr = nodes.MapResult(['s'],
+                               nodes.Select(
+                nodes.StatementPattern(nodes.DefaultGraph(), nodes.Var('s'),
+                                       nodes.Var('p'), nodes.Var('o')),
+                nodes.Different(nodes.Var('o'),
+                                nodes.Uri('http://example.com/missing'))),
+                               nodes.Var('s'))
+        sqlText = self.model._exprToSql(expr)
+
+        # The term is looked up in the database when the query
+        # runs, even if it was never stored.
+        self.assert_(re.search(r"<> \(relrdf_term_lookup\(", sqlText),
+                     sqlText)
+
+    def testLookupNeverNull(self):
+        # The lookup must return a non-matching ID rather than NULL
+        # for missing terms, or comparisons with `<>` would drop
+        # every row.
+        script = open(os.path.join(SCHEMA_DIR,
+                                   'upgrade-basicschema-5.sql')).read()
+        match = re.search(r"FUNCTION relrdf_term_lookup\(.*?\$\$(.*?)\$\$",
+                          script, re.S)
+        self.assert_(match is not None)
+        self.assert_('COALESCE' in match.group(1))
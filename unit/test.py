@@ -34,9 +34,28 @@ import unittest
 import argparse
 import basesinks
 import cmdline
+import compare
 import config
+import incarnate
+import interning
+import joinorder
+import lrucache
+import ntriples
+import pipeline
+import rdfxmlsrl
+import rewrite
+import simplify
+import storestats
+import template
+import termdecode
+import termids
+import typecatalog
+import xmi
 
-testModules = [argparse, basesinks, cmdline, config]
+testModules = [argparse, basesinks, cmdline, compare, config, incarnate,
+               interning, joinorder, lrucache, ntriples, pipeline, rdfxmlsrl,
+               rewrite, simplify, storestats, template, termdecode, termids,
+               typecatalog, xmi]
 
 
 if len(sys.argv) == 1:
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the cache of the literal types table.
+"""
+
+import re
+import unittest
+
+try:
+    from relrdf.db.postgres import typecatalog
+except ImportError:
+    # The Postgres backend is not available.
+    typecatalog = None
+
+
+DATA_TYPE = u'http://example.com/type'
+
+
+class FakeDatabase(object):
+    """A callable answering the catalog's queries from a list of
+    committed types and the state of both sequences."""
+
+    def __init__(self):
+        self.types = []
+        self.sequences = (4096, False, 2, True)
+        self.queries = []
+
+    def __call__(self, sqlText):
+        self.queries.append(sqlText)
+
+        if 'last_value' in sqlText:
+            return [self.sequences]
+
+        match = re.search(r"type_uri = E'(.*)'", sqlText)
+        if match is not None:
+            return [row for row in self.types if row[1] == match.group(1)]
+
+        langSeen, langLimit, dataSeen = \
+            [int(n) for n in re.findall(r'id [<>] (-?\d+)', sqlText)]
+        return [row for row in self.types
+                if langSeen < row[0] < langLimit or row[0] > dataSeen]
+
+
+class FakeConnection(object):
+    """A connection whose transaction created the type with ID
+    `typeId`, until it is rolled back."""
+
+    def __init__(self, typeId):
+        self.types = {typeId: (DATA_TYPE.encode('utf-8'), None)}
+        self.row = None
+
+    def cursor(self):
+        return self
+
+    def execute(self, sqlText):
+        typeId = int(re.search(r'id = (\d+)', sqlText).group(1))
+        self.row = self.types.get(typeId)
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+    def rollback(self):
+        self.types = {}
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the type catalog."""
+
+    def setUp(self):
+        if typecatalog is None:
+            self.skipTest("Postgres backend not available")
+
+        self.db = FakeDatabase()
+        self.catalog = typecatalog.TypeCatalog(self.db)
+
+    def testFirstValue(self):
+        # The sequence was never used.
+        self.assertEqual(self.catalog.lookupTypeId(DATA_TYPE, None), None)
+
+        # Its first value is taken, which doesn't change last_value.
+        self.db.types.append((4096, DATA_TYPE.encode('utf-8'), None))
+        self.db.sequences = (4096, True, 2, True)
+        self.assertEqual(self.catalog.lookupTypeId(DATA_TYPE, None), 4096)
+        self.assertEqual(self.catalog.getType(4096), (DATA_TYPE, None))
+
+    def testCommittedLate(self):
+        # The type's ID was taken by a transaction committed after the
+        # catalog saw the sequence.
+        self.db.sequences = (4100, True, 2, True)
+        self.assertEqual(self.catalog.lookupTypeId(DATA_TYPE, None), None)
+
+        self.db.types.append((4100, DATA_TYPE.encode('utf-8'), None))
+        self.assertEqual(self.catalog.lookupTypeId(DATA_TYPE, None), 4100)
+
+        # The type is cached now.
+        count = len(self.db.queries)
+        self.assertEqual(self.catalog.lookupTypeId(DATA_TYPE, None), 4100)
+        self.assertEqual(len(self.db.queries), count)
+
+    def testUncommitted(self):
+        # The transaction took the type's ID without committing.
+        self.db.sequences = (4100, True, 2, True)
+        conn = FakeConnection(4100)
+        self.assertEqual(self.catalog.getType(4100, conn), (DATA_TYPE, None))
+
+        conn.rollback()
+        self.assertEqual(self.catalog.lookupTypeId(DATA_TYPE, None), None)
+        self.assertEqual(self.catalog.getType(4100), None)
+        self.assertEqual(self.catalog.getType(4100, conn), None)
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# -*- Python -*-
+#
+# This file is part of RelRDF, a library for storage and
+# comparison of RDF models.
+#
+# Copyright (c) 2005-2010 Fraunhofer-Institut fuer Experimentelles
+#                         Software Engineering (IESE).
+# Copyright (c) 2010      Martín Soto
+#
+# RelRDF is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place - Suite 330,
+# Boston, MA 02111-1307, USA.
+
+"""Test the memory usage of the XMI and V-Modell parsers.
+
+The constant memory test parses a generated XMI document of
+``RELRDF_XMI_TEST_SIZE`` megabytes (16 by default). Set it to a few
+thousands to check the import of multi-gigabyte files.
+"""
+
+import os
+import unittest
+
+from relrdf import Literal
+from relrdf import commonns
+from relrdf.error import MemoryLimitError
+from relrdf.modelbase import Sink
+from relrdf.modelimport.xmiparse import XmiParser
+from relrdf.modelimport.vmodellparse import VModellParser
+from relrdf.util.memlimit import currentRss
+
+from common import raises
+
+
+# Size of the document parsed by the constant memory test, in bytes.
+TEST_SIZE = int(os.environ.get('RELRDF_XMI_TEST_SIZE', '16')) << 20
+
+# Allowed growth of the resident set size during the constant memory
+# test, in bytes.
+MAX_GROWTH = 16 << 20
+
+
+class GeneratedFile(object):
+    """A read-only file object producing `head`, followed by as many
+    copies of `body` (with ``%(n)d`` replaced by a sequence number) as
+    needed to reach `size` bytes, followed by `tail`. The document is
+    never kept in memory as a whole."""
+
+    __slots__ = ('body',
+                 'size',
+
+                 '_parts',
+                 '_buffer',
+                 '_count',
+                 '_produced',
+                 '_tail')
+
+    def __init__(self, head, body, tail, size):
+        self.body = body
+        self.size = size
+
+        self._parts = [head]
+        self._buffer = ''
+        self._count = 0
+        self._produced = len(head)
+        self._tail = tail
+
+    def read(self, size=-1):
+        if size < 0:
+            size = self.size
+
+        while len(self._buffer) < size:
+            if self._parts:
+                self._buffer += self._parts.pop(0)
+            elif self._produced < self.size:
+                chunk = []
+                chunkSize = 0
+                while chunkSize < 1 << 16 and \
+                        self._produced + chunkSize < self.size:
+                    text = self.body % {'n': self._count}
+                    self._count += 1
+                    chunk.append(text)
+                    chunkSize += len(text)
+                self._produced += chunkSize
+                self._buffer += ''.join(chunk)
+            elif self._tail is not None:
+                self._buffer += self._tail
+                self._tail = None
+            else:
+                break
+
+        result = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return result
+
+    @property
+    def count(self):
+        """Number of body copies produced so far."""
+        return self._count
+
+
+def xmiFile(size):
+    return GeneratedFile(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<XMI xmi.version="1.2" xmlns:UML="org.omg.xmi.namespace.UML">\n'
+        '<XMI.content>\n'
+        '<UML:Model xmi.id="model" name="Model">\n'
+        '<UML:Namespace.ownedElement>\n',
+        '<UML:Class xmi.id="c%(n)d" name="Class%(n)d">'
+        '<UML:Classifier.feature>'
+        '<UML:Attribute xmi.id="a%(n)d" name="attr%(n)d"/>'
+        '</UML:Classifier.feature>'
+        '</UML:Class>\n',
+        '</UML:Namespace.ownedElement>\n'
+        '</UML:Model>\n'
+        '</XMI.content>\n'
+        '</XMI>\n',
+        size)
+
+
+class ListSink(Sink, list):
+    """A sink keeping all statements."""
+
+    def triple(self, subject, pred, object):
+        self.append((subject, pred, object))
+
+
+class RssSink(Sink):
+    """A sink counting statements and recording the maximum resident
+    set size of the process after a warm-up period."""
+
+    __slots__ = ('count',
+                 'startRss',
+                 'maxRss')
+
+    # Statements received before memory usage is sampled.
+    WARM_UP = 50000
+
+    # Statements between samples.
+    INTERVAL = 10000
+
+    def __init__(self):
+        self.count = 0
+        self.startRss = None
+        self.maxRss = 0
+
+    def triple(self, subject, pred, object):
+        self.count += 1
+        if self.count >= self.WARM_UP and self.count % self.INTERVAL == 0:
+            rss = currentRss()
+            if self.startRss is None:
+                self.startRss = rss
+            self.maxRss = max(self.maxRss, rss)
+
+
+class TestCase(unittest.TestCase):
+    """Test case for the XMI parser."""
+
+    def setUp(self):
+        if currentRss() is None:
+            self.skipTest("Memory usage not available")
+
+    def testStatements(self):
+        source = xmiFile(1000)
+        sink = ListSink()
+        XmiParser().parse(source, sink)
+
+        inst = XmiParser().instNs
+        uml = XmiParser.nsMap[u'org.omg.xmi.namespace.UML']
+        attr = XmiParser.defaultNs
+        self.assertEqual(len(sink), 2 + 6 * source.count)
+        self.assertEqual(sink[:8],
+                         [(inst['idmodel'], commonns.rdf.type, uml['Model']),
+                          (inst['idmodel'], attr['name'],
+                           Literal(u'Model')),
+                          (inst['idmodel'], uml['Namespace.ownedElement'],
+                           inst['idc0']),
+                          (inst['idc0'], commonns.rdf.type, uml['Class']),
+                          (inst['idc0'], attr['name'], Literal(u'Class0')),
+                          (inst['idc0'], uml['Classifier.feature'],
+                           inst['ida0']),
+                          (inst['ida0'], commonns.rdf.type,
+                           uml['Attribute']),
+                          (inst['ida0'], attr['name'],
+                           Literal(u'attr0'))])
+
+    def testConstantMemory(self):
+        source = xmiFile(TEST_SIZE)
+        sink = RssSink()
+        XmiParser().parse(source, sink)
+
+        self.assertEqual(sink.count, 2 + 6 * source.count)
+        self.assert_(sink.startRss is not None)
+        self.assert_(sink.maxRss - sink.startRss < MAX_GROWTH,
+                     "RSS grew by %d MB" %
+                     ((sink.maxRss - sink.startRss) >> 20))
+
+    @raises(MemoryLimitError)
+    def testMemoryCeiling(self):
+        XmiParser(maxMemory=1).parse(xmiFile(1 << 20), RssSink())
+
+
+class VModellTestCase(unittest.TestCase):
+    """Test case for the V-Modell parser."""
+
+    def setUp(self):
+        if currentRss() is None:
+            self.skipTest("Memory usage not available")
+
+    @raises(MemoryLimitError)
+    def testMemoryCeiling(self):
+        source = GeneratedFile(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<V-Modell>\n<Rollen>\n',
+            '<Rolle id="r%(n)d"><Name>Rolle %(n)d</Name></Rolle>\n',
+            '</Rollen>\n</V-Modell>\n',
+            1 << 20)
+        VModellParser(source, sink=RssSink(), maxMemory=1)